@@ -0,0 +1,6 @@
+"""Benchmarks for the parse -> fetch -> format pipeline of the bot, run with
+`python -m benchmarks` from the root of the repository
+
+Every benchmark runs offline against the card payloads in
+`benchmarks/fixtures`, so results only measure the code of the bot
+"""
@@ -0,0 +1,50 @@
+"""Run the benchmarks and optionally save or compare against a baseline
+
+    python -m benchmarks [-k NAME] [--scale N] [--save PATH]
+                            [--compare PATH] [--threshold FRACTION]
+
+Exits with status 1 when `--compare` is given and a benchmark is slower
+than the baseline by more than `--threshold`
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from . import _runner
+from .cases import CASES
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-k", dest="names", action="append", default=[],
+                        help="only run benchmarks whose name contains NAME")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplier of the iterations of every case")
+    parser.add_argument("--save", type=Path,
+                        help="write the results to a JSON baseline")
+    parser.add_argument("--compare", type=Path,
+                        help="compare the results to a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown reported as a regression")
+    args = parser.parse_args()
+
+    cases = [case for case in CASES
+                if not args.names or any(n in case.name for n in args.names)]
+
+    async def run_all():
+        return [await _runner.measure(case, args.scale) for case in cases]
+
+    results = asyncio.run(run_all())
+    baseline = _runner.load(args.compare) if args.compare else None
+    regressions = _runner.report(results, baseline, args.threshold)
+    if args.save:
+        _runner.save(results, args.save)
+
+    if regressions:
+        print("Regressions: " + ", ".join(regressions))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
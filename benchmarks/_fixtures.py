@@ -0,0 +1,31 @@
+"""Module that loads the card payloads in `benchmarks/fixtures` and fakes the
+Discord objects read by the bot
+"""
+
+import json
+from pathlib import Path
+from typing import List
+
+_FIXTURES = Path(__file__).parent / "fixtures"
+
+def load_cards() -> List[dict]:
+    """Return the card payloads of `fixtures/cards.json`"""
+    with open(_FIXTURES / "cards.json", encoding="utf-8") as f:
+        return json.load(f)
+
+class FakeChannel:
+    """A Discord channel that records the responses sent to it"""
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send(self, **kwargs) -> None:
+        self.sent.append(kwargs)
+
+class FakeMessage:
+    """A Discord message with only the attributes read by the bot. `author`
+    must differ from `bot.user` for `on_message` to handle the message
+    """
+    def __init__(self, content :str, author :str="benchmark") -> None:
+        self.content = content
+        self.author = author
+        self.channel = FakeChannel()
@@ -0,0 +1,157 @@
+"""Module that times benchmark cases and reads and writes their results"""
+
+import gc
+import inspect
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+class Case(NamedTuple):
+    """A benchmark. `setup` is awaited once and returns the sync or async
+    callable timed by the benchmark
+    """
+    name :str
+    setup :Callable
+    iterations :int = 2000
+
+class Result(NamedTuple):
+    """The measurements of one benchmark
+
+    Attributes:
+        - ops_per_sec : float
+            - operations completed per second
+        - p50_us, p90_us, p99_us : float
+            - latency percentiles of one operation in microseconds
+        - alloc_blocks : float
+            - memory blocks still allocated after an operation, on average
+        - alloc_peak_bytes : float
+            - the peak memory allocated during an operation, on average
+    """
+    name :str
+    iterations :int
+    ops_per_sec :float
+    p50_us :float
+    p90_us :float
+    p99_us :float
+    alloc_blocks :float
+    alloc_peak_bytes :float
+
+def _percentile(samples :List[int], fraction :float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+async def _call(fn :Callable, is_async :bool) -> None:
+    if is_async:
+        await fn()
+    else:
+        fn()
+
+async def measure(case :Case, scale :float=1.0) -> Result:
+    """Run `case` and return its :class:`Result`. The latency of every
+    operation is timed separately with the garbage collector disabled, then
+    a shorter pass is traced with `tracemalloc` to count allocations
+
+    Positional Arguments:
+        - case : Case
+            - the benchmark to run
+
+    Optional Arguments:
+        - scale : float
+            - multiplier of the number of iterations of the case
+    """
+    fn = await case.setup()
+    is_async = inspect.iscoroutinefunction(fn)
+    iterations = max(1, int(case.iterations * scale))
+
+    for _ in range(min(iterations, 100)):
+        await _call(fn, is_async)
+
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            op_start = time.perf_counter_ns()
+            await _call(fn, is_async)
+            samples.append(time.perf_counter_ns() - op_start)
+        total = time.perf_counter_ns() - start
+    finally:
+        gc.enable()
+    samples.sort()
+
+    traced = max(1, iterations // 10)
+    blocks, peak = 0, 0
+    tracemalloc.start()
+    try:
+        for _ in range(traced):
+            tracemalloc.reset_peak()
+            before_blocks = sys.getallocatedblocks()
+            current, _ = tracemalloc.get_traced_memory()
+            await _call(fn, is_async)
+            blocks += sys.getallocatedblocks() - before_blocks
+            peak += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    return Result(case.name, iterations, iterations / (total / 1e9),
+                    _percentile(samples, 0.50) / 1e3,
+                    _percentile(samples, 0.90) / 1e3,
+                    _percentile(samples, 0.99) / 1e3,
+                    blocks / traced, peak / traced)
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save(results :List[Result], path :Path) -> None:
+    """Write `results` to the `JSON` baseline at `path` with the commit and
+    interpreter they were measured on
+    """
+    baseline = {
+        "commit" : _commit(),
+        "python" : platform.python_version(),
+        "platform" : platform.platform(),
+        "results" : {r.name: r._asdict() for r in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=4) + "\n", encoding="utf-8")
+
+def load(path :Path) -> Dict[str, dict]:
+    """Return the results of the `JSON` baseline at `path` by name"""
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+def report(results :List[Result], baseline :Optional[Dict[str, dict]]=None,
+            threshold :float=0.10) -> List[str]:
+    """Print a table of `results`, with the change of `ops_per_sec` from
+    `baseline` when given
+
+    Returns:
+        the names of the benchmarks whose `ops_per_sec` fell by more than
+        `threshold` from `baseline`
+    """
+    print(f"{'benchmark':<32}{'ops/sec':>12}{'p50 us':>10}{'p90 us':>10}"
+            f"{'p99 us':>10}{'blocks':>9}{'peak B':>10}{'change':>9}")
+    regressions = []
+    for r in results:
+        change = ""
+        previous = (baseline or {}).get(r.name)
+        if previous:
+            delta = r.ops_per_sec / previous["ops_per_sec"] - 1
+            change = f"{delta:+.1%}"
+            if delta < -threshold:
+                regressions.append(r.name)
+                change += " !"
+        print(f"{r.name:<32}{r.ops_per_sec:>12,.0f}{r.p50_us:>10.1f}"
+                f"{r.p90_us:>10.1f}{r.p99_us:>10.1f}{r.alloc_blocks:>9.1f}"
+                f"{r.alloc_peak_bytes:>10,.0f}{change:>9}")
+
+    return regressions
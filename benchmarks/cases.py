@@ -0,0 +1,96 @@
+"""The benchmark cases of the parse -> fetch -> format pipeline"""
+
+import asyncio
+from typing import List
+
+from bot.bot import Bot
+from bot.format import format_card_metadata_embeded
+from bot.message_parser import parse_message
+from bot._fetch_request import CardFetchRequest
+from bot._popularity import PopularitySketch
+from bot._response_cache import ResponseCache
+from bot.hearthstone import MultipleCards, NegativeCache, get_catalog
+from bot.hearthstone import MemoryTier, TieredCache, set_cache
+from bot.hearthstone._parser import parse_api_result
+from ._fixtures import FakeMessage, load_cards
+from ._runner import Case
+
+MESSAGE = ("Has anyone tried [Ysera] with {Leeroy Jenkins | Fireball} in "
+            "wild? [ragnaros the firelord|Ysera Awakens] "
+            "{Ragnaros, Lightlord}")
+
+def _find(cards :List[dict], name :str) -> dict:
+    return next(card for card in cards if card["name"] == name)
+
+async def bench_parse_message():
+    message = FakeMessage(MESSAGE)
+    return lambda: parse_message(message)
+
+async def bench_fetch_request_items():
+    request = CardFetchRequest([])
+    raw = ["Ysera | ragnaros the firelord |  | Ysera", " leeroy jenkins",
+            "Fireball|Whelp|Dream|Nightmare"]
+    def run():
+        request.items = raw
+    return run
+
+async def bench_parse_api_result_single():
+    result = [_find(load_cards(), "Leeroy Jenkins")]
+    return lambda: parse_api_result(result)
+
+async def bench_parse_api_result_multiple():
+    result = load_cards()
+    return lambda: parse_api_result(result)
+
+async def bench_multiple_cards_index():
+    cards = load_cards()
+    names = [card["name"] for card in cards]
+    def run():
+        multiple_cards = MultipleCards(cards)
+        for name in names:
+            multiple_cards[name]
+            multiple_cards.get_by_dbf_id(1186)
+    return run
+
+async def bench_format_metadata_embed():
+    card = parse_api_result([_find(load_cards(), "Ysera, Unleashed")])
+    return lambda: format_card_metadata_embeded(card)
+
+async def _create_bot() -> Bot:
+    get_catalog().build(load_cards())
+    bot = Bot(command_prefix="!", loop=asyncio.get_running_loop())
+    bot.cache = TieredCache([MemoryTier(128)])
+    set_cache(bot.cache)
+    bot.responses = ResponseCache()
+    bot.popularity = PopularitySketch()
+    bot.negative_cache = NegativeCache()
+    return bot
+
+async def bench_handle_requests_cold():
+    bot = await _create_bot()
+    message = FakeMessage(MESSAGE)
+    async def run():
+        bot.cache.clear()
+        bot.responses = ResponseCache()
+        await bot._handle_requests(message, parse_message(message), "bench")
+        message.channel.sent.clear()
+    return run
+
+async def bench_handle_requests_warm():
+    bot = await _create_bot()
+    message = FakeMessage(MESSAGE)
+    async def run():
+        await bot._handle_requests(message, parse_message(message), "bench")
+        message.channel.sent.clear()
+    return run
+
+CASES = [
+    Case("parse_message", bench_parse_message, 20000),
+    Case("fetch_request_items", bench_fetch_request_items, 20000),
+    Case("parse_api_result_single", bench_parse_api_result_single, 20000),
+    Case("parse_api_result_multiple", bench_parse_api_result_multiple, 5000),
+    Case("multiple_cards_index", bench_multiple_cards_index, 5000),
+    Case("format_metadata_embed", bench_format_metadata_embed, 5000),
+    Case("handle_requests_cold", bench_handle_requests_cold, 1000),
+    Case("handle_requests_warm", bench_handle_requests_warm, 2000),
+]
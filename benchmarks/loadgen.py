@@ -0,0 +1,235 @@
+"""A load generator that feeds synthetic Discord messages into
+`Bot.on_message` at a fixed rate and reports how the bot keeps up
+
+    python -m benchmarks.loadgen --rate 200 --duration 10
+    python -m benchmarks.loadgen --backend mock --latency-ms 40 --rate 50
+
+Messages arrive on a fixed schedule whether or not earlier messages have
+been answered, and latency is measured from each message's scheduled
+arrival, so time spent waiting for a free `--concurrency` slot counts
+against the bot. Replies are recorded by a fake channel instead of being
+sent to Discord
+
+The `catalog` backend answers every request from the card catalog built
+from the fixtures. The `mock` backend starts `benchmarks.mock_api` and
+sends every request to it over HTTP, and `--api-url` uses a mock server
+that is already running. The bot is configured from the usual settings, so
+`API_RATE_LIMIT=0` is needed to measure the bot rather than its rate limit
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bot.hearthstone import configure
+from ._fixtures import FakeMessage, load_cards
+from . import mock_api
+
+#The share of each kind of message in the generated traffic
+MIX = {
+    "chatter" : 0.55,
+    "single" : 0.20,
+    "multi" : 0.10,
+    "ambiguous" : 0.08,
+    "dbf_id" : 0.03,
+    "invalid" : 0.04,
+}
+
+_CHATTER = (
+    "anyone up for some arena later?",
+    "that last patch really gutted my deck",
+    "gg, you topdecked lethal again",
+    "what do you all think of the new expansion",
+    "brb getting coffee",
+    "is wild even worth playing right now",
+)
+
+class MessageMix:
+    """Generates message contents in the proportions of `MIX` from the
+    names and `dbfId`s of `cards`
+
+    Positional Arguments:
+        - cards : List[dict]
+            - the card payloads to take names and `dbfId`s from
+        - rng : random.Random
+            - the random number generator of the run
+    """
+    def __init__(self, cards :List[dict], rng :random.Random) -> None:
+        self._rng = rng
+        self._names = [card["name"] for card in cards]
+        self._dbf_ids = [card["dbfId"] for card in cards]
+        #Partial names shared by several cards
+        self._ambiguous = ["Ysera", "Ragnaros", "Dream"]
+        self._kinds = list(MIX)
+        self._weights = list(MIX.values())
+
+    def next(self) -> Tuple[str, str]:
+        """Return the kind and content of the next message"""
+        rng = self._rng
+        kind = rng.choices(self._kinds, self._weights)[0]
+        chatter = rng.choice(_CHATTER)
+        if kind == "single":
+            content = f"{chatter} [{rng.choice(self._names)}]"
+        elif kind == "multi":
+            names = rng.sample(self._names, 3)
+            content = (f"{{{names[0]}|{names[1]}}} vs [{names[2]}] "
+                        f"{chatter}")
+        elif kind == "ambiguous":
+            content = f"[{rng.choice(self._ambiguous)}] {chatter}"
+        elif kind == "dbf_id":
+            content = f"{{{rng.choice(self._dbf_ids)}}}"
+        elif kind == "invalid":
+            content = rng.choice((f"[{chatter}", f"[[{chatter}]]",
+                                    f"{chatter}]", f"[]{{}} {chatter}"))
+        else:
+            content = chatter
+        return kind, content
+
+def _percentiles(samples :List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    def at(fraction :float) -> float:
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+    return {"p50" : at(0.50), "p90" : at(0.90), "p99" : at(0.99),
+            "max" : samples[-1]}
+
+async def _monitor_loop_lag(lags :List[float], interval :float,
+                            stop :asyncio.Event) -> None:
+    """Record how late each `interval` sleep wakes up, in milliseconds"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+async def run(rate :float, duration :float, concurrency :int,
+                use_catalog :bool=True, seed :Optional[int]=None) -> dict:
+    """Feed `rate` messages per second into `Bot.on_message` for `duration`
+    seconds, with at most `concurrency` messages in flight, and return the
+    report of the run. With `use_catalog` the card catalog is built from the
+    fixtures, otherwise every request goes to the api
+    """
+    from bot.bot import Bot
+
+    loop = asyncio.get_running_loop()
+    cards = load_cards()
+    mix = MessageMix(cards, random.Random(seed))
+
+    bot = Bot(command_prefix="!", loop=loop)
+    bot.initialize()
+    #Synthetic traffic must not replace the popularity of real traffic
+    bot.popularity_path = None
+    if use_catalog:
+        bot.catalog.build(cards)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies :Dict[str, List[float]] = {kind: [] for kind in MIX}
+    lags :List[float] = []
+    replies = 0
+    stop = asyncio.Event()
+    monitor = loop.create_task(_monitor_loop_lag(lags, 0.01, stop))
+
+    async def handle(kind :str, content :str, arrival :float) -> None:
+        nonlocal replies
+        message = FakeMessage(content, author="loadgen")
+        async with semaphore:
+            await bot.on_message(message)
+        latencies[kind].append((time.perf_counter() - arrival) * 1000)
+        replies += len(message.channel.sent)
+
+    tasks = []
+    total = int(rate * duration)
+    start = time.perf_counter()
+    for i in range(total):
+        arrival = start + i / rate
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.create_task(handle(*mix.next(), arrival)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+    await bot.close()
+
+    every = [latency for samples in latencies.values() for latency in samples]
+    return {
+        "messages" : total,
+        "replies" : replies,
+        "elapsed_s" : elapsed,
+        "offered_per_s" : rate,
+        "throughput_per_s" : total / elapsed,
+        "latency_ms" : _percentiles(every),
+        "latency_ms_by_kind" : {kind: _percentiles(samples)
+                                    for kind, samples in latencies.items()},
+        "loop_lag_ms" : _percentiles(lags),
+    }
+
+def _print_report(report :dict) -> None:
+    def row(name :str, stats :Dict[str, float]) -> str:
+        if not stats:
+            return f"  {name:<12} -"
+        return (f"  {name:<12}" + "".join(f"{key} {value:>9.2f}  "
+                                            for key, value in stats.items()))
+
+    print(f"messages {report['messages']}  replies {report['replies']}  "
+            f"elapsed {report['elapsed_s']:.2f}s")
+    print(f"offered {report['offered_per_s']:.1f}/s  "
+            f"throughput {report['throughput_per_s']:.1f}/s")
+    print("latency ms")
+    print(row("all", report["latency_ms"]))
+    for kind, stats in report["latency_ms_by_kind"].items():
+        print(row(kind, stats))
+    print("event loop lag ms")
+    print(row("lag", report["loop_lag_ms"]))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen")
+    parser.add_argument("--rate", type=float, default=100,
+                        help="messages per second")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="seconds to send messages for")
+    parser.add_argument("--concurrency", type=int, default=64,
+                        help="messages handled at the same time")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--backend", choices=("catalog", "mock"),
+                        default="catalog")
+    parser.add_argument("--api-url", help="url of a running mock api")
+    parser.add_argument("--json", action="store_true",
+                        help="print the report as JSON")
+    for field in mock_api.Faults.FIELDS:
+        parser.add_argument("--" + field.replace("_", "-"), type=float,
+                            default=getattr(mock_api.Faults(), field),
+                            help="fault of the mock backend")
+    args = parser.parse_args()
+
+    async def main_() -> dict:
+        runner = None
+        if args.api_url:
+            configure(api_uri=args.api_url)
+        elif args.backend == "mock":
+            faults = mock_api.Faults(**{field: getattr(args, field)
+                                        for field in mock_api.Faults.FIELDS})
+            runner, _, url = await mock_api.start(faults=faults)
+            configure(api_uri=url)
+        try:
+            return await run(args.rate, args.duration, args.concurrency,
+                                use_catalog=args.backend == "catalog"
+                                            and not args.api_url,
+                                seed=args.seed)
+        finally:
+            if runner is not None:
+                await runner.cleanup()
+
+    report = asyncio.run(main_())
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        _print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""A local stand-in for the Hearthstone API that serves the card payloads in
+`benchmarks/fixtures` from every endpoint `hearthstone.py` calls, with
+injectable latency, server errors, 429 responses, and slow bodies
+
+Point the bot at it with the `RAPID_API_URI` variable or
+`hearthstone.configure(api_uri=...)`, E.G:
+
+    python -m benchmarks.mock_api --port 8099 --latency-ms 40 --error-rate 0.05
+    RAPID_API_URI=http://127.0.0.1:8099 python -m bot
+
+The faults of a running server are read from `GET /_mock/faults` and changed
+with `POST /_mock/faults` and a `JSON` object of the fields to set.
+`GET /_mock/stats` returns the number of responses sent by status
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from aiohttp import web
+
+from ._fixtures import load_cards
+
+_CARDBACKS = [
+    {"cardBackId": 0, "name": "Classic", "description": "The only card back "
+        "you'll ever need.", "source": "startup", "enabled": True,
+        "img": "https://d15f34w2p8l1cc.cloudfront.net/hearthstone/cb_0.png",
+        "locale": "enUS"},
+    {"cardBackId": 1, "name": "Pandaria", "description": "This card back is "
+        "inspired by the continent of Pandaria.", "source": "season",
+        "enabled": True,
+        "img": "https://d15f34w2p8l1cc.cloudfront.net/hearthstone/cb_1.png",
+        "locale": "enUS"},
+]
+
+#Query parameters of the /cards endpoints that filter on a numeric field
+_NUMERIC_FILTERS = ("cost", "attack", "health", "durability")
+
+class Faults:
+    """The faults injected into every response of the mock server
+
+    Optional Arguments:
+        - latency_ms : float
+            - the median delay before a response is sent. Default 0
+        - latency_sigma : float
+            - the spread of the log-normal latency distribution. `0` makes
+            every response take `latency_ms`. Default 0
+        - error_rate : float
+            - the fraction of requests answered with a 500 or 503. Default 0
+        - throttle_rate : float
+            - the fraction of requests answered with a 429. Default 0
+        - rate_limit : float
+            - requests per second allowed before the server answers with a
+            429, like the RapidAPI quota. `0` is unlimited. Default 0
+        - retry_after : float
+            - the `Retry-After` seconds sent with a 429. Default 1
+        - slow_body_rate : float
+            - the fraction of successful responses streamed slowly. Default 0
+        - slow_body_delay_ms : float
+            - the delay between each chunk of a slow body. Default 50
+    """
+    FIELDS = ("latency_ms", "latency_sigma", "error_rate", "throttle_rate",
+                "rate_limit", "retry_after", "slow_body_rate",
+                "slow_body_delay_ms")
+
+    def __init__(self, latency_ms :float=0, latency_sigma :float=0,
+                    error_rate :float=0, throttle_rate :float=0,
+                    rate_limit :float=0, retry_after :float=1,
+                    slow_body_rate :float=0,
+                    slow_body_delay_ms :float=50) -> None:
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.slow_body_rate = slow_body_rate
+        self.slow_body_delay_ms = slow_body_delay_ms
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        fields = ", ".join(f"{f}={getattr(self, f)}" for f in self.FIELDS)
+        return f"{cls}({fields})"
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def update(self, values :dict) -> None:
+        """Set the fields in `values`. Raises `ValueError` for an unknown
+        field or a value that is not a number
+        """
+        for field, value in values.items():
+            if field not in self.FIELDS:
+                raise ValueError(f"Unknown fault '{field}'")
+            setattr(self, field, float(value))
+
+    def latency(self) -> float:
+        """Return a delay in seconds drawn from the latency distribution"""
+        if self.latency_ms <= 0:
+            return 0.0
+        spread = math.exp(self.latency_sigma * random.gauss(0, 1))
+        return self.latency_ms * spread / 1000
+
+class MockHearthstoneAPI:
+    """The routes and state of the mock server
+
+    Positional Arguments:
+        - cards : List[dict]
+            - the card payloads served by the /cards endpoints
+
+    Optional Arguments:
+        - faults : Faults
+            - the faults injected into responses. Default no faults
+
+    Methods:
+        - create_app
+            - return the `aiohttp.web.Application` of the server
+    """
+    def __init__(self, cards :List[dict],
+                    faults :Optional[Faults]=None) -> None:
+        self.cards = cards
+        self.faults = faults or Faults()
+        self.stats :Dict[str, int] = {}
+        self._tokens = float("inf")
+        self._refilled = time.monotonic()
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._inject_faults])
+        app.router.add_get("/", self._index)
+        app.router.add_get("/_mock/faults", self._get_faults)
+        app.router.add_post("/_mock/faults", self._set_faults)
+        app.router.add_get("/_mock/stats", self._get_stats)
+        app.router.add_get("/info", self._info)
+        app.router.add_get("/cards", self._all_cards)
+        app.router.add_get("/cardbacks", self._cardbacks)
+        app.router.add_get("/cardsbacks", self._cardbacks)
+        app.router.add_get("/cards/search/{query}", self._search)
+        app.router.add_get("/cards/classes/{value}",
+                            self._filter_by("playerClass"))
+        app.router.add_get("/cards/races/{value}", self._filter_by("race"))
+        app.router.add_get("/cards/sets/{value}", self._filter_by("cardSet"))
+        app.router.add_get("/cards/qualities/{value}",
+                            self._filter_by("rarity"))
+        app.router.add_get("/cards/factions/{value}",
+                            self._filter_by("faction"))
+        app.router.add_get("/cards/types/{value}", self._filter_by("type"))
+        app.router.add_get("/cards/{name}", self._card)
+        return app
+
+    def _count(self, status :int) -> None:
+        self.stats[str(status)] = self.stats.get(str(status), 0) + 1
+
+    def _over_rate_limit(self) -> bool:
+        if self.faults.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.faults.rate_limit, self._tokens +
+                            (now - self._refilled) * self.faults.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    @web.middleware
+    async def _inject_faults(self, request :web.Request,
+                                handler) -> web.StreamResponse:
+        if request.path.startswith("/_mock/"):
+            return await handler(request)
+
+        faults = self.faults
+        delay = faults.latency()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self._over_rate_limit() or random.random() < faults.throttle_rate:
+            self._count(429)
+            return web.json_response(
+                {"message": "You have exceeded the rate limit per second "
+                            "for your plan."}, status=429,
+                headers={"Retry-After": f"{faults.retry_after:g}"})
+        if random.random() < faults.error_rate:
+            status = random.choice((500, 503))
+            self._count(status)
+            return web.json_response({"error": status,
+                                        "message": "Internal Server Error"},
+                                        status=status)
+
+        response = await handler(request)
+        self._count(response.status)
+        if (response.status == 200 and
+                random.random() < faults.slow_body_rate):
+            return await self._stream_slowly(request, response)
+        return response
+
+    async def _stream_slowly(self, request :web.Request,
+                                response :web.Response) -> web.StreamResponse:
+        body = response.body
+        stream = web.StreamResponse(status=200, headers={
+                                        "Content-Type": "application/json"})
+        stream.content_length = len(body)
+        await stream.prepare(request)
+        chunks = 8
+        size = max(1, math.ceil(len(body) / chunks))
+        for i in range(0, len(body), size):
+            await stream.write(body[i:i+size])
+            await asyncio.sleep(self.faults.slow_body_delay_ms / 1000)
+        await stream.write_eof()
+        return stream
+
+    def _matching(self, request :web.Request,
+                    cards :List[dict]) -> List[dict]:
+        """Apply the `collectible` and numeric filters of `request`"""
+        query = request.query
+        if query.get("collectible") == "1":
+            cards = [card for card in cards if card.get("collectible")]
+        for field in _NUMERIC_FILTERS:
+            if field in query:
+                cards = [card for card in cards
+                            if str(card.get(field)) == query[field]]
+        return cards
+
+    def _cards_response(self, request :web.Request,
+                        cards :List[dict]) -> web.Response:
+        cards = self._matching(request, cards)
+        if not cards:
+            return web.json_response({"error": 404,
+                                        "message": "Card not found."},
+                                        status=404)
+        return web.json_response(cards)
+
+    async def _index(self, request :web.Request) -> web.Response:
+        return web.Response(text="mock hearthstone api")
+
+    async def _get_faults(self, request :web.Request) -> web.Response:
+        return web.json_response(self.faults.as_dict())
+
+    async def _set_faults(self, request :web.Request) -> web.Response:
+        try:
+            self.faults.update(await request.json())
+        except (ValueError, TypeError, AttributeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(self.faults.as_dict())
+
+    async def _get_stats(self, request :web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    async def _info(self, request :web.Request) -> web.Response:
+        def values(field :str) -> List[str]:
+            return sorted({card[field] for card in self.cards
+                            if field in card})
+        return web.json_response({
+            "patch": "mock",
+            "classes": values("playerClass"),
+            "sets": values("cardSet"),
+            "types": values("type"),
+            "factions": values("faction"),
+            "qualities": values("rarity"),
+            "races": values("race"),
+            "locales": ["enUS"],
+        })
+
+    async def _all_cards(self, request :web.Request) -> web.Response:
+        by_set :Dict[str, List[dict]] = {}
+        for card in self._matching(request, self.cards):
+            by_set.setdefault(card.get("cardSet", "Unknown"), []).append(card)
+        return web.json_response(by_set)
+
+    async def _cardbacks(self, request :web.Request) -> web.Response:
+        return web.json_response(_CARDBACKS)
+
+    async def _card(self, request :web.Request) -> web.Response:
+        name = request.match_info["name"].casefold()
+        return self._cards_response(request, [
+            card for card in self.cards
+                if name in (card["name"].casefold(), card["cardId"].casefold(),
+                            card["dbfId"])])
+
+    async def _search(self, request :web.Request) -> web.Response:
+        query = request.match_info["query"].casefold()
+        return self._cards_response(request, [
+            card for card in self.cards if query in card["name"].casefold()])
+
+    def _filter_by(self, field :str):
+        async def handler(request :web.Request) -> web.Response:
+            value = request.match_info["value"].casefold()
+            return self._cards_response(request, [
+                card for card in self.cards
+                    if str(card.get(field, "")).casefold() == value])
+        return handler
+
+async def start(host :str="127.0.0.1", port :int=0,
+                faults :Optional[Faults]=None,
+                cards :Optional[List[dict]]=None) \
+                    -> Tuple[web.AppRunner, MockHearthstoneAPI, str]:
+    """Start the mock server on the running event loop. `port=0` picks a
+    free port
+
+    Returns:
+        the `aiohttp.web.AppRunner` to clean up, the
+        :class:`MockHearthstoneAPI`, and the base url of the server
+    """
+    api = MockHearthstoneAPI(cards if cards is not None else load_cards(),
+                                faults)
+    runner = web.AppRunner(api.create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    return runner, api, f"http://{host}:{port}"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    for field in Faults.FIELDS:
+        parser.add_argument("--" + field.replace("_", "-"), type=float,
+                            default=getattr(Faults(), field))
+    args = parser.parse_args()
+
+    faults = Faults(**{field: getattr(args, field) for field in Faults.FIELDS})
+
+    async def serve() -> None:
+        runner, _, url = await start(args.host, args.port, faults)
+        print(f"Serving mock hearthstone api at {url} with {faults}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
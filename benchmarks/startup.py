@@ -0,0 +1,83 @@
+"""Measure the startup time of the bot and of importing the hearthstone
+package, each in a fresh interpreter
+
+    python -m benchmarks.startup [--runs N] [--json]
+
+`python -m bot` is measured up to the point it logs in to Discord: the bot
+is created and initialized exactly as `bot/__main__.py` does, with
+placeholder credentials when none are set
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+SCRIPTS = {
+    "interpreter" : "pass",
+    "import bot.hearthstone" : "import bot.hearthstone",
+    "import hearthstone client" : "from bot.hearthstone import fetch_cards",
+    "python -m bot (to login)" : (
+        "import bot\n"
+        "from bot.bot import Bot\n"
+        "bot.instance = Bot.create(command_prefix='!')\n"
+        "bot.instance.initialize()\n"
+    ),
+}
+
+def _time_script(script :str, runs :int, cwd :str, env :dict) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], cwd=cwd, env=env,
+                        check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def measure(runs :int=10) -> Dict[str, Dict[str, float]]:
+    """Return the median, min, and max milliseconds of each script in
+    `SCRIPTS`, run `runs` times each from a temporary directory
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (str(_ROOT),
+                                                env.get("PYTHONPATH"))))
+    env.setdefault("RAPID_API_KEY", "startup-benchmark")
+    env.setdefault("RAPID_API_HOST", "startup-benchmark")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, script in SCRIPTS.items():
+            _time_script(script, 1, cwd, env)
+            samples = _time_script(script, runs, cwd, env)
+            results[name] = {"median_ms" : statistics.median(samples),
+                                "min_ms" : min(samples),
+                                "max_ms" : max(samples)}
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+
+    print(f"{'startup':<28}{'median ms':>11}{'min ms':>9}{'max ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['median_ms']:>11.1f}"
+                f"{result['min_ms']:>9.1f}{result['max_ms']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 """A Discord bot to display Hearthstone card images and metadata"""
 
-from .bot import Bot
+instance: "Bot" = None #Global instance
 
-instance: "Bot" = None #Global instance
\ No newline at end of file
+def __getattr__(name :str):
+    #`Bot` imports discord.py, so it is only imported once it is used
+    if name == "Bot":
+        from .bot import Bot
+        return Bot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
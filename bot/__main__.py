@@ -1,7 +1,13 @@
 import bot
+from bot import settings
 from bot.bot import Bot, StartUpError
 from .log import get_logger
 
+shard_count = settings.get_int("SHARD_COUNT", 0)
+if shard_count:
+    from .shards import run_shards
+    exit(run_shards(shard_count, settings.get_int("SHARD_PROCESSES", 0)))
+
 try:
     bot.instance = Bot.create(command_prefix='!')
     bot.instance.initialize()
@@ -10,4 +16,4 @@ except StartUpError as e:
     logger = get_logger()
     logger.fatal(e.exception)
 
-    exit(183)
\ No newline at end of file
+    exit(183)
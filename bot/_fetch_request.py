@@ -1,8 +1,8 @@
 import operator
 from abc import ABCMeta
-from typing import Callable, Set, List
+from typing import Callable, List
 from functools import reduce
-from bot.hearthstone.hearthstone import fetch_card_by_partial_name
+from bot.hearthstone._catalog import search_card_by_partial_name
 from bot.format import format_card, format_card_metadata_embeded
 
 class _FetchRequest(metaclass=ABCMeta):
@@ -10,9 +10,9 @@ class _FetchRequest(metaclass=ABCMeta):
     user to be handled by the bot
     
     Attributes:
-        - items (property) : Set[str]
-            - set of args that will be iterated upon and each item passed to
-             _FetchRequest.API
+        - items (property) : List[str]
+            - ordered, de-duplicated args that will be iterated upon and each 
+            item passed to _FetchRequest.API
         - API
             - callable that makes a request to the hearthstone api
         - format
@@ -48,18 +48,21 @@ class _FetchRequest(metaclass=ABCMeta):
         return reduce(operator.xor, hashes, 0)
 
     @property
-    def items(self) -> Set[str]:
+    def items(self) -> List[str]:
         """Getter for the `items` property"""
         return self._items
 
     @items.setter
     def items(self, value :List[str]) -> None:
         """Setter for the `items` property that accepts a list of strings and
-        creates a set of stripped, titled strings for each `string` in
-        `string_element.split('|')` for each `string_element` in `value`
+        creates a list of unique stripped, titled, non-empty strings for each
+        `string` in `string_element.split('|')` for each `string_element` in 
+        `value`, in the order they first appear
         """
-        self._items = {card.strip().title() for cards in value
-                                            for card in cards.split('|')}
+        self._items = list(dict.fromkeys(card.strip().title() 
+                                            for cards in value
+                                            for card in cards.split('|')
+                                            if card.strip()))
 
     @property
     def API(self) -> Callable:
@@ -76,12 +79,12 @@ class CardFetchRequest(_FetchRequest):
     image URL
 
     Attributes:
-        - items (inherited from _FetchRequest) : Set[str]
-            - set of args that will be iterated upon and each item passed to
-             _FetchRequest.API
+        - items (inherited from _FetchRequest) : List[str]
+            - ordered, de-duplicated args that will be iterated upon and each 
+            item passed to _FetchRequest.API
         - API 
             - a callable that makes a request to the hearthstone api
-            - set to =hearthstone.fetch_card_by_partial_name
+            - set to =hearthstone.search_card_by_partial_name
         - format
             - a callable that formats the response from the hearthstone api
             to be displayed by the bot 
@@ -89,7 +92,7 @@ class CardFetchRequest(_FetchRequest):
     """
     def __init__(self, request_str: List[str]) -> None:
         super().__init__(request_str)
-        self._api = fetch_card_by_partial_name
+        self._api = search_card_by_partial_name
         self._format = format_card
 
 class MetadataFetchRequest(_FetchRequest):
@@ -97,12 +100,12 @@ class MetadataFetchRequest(_FetchRequest):
     :class:`Discord.Embed` of the card's metadata
 
     Attributes:
-        - items (inherited from _FetchRequest) : Set[str]
-            - set of args that will be iterated upon and each item passed to
-             _FetchRequest.API
+        - items (inherited from _FetchRequest) : List[str]
+            - ordered, de-duplicated args that will be iterated upon and each 
+            item passed to _FetchRequest.API
         - API 
             - a callable that makes a request to the hearthstone api
-            - set to =hearthstone.fetch_card_by_partial_name
+            - set to =hearthstone.search_card_by_partial_name
         - format
             - a callable that formats the response from the hearthstone api
             to be displayed by the bot 
@@ -110,5 +113,5 @@ class MetadataFetchRequest(_FetchRequest):
     """
     def __init__(self, request_str: List[str]) -> None:
         super().__init__(request_str)
-        self._api = fetch_card_by_partial_name
+        self._api = search_card_by_partial_name
         self._format = format_card_metadata_embeded
\ No newline at end of file
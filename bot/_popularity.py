@@ -0,0 +1,210 @@
+import heapq
+import json
+import os
+import time
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+from .hearthstone._parser import normalize_query
+
+class PopularitySketch:
+    """A compact record of how often each item is requested. Counts are kept
+    in a count-min sketch, so memory does not grow with the number of
+    distinct items, and the `capacity` most requested items are tracked by
+    name so the bot can prefetch them after a restart. A heap of the tracked
+    counts finds the least requested tracked item without scanning them.
+    Items are normalized so that `'Ysera'` and `'ysera'` share one count
+
+    Optional Arguments:
+        - width : int
+            - the number of counters in each row of the sketch
+        - depth : int
+            - the number of rows of the sketch
+        - capacity : int
+            - the number of most requested items tracked by name
+
+    Attributes:
+        - total : int
+            - the number of items recorded
+        - decayed_at : float
+            - the time the counts were last decayed
+
+    Methods:
+        - record
+            - count one request for an item
+        - estimate
+            - return the estimated request count of an item
+        - top
+            - return the most requested items
+        - decay
+            - scale every count down so old requests weigh less
+        - save
+            - write the sketch to a JSON file
+        - load (class method)
+            - read a sketch written by `save`
+    """
+    def __init__(self, width :int=2048, depth :int=4,
+                    capacity :int=256) -> None:
+        if width < 1 or not 1 <= depth <= 16:
+            raise ValueError("'width' must be positive and 'depth' between "
+                                "1 and 16")
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.total = 0
+        self.decayed_at = time.time()
+        self._rows = [[0] * width for _ in range(depth)]
+        #normalized item -> (estimated count, item as first requested)
+        self._top :Dict[str, Tuple[int, str]] = {}
+        #(count, normalized item) of the tracked items. Counts only grow, so
+        #an entry whose count is no longer the count in `_top` is skipped
+        self._heap :List[Tuple[int, str]] = []
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(TOTAL: {}, TRACKED: {})".format(cls, self.total, len(self))
+
+    def __len__(self) -> int:
+        return len(self._top)
+
+    def _cells(self, key :str) -> List[int]:
+        digest = blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[i * 4:i * 4 + 4], "little") % self.width
+                for i in range(self.depth)]
+
+    def record(self, item :str) -> int:
+        """Count one request for `item`. Only the smallest counters of the
+        item are raised, which keeps the overestimate of the sketch low
+
+        Returns:
+            the estimated request count of `item`
+        """
+        key = normalize_query(item)
+        cells = self._cells(key)
+        count = min(row[cell] for row, cell in zip(self._rows, cells)) + 1
+        for row, cell in zip(self._rows, cells):
+            if row[cell] < count:
+                row[cell] = count
+        self.total += 1
+
+        if key in self._top or len(self._top) < self.capacity:
+            self._top[key] = (count, self._top.get(key, (0, item))[1])
+            self._push(count, key)
+        else:
+            coldest = self._coldest()
+            if coldest is not None and coldest[0] < count:
+                heapq.heappop(self._heap)
+                del self._top[coldest[1]]
+                self._top[key] = (count, item)
+                self._push(count, key)
+
+        return count
+
+    def _push(self, count :int, key :str) -> None:
+        """Add the count of a tracked item to the heap, rebuilding the heap
+        once outdated entries make up most of it
+        """
+        heapq.heappush(self._heap, (count, key))
+        if len(self._heap) > 2 * self.capacity:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(count, key) for key, (count, _) in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def _coldest(self) -> Optional[Tuple[int, str]]:
+        """Return the `(count, normalized item)` of the least requested 
+        tracked item, dropping outdated entries from the top of the heap
+        """
+        while self._heap:
+            count, key = self._heap[0]
+            if self._top.get(key, (None,))[0] == count:
+                return count, key
+            heapq.heappop(self._heap)
+
+        return None
+
+    def estimate(self, item :str) -> int:
+        """Return the estimated request count of `item`, which is never less
+        than its true count
+        """
+        cells = self._cells(normalize_query(item))
+        return min(row[cell] for row, cell in zip(self._rows, cells))
+
+    def top(self, n :int) -> List[str]:
+        """Return up to `n` of the most requested items, most requested
+        first, as they were first requested
+        """
+        ranked = sorted(self._top.values(), key=lambda entry: -entry[0])
+        return [item for count, item in ranked[:n] if count > 0]
+
+    def decay(self, factor :float=0.5) -> None:
+        """Multiply every count by `factor`, so that items requested long ago
+        give way to items requested recently, and forget tracked items whose
+        count reaches zero
+        """
+        for row in self._rows:
+            for i, value in enumerate(row):
+                row[i] = int(value * factor)
+        self._top = {key: (int(count * factor), item)
+                        for key, (count, item) in self._top.items()
+                        if int(count * factor) > 0}
+        self._rebuild_heap()
+        self.total = int(self.total * factor)
+        self.decayed_at = time.time()
+
+    def to_dict(self) -> dict:
+        """Return a copy of the sketch as a JSON serializable `dict`"""
+        return {"width" : self.width, "depth" : self.depth,
+                "capacity" : self.capacity, "total" : self.total,
+                "decayed_at" : self.decayed_at,
+                "rows" : [list(row) for row in self._rows],
+                "top" : [[key, count, item]
+                            for key, (count, item) in self._top.items()]}
+
+    @classmethod
+    def from_dict(cls, data :dict) -> "PopularitySketch":
+        """Return the sketch represented by `data`, a result of `to_dict`
+
+        Raises a `ValueError` if `data` is not a valid sketch
+        """
+        try:
+            sketch = cls(data["width"], data["depth"], data["capacity"])
+            rows = [[int(value) for value in row] for row in data["rows"]]
+            if (len(rows) != sketch.depth or
+                    any(len(row) != sketch.width for row in rows)):
+                raise ValueError("the rows do not match the sketch size")
+            sketch._rows = rows
+            sketch._top = {key: (int(count), item)
+                            for key, count, item in data["top"]}
+            sketch._rebuild_heap()
+            sketch.total = int(data["total"])
+            sketch.decayed_at = float(data["decayed_at"])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"invalid popularity sketch: {e!r}") from e
+
+        return sketch
+
+    def save(self, path :str) -> None:
+        """Write the sketch to the JSON file at `path`. The file is replaced
+        atomically, so a reader never sees a partial sketch
+        """
+        write_sketch(self.to_dict(), path)
+
+    @classmethod
+    def load(cls, path :str) -> "PopularitySketch":
+        """Read the sketch saved at `path`
+
+        Raises an `OSError` if the file cannot be read or a `ValueError` if it
+        is not a valid sketch
+        """
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+def write_sketch(data :dict, path :str) -> None:
+    """Write `data`, the result of `PopularitySketch.to_dict`, to `path`
+    through a temporary file that then replaces it
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, separators=(",", ":"))
+    os.replace(temp_path, path)
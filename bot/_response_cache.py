@@ -0,0 +1,126 @@
+import time
+from typing import Callable, Iterable, Optional, Union
+from cachetools import LRUCache, TTLCache
+from discord import Embed
+from .hearthstone import CollectibleCard, NonCollectibleCard, MultipleCards
+from .hearthstone._parser import normalize_query
+
+class ResponseCache:
+    """A cache of finished responses so that popular cards are formatted
+    once rather than on every request
+
+    Formatted cards are keyed by `(dbfId, format function, locale)` and
+    expire after `ttl` seconds, so a card refreshed or changed by a catalog
+    sync is formatted again even when nothing invalidates it. The
+    `name: dbfId` listing of a :class:`MultipleCards` result is keyed by the
+    normalized query and reused only while the query still resolves to the 
+    same result object
+
+    Optional Arguments:
+        - maxsize : int
+            - the maximum number of cards and of listings held
+        - ttl : float
+            - seconds a formatted card is reused. `None` keeps it until it
+            is invalidated or evicted
+
+    Attributes:
+        - stats (property) : dict
+            - hit and miss counters for formatted cards and listings
+
+    Methods:
+        - render
+            - return the formatted response for a card
+        - listing
+            - return the listing text for a MultipleCards result
+        - invalidate
+            - drop the responses of changed cards
+        - clear
+            - drop every response
+    """
+    def __init__(self, maxsize :int=512, ttl :Optional[float]=None,
+                    timer :Callable[[], float]=time.monotonic) -> None:
+        if ttl is None:
+            self._responses = LRUCache(maxsize=maxsize)
+        else:
+            self._responses = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._listings = LRUCache(maxsize=maxsize)
+        self._counters = dict.fromkeys(("render_hits", "render_misses",
+                                        "listing_hits", "listing_misses"), 0)
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}({})".format(cls, self.stats)
+
+    @property
+    def stats(self) -> dict:
+        """Getter for the `stats` property"""
+        return dict(self._counters)
+
+    def render(self, card :Union[CollectibleCard, NonCollectibleCard],
+                format_fn :Callable) -> Union[str, Embed]:
+        """Return `format_fn(card)`, formatting `card` only if the response
+        for its `dbfId`, `format_fn`, and locale is not cached. Cards without
+        a `dbfId` are always formatted
+
+        Any exception raised by `format_fn` is raised and nothing is cached
+        """
+        dbf_id = card.get("dbfId")
+        if dbf_id is None:
+            return format_fn(card)
+
+        key = (str(dbf_id), format_fn.__name__, card.get("locale", "enUS"))
+        response = self._responses.get(key)
+        if response is None:
+            self._counters["render_misses"] += 1
+            response = self._responses[key] = format_fn(card)
+        else:
+            self._counters["render_hits"] += 1
+
+        return response
+
+    def listing(self, item :str, result :MultipleCards) -> str:
+        """Return the newline separated `name: dbfId` listing of `result`,
+        building it only if no listing of this `result` is cached for `item`
+        """
+        key = normalize_query(item)
+        cached = self._listings.get(key)
+        if cached is not None and cached[0] is result:
+            self._counters["listing_hits"] += 1
+            return cached[1]
+
+        self._counters["listing_misses"] += 1
+        text = "\n".join(card['name'] + ": " + card['dbfId'] 
+                            for card in result)
+        self._listings[key] = (result, text)
+
+        return text
+
+    def has_listing(self, item :str, result :MultipleCards) -> bool:
+        """Return `True` if the listing of `result` is cached for `item`"""
+        cached = self._listings.get(normalize_query(item))
+        return cached is not None and cached[0] is result
+
+    def invalidate(self, items :Iterable[str]) -> int:
+        """Drop the formatted cards whose `dbfId` is in `items` and the
+        listings of the normalized queries in `items`
+
+        Returns:
+            the number of responses dropped
+        """
+        items = {normalize_query(item) for item in items}
+        dropped = 0
+        for cache, stale in (
+                (self._responses, [key for key in self._responses
+                                    if key[0] in items]),
+                (self._listings, [key for key in self._listings
+                                    if key in items])):
+            for key in stale:
+                del cache[key]
+            dropped += len(stale)
+
+        return dropped
+
+    def clear(self) -> None:
+        """Drop every formatted card and listing"""
+        self._responses.clear()
+        self._listings.clear()
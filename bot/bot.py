@@ -1,21 +1,44 @@
+import asyncio
 import aiohttp
+import time
 import uuid
-from cachetools import Cache, TTLCache
-from typing import Any, List, Union
+from aiohttp import web
+from typing import Any, Dict, Iterator, List, Optional, Union
 from discord import Embed, Message
 from discord import DiscordException
 from discord.ext import commands
 
+from . import metrics
+from . import settings
 from .log import get_logger
+from ._popularity import PopularitySketch, write_sketch
+from ._response_cache import ResponseCache
 from ._fetch_request import CardFetchRequest, MetadataFetchRequest
-from .message_parser import ParserException, is_valid_request_str
-from .message_parser import parse_message
+from .message_parser import ParserException, NoValidRequests
+from .message_parser import has_request_brackets, parse_message
+from .message_parser import MAX_ITEMS, MAX_LENGTH
 from .format import FormattingException
 from .hearthstone import CollectibleCard, NonCollectibleCard, MultipleCards 
-from .hearthstone import APIException
+from .hearthstone import APIException, NoCardFound, RateLimitExceeded
+from .hearthstone import CardCatalog, CardStore, get_catalog
+from .hearthstone import get_coalescing_stats, get_rate_limit_stats
+from .hearthstone import Priority, RateLimiter, request_priority
+from .hearthstone import set_rate_limiter, set_retry_policy
+from .hearthstone import set_circuit_breaker_options, get_retry_stats
+from .hearthstone import RetryPolicy, create_session, warm_up
+from .hearthstone import get_cache_stats, get_response_stats
+from .hearthstone import NegativeCache, set_negative_cache
+from .hearthstone import get_negative_cache_stats
+from .hearthstone import TieredCache, MemoryTier, StoreTier
+from .hearthstone import cache_key, set_cache
+from .hearthstone import get_config
+from .hearthstone._parser import normalize_query
 
 logger = get_logger()
 
+#Seconds after which the counts of the popularity sketch are halved
+_POPULARITY_HALF_LIFE = 86400
+
 class StartUpError(Exception):
     """Exception that's raised when a process required for the bot to function
     fails on creation or initialization
@@ -29,16 +52,213 @@ def _get_bot_token():
     
     `.env` file searched for in the immediate parent directory of `bot.py`
     """
-    from dotenv import load_dotenv
-    from os import getenv
-    from pathlib import Path
+    return settings.get_str("TOKEN")
+
+def _create_cache() -> TieredCache:
+    """Create the cache shared by the bot and the hearthstone api functions
+    and install it with `set_cache`. Entries are fresh for `CARD_CACHE_TTL`
+    seconds and then kept stale for `CARD_CACHE_STALE_TTL` seconds. When the
+    `CARD_STORE_PATH` setting is set, the in-memory tier is backed by a 
+    :class:`CardStore` at that path and warmed with the most recently stored
+    results
+
+    Settings:
+        - CARD_CACHE_SIZE : int
+            - the maximum number of entries in memory. Default 1024
+        - CARD_CACHE_TTL : float
+            - seconds an entry is fresh. Default 600
+        - CARD_CACHE_STALE_TTL : float
+            - seconds an expired entry is served while it is refreshed. 
+            Default 86400
+        - CARD_STORE_PATH : str
+            - the SQLite file of the on-disk store. Unset disables the store
+        - CARD_STORE_MAX_ENTRIES : int
+            - the maximum number of entries on disk. Default 50000
 
-    env_file_path = str(Path(__file__).parent.resolve()) + "\.env"
-    load_dotenv(dotenv_path=env_file_path)
+    Returns:
+        a `TieredCache`
+    """
+    ttl = settings.get_float("CARD_CACHE_TTL", 600)
+    stale_ttl = settings.get_float("CARD_CACHE_STALE_TTL", 86400)
+    tiers = [MemoryTier(settings.get_int("CARD_CACHE_SIZE", 1024))]
+    store_path = settings.get_str("CARD_STORE_PATH")
+    if store_path:
+        tiers.append(StoreTier(CardStore(store_path, ttl=ttl + stale_ttl,
+                        max_entries=settings.get_int("CARD_STORE_MAX_ENTRIES",
+                                                        50000))))
 
-    return getenv("TOKEN")
+    cache = TieredCache(tiers, ttl=ttl, stale_ttl=stale_ttl)
+    set_cache(cache)
+    if store_path:
+        warmed = cache.warm(cache.maxsize, prefix="/cards/search|")
+        logger.info(f"Loaded {warmed} cached results "
+                    f"from {tiers[1].store}")
+
+    return cache
+
+def _load_popularity(path :Optional[str]) -> PopularitySketch:
+    """Load the popularity sketch of the bot from `path`, or create an empty
+    one if `path` is `None` or the file does not exist or cannot be read
+
+    Returns:
+        a `PopularitySketch`
+    """
+    if path is None:
+        return PopularitySketch()
+
+    try:
+        sketch = PopularitySketch.load(path)
+    except FileNotFoundError:
+        return PopularitySketch()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Popularity sketch {path} failed to load: {e!r}")
+        return PopularitySketch()
+
+    logger.info(f"Loaded {sketch} from {path}")
+    return sketch
+
+def _create_http_session() -> aiohttp.ClientSession:
+    """Create the connection pool the bot uses for the hearthstone api
+
+    Settings:
+        - HTTP_POOL_LIMIT : int
+            - the maximum number of open connections. Default 100
+        - HTTP_POOL_LIMIT_PER_HOST : int
+            - the maximum number of connections to one host. Default 20
+        - HTTP_KEEPALIVE : float
+            - seconds an idle connection is kept open. Default 60
+        - HTTP_DNS_TTL : int
+            - seconds the api host address is cached. Default 300
+        - HTTP_CONNECT_TIMEOUT : float
+            - seconds allowed to open a connection. Default 3
+        - HTTP_READ_TIMEOUT : float
+            - seconds allowed between reads of a response. Default 10
+
+    Returns:
+        an `aiohttp.ClientSession`
+    """
+    return create_session(
+        limit=settings.get_int("HTTP_POOL_LIMIT", 100),
+        limit_per_host=settings.get_int("HTTP_POOL_LIMIT_PER_HOST", 20),
+        keepalive_timeout=settings.get_float("HTTP_KEEPALIVE", 60),
+        dns_cache_ttl=settings.get_int("HTTP_DNS_TTL", 300),
+        connect_timeout=settings.get_float("HTTP_CONNECT_TIMEOUT", 3),
+        read_timeout=settings.get_float("HTTP_READ_TIMEOUT", 10))
+
+def _create_rate_limiter(share :float=1.0) -> Optional[RateLimiter]:
+    """Create the :class:`RateLimiter` for requests to the hearthstone api.
+    Processes that share the api quota each get a `share` of the rate and
+    daily limits. The bucket keeps at least two tokens of `API_RATE_BURST`,
+    so that a process with a small share can still hold a token for 
+    interactive requests while it serves background requests
+
+    Settings:
+        - API_RATE_LIMIT : float
+            - requests per second. `0` disables rate limiting. Default 5
+        - API_RATE_BURST : int
+            - the number of requests that may be sent at once. Default 10
+        - API_DAILY_LIMIT : int
+            - requests per UTC day. `0` is unlimited. Default 0
+
+    Returns:
+        a `RateLimiter` or `None` if rate limiting is disabled
+    """
+    per_second = settings.get_float("API_RATE_LIMIT", 5)
+    if per_second <= 0:
+        return None
+
+    burst = settings.get_int("API_RATE_BURST", 10)
+    per_day = settings.get_int("API_DAILY_LIMIT", 0)
+    return RateLimiter(per_second * share, 
+                        burst=max(1, min(burst, 2), int(burst * share)),
+                        per_day=max(1, int(per_day * share)) if per_day 
+                                    else None)
+
+def _create_negative_cache() -> NegativeCache:
+    """Create a :class:`NegativeCache` of queries that found no card
+
+    Settings:
+        - NEGATIVE_CACHE_SIZE : int
+            - the maximum number of queries remembered. Default 1024
+        - NEGATIVE_CACHE_TTL : float
+            - seconds a query that found no card is remembered. Default 300
+
+    Returns:
+        a `NegativeCache`
+    """
+    return NegativeCache(maxsize=settings.get_int("NEGATIVE_CACHE_SIZE", 1024),
+                            ttl=settings.get_float("NEGATIVE_CACHE_TTL", 300))
+
+def _create_response_cache() -> ResponseCache:
+    """Create the :class:`ResponseCache` of formatted responses
+
+    Settings:
+        - RESPONSE_CACHE_SIZE : int
+            - the maximum number of cards and of listings held. Default 512
+        - RESPONSE_CACHE_TTL : float
+            - seconds a formatted card is reused. Default 600
+
+    Returns:
+        a `ResponseCache`
+    """
+    return ResponseCache(settings.get_int("RESPONSE_CACHE_SIZE", 512),
+                            ttl=settings.get_float("RESPONSE_CACHE_TTL", 600))
 
-def _handle_api_results(cache :Cache, result: Any, item :str,
+def _result_queries(item :str, result :Union[CollectibleCard, 
+                                                NonCollectibleCard,
+                                                MultipleCards]) -> List[str]:
+    """Return `item` and the `dbfId` of every card of `result`, the keys of
+    the responses built from `result` in a :class:`ResponseCache`
+    """
+    cards = result if isinstance(result, MultipleCards) else [result]
+    return [item] + [str(card["dbfId"]) for card in cards if "dbfId" in card]
+
+def _negative_cache_samples(layer :str, stats :dict) -> Iterator[tuple]:
+    """Yield the counters of a negative cache as metric samples labelled 
+    with `layer`
+    """
+    for name, value in stats.items():
+        if name == "size":
+            yield ("hs_bot_negative_cache_size", "gauge",
+                    "Queries remembered as finding no card", 
+                    {"layer" : layer}, value)
+        else:
+            yield ("hs_bot_negative_cache_total", "counter",
+                    "Lookups and additions of the negative caches",
+                    {"layer" : layer, "result" : name}, value)
+
+def _collect_api_stats() -> Iterator[tuple]:
+    """Yield the counters of the hearthstone api client as metric samples"""
+    for name, value in get_coalescing_stats().items():
+        yield (f"hs_bot_coalescing_{name}", "gauge",
+                "Request coalescing counters", {}, value)
+    for name, value in get_rate_limit_stats().items():
+        yield (f"hs_bot_rate_limit_{name}", "gauge",
+                "Rate limiter counters", {}, value)
+
+    yield from _negative_cache_samples("client", get_negative_cache_stats())
+
+    retry_stats = get_retry_stats()
+    yield ("hs_bot_api_retries_total", "counter", 
+            "Requests to the hearthstone api that were retried", {},
+            retry_stats["retries"])
+    for endpoint, state in retry_stats["circuits"].items():
+        yield ("hs_bot_circuit_open", "gauge",
+                "1 if the circuit of an endpoint is not closed", 
+                {"endpoint" : endpoint}, int(state != "closed"))
+
+    for endpoint, counts in get_response_stats().items():
+        for status, count in counts.items():
+            yield ("hs_bot_api_responses_total", "counter",
+                    "Responses from the hearthstone api by status",
+                    {"endpoint" : endpoint, "status" : status}, count)
+    for name, count in get_cache_stats().items():
+        yield ("hs_bot_api_cache_total", "counter",
+                "Lookups, writes, and invalidations of the shared cache",
+                {"result" : name}, count)
+
+def _handle_api_results(cache :TieredCache, responses :ResponseCache, 
+                        result: Any, item :str,
                         request: Union[CardFetchRequest, 
                                             MetadataFetchRequest], 
                         request_id :str) -> dict:
@@ -46,9 +266,13 @@ def _handle_api_results(cache :Cache, result: Any, item :str,
     call the proper functions to handle the request accordingly
     
     Positional Arguments:
-        - cache : Cache
+        - cache : TieredCache
             - reference to the cache of the bot instance
 
+        - responses : ResponseCache
+            - reference to the cache of formatted responses of the bot 
+            instance
+
         - result : Any
             - the object returned by the hearthstone api. A proper response
             will be either MultipleCards, CollectibleCard, or 
@@ -70,11 +294,14 @@ def _handle_api_results(cache :Cache, result: Any, item :str,
         passed back to `bot._handle_requests`
     """
     if type(result) is MultipleCards:
-        return _handle_multiple_cards(cache, result, item, request_id)             
+        return _handle_multiple_cards(cache, responses, result, item, 
+                                        request_id)
     else:
-        return _handle_single_card(result, item, request, request_id)
+        return _handle_single_card(responses, result, item, request, 
+                                    request_id)
 
-def _handle_multiple_cards(cache :Cache,
+def _handle_multiple_cards(cache :TieredCache,
+                            responses :ResponseCache,
                             result: MultipleCards, 
                             item :str,
                             request_id :str) -> dict:
@@ -85,10 +312,19 @@ def _handle_multiple_cards(cache :Cache,
     with the `dbfId` and return the card. This only works if the values were 
     cached first
 
+    The listing is built and the cards are cached only the first time 
+    `result` is handled for `item`; later requests reuse the listing from 
+    `responses`. The cards are cached at once, in one transaction of the 
+    on-disk store
+
     Positional Arguments:
-        - cache : Cache
+        - cache : TieredCache
             - reference to the cache of the bot instance
 
+        - responses : ResponseCache
+            - reference to the cache of formatted responses of the bot 
+            instance
+
         - result : Any
             - the object returned by the hearthstone api guaranteed to be
             type MultipleCards
@@ -105,26 +341,32 @@ def _handle_multiple_cards(cache :Cache,
         back to the user
     """
     logger.info(f"{request_id} Multiple results for "
-                f"'{item}'")
-    for card in result:
-        cache[card["dbfId"]] = result[card["name"]]
+                f"'{item}'", extra={"request_id" : request_id})
+    if not responses.has_listing(item, result):
+        cache.set_many((cache_key("/cards/search", card["dbfId"]), 
+                            result.card(i)) 
+                        for i, card in enumerate(result))
 
-    multiple_results = "\n".join([result[i]['name']
-                                    +": "+result[i]['dbfId']
-                                    for i in range(0, len(result))])
+    multiple_results = responses.listing(item, result)
     return {"content": f"Found more than one result for "
                         f"'{item}': \n{multiple_results}"}
                             
-def _handle_single_card(result: Union[CollectibleCard, 
+def _handle_single_card(responses :ResponseCache,
+                        result: Union[CollectibleCard, 
                                 NonCollectibleCard], 
                         item :str,
                         request :Union[CardFetchRequest, 
                                 MetadataFetchRequest],                     
                         request_id: str) -> dict:
-    """Call `request.format(result)` to format the result of the API call and 
-    store the result in the local `response` variable
+    """Call `request.format(result)` to format the result of the API call, 
+    unless the response for the card is cached in `responses`, and store the
+    result in the local `response` variable
 
     Positional Arguments:
+        - responses : ResponseCache
+            - reference to the cache of formatted responses of the bot 
+            instance
+
         - result : CollectibleCard | NonCollectibleCard
             - the object returned by the hearthstone api guaranteed to be
             type CollectibleCard or NonCollectibleCard
@@ -145,9 +387,10 @@ def _handle_single_card(result: Union[CollectibleCard,
         with one key `'embed'` whose value is `response`
     """
     logger.info(f"{request_id} Fetch successful for "
-                f"{type(result).__name__}: {item}")
+                f"{type(result).__name__}: {item}", 
+                extra={"request_id" : request_id})
     
-    response = request.format(result)
+    response = responses.render(result, request.format)
 
     if type(response) is Embed:
         return {"embed":response}
@@ -156,15 +399,43 @@ def _handle_single_card(result: Union[CollectibleCard,
     
 class Bot(commands.Bot): 
     """A class that wraps `Discord.commands.Bot` with an `aiohttp.session` and 
-    `TTLCache`
+    `TieredCache`
 
     Attributes
         - http_session : aiohttp.ClientSession
             - the aiohttp session for the bot instance
-        - cache : Cache
-            - the ttlcache that stores card_dbfids as keys and CollectibleCard
-            or NonCollectibleCards as values
-            - max size of 128 and ttl of 10 minutes
+        - cache : TieredCache
+            - the cache shared with the hearthstone api functions, which 
+            stores card names and dbfIds under their `cache_key` with 
+            CollectibleCard, NonCollectibleCard, or MultipleCards as values
+            - holds `CARD_CACHE_SIZE` entries in memory that are fresh for
+            `CARD_CACHE_TTL` seconds
+            - expired entries are kept stale for `CARD_CACHE_STALE_TTL` 
+            seconds, served at once while they are refreshed in the 
+            background and for as long as refreshing fails
+            - backed by an on-disk `CardStore` when `CARD_STORE_PATH` is set
+        - responses : ResponseCache
+            - the cache of formatted card responses and ambiguous result 
+            listings
+        - negative_cache : NegativeCache
+            - the items that recently found no card, answered without calling
+            the API
+        - catalog : CardCatalog
+            - the in-memory index of every card, loaded in the background once
+            the bot is ready. `search_card_by_partial_name` answers requests 
+            from the catalog before falling back to the hearthstone api
+        - popularity : PopularitySketch
+            - the request counts of every item, saved periodically so the
+            most requested cards can be prefetched after a restart
+        - popularity_path : str
+            - the JSON file `popularity` is loaded from and saved to. `None`
+            disables saving
+        - message_concurrency : int
+            - the maximum number of items of one message fetched at once
+        - max_message_items : int
+            - the maximum number of items handled from one message
+        - max_message_length : int
+            - the maximum number of characters scanned in one message
         - token (property): str
             - the token needed to authenticate the discord bot
     
@@ -173,24 +444,54 @@ class Bot(commands.Bot):
             - creates an instance of the Bot
         - initialize
             - initializes the http_session, cache, and fetches the token
+        - start
+            - warm the connection pool, start the metrics endpoint, and start 
+            the parent Bot
         - close
             - call close on the parent Bot and close the http_session on the 
             child bot
         - on_ready (event)
-            - log that the bot is ready to handle requests
+            - log that the bot is ready to handle requests and start loading
+            and syncing the card catalog and prefetching the most requested 
+            cards
         - on_message (event) 
             - parse messages sent in the discord server and handle any 
             FetchRequests
         - _handle_requests (private)
             - handle the list of FetchRequests generated from parsing the
             discord message
+        - _fetch_item (private)
+            - fetch and format the response for one item of a FetchRequest
+        - _revalidate (private)
+            - refresh a stale item of the cache in the background
+        - _sync_catalog (private)
+            - periodically bring the card catalog up to date with the latest
+            patch
+        - _prefetch_popular (private)
+            - fetch the most requested items into the cache in the background
+        - _save_popularity (private)
+            - periodically save the popularity sketch
     """
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
     
         self.http_session :aiohttp.ClientSession = None
-        self.cache :Cache = None
+        self.cache :TieredCache = None
+        self.responses :ResponseCache = None
+        self.negative_cache :NegativeCache = None
+        self.catalog :CardCatalog = None
+        self.popularity :PopularitySketch = None
+        self.popularity_path :Optional[str] = None
+        self.message_concurrency :int = 4
+        self.max_message_items :int = MAX_ITEMS
+        self.max_message_length :int = MAX_LENGTH
         self.token :str = None
+        self._catalog_task :asyncio.Task = None
+        self._sync_task :asyncio.Task = None
+        self._prefetch_task :asyncio.Task = None
+        self._popularity_task :asyncio.Task = None
+        self._revalidations :Dict[str, asyncio.Task] = {}
+        self._metrics_runner :web.AppRunner = None
     
     @classmethod
     def create(cls, *args, **kwargs) -> "Bot":
@@ -205,17 +506,43 @@ class Bot(commands.Bot):
 
     def initialize(self) -> None:
         """Initialize the aiohttp client session and cache of the bot and fetch
-        its token
+        its token. The hearthstone api configuration is resolved here so that 
+        missing credentials fail at startup rather than on the first request
         
         Any exception is raised as a `StartUpError`
         """
         try:
-            self.http_session = aiohttp.ClientSession()
-            self.cache =  TTLCache(maxsize=128, ttl=600)
+            get_config()
+            self.http_session = _create_http_session()
+            self.cache = _create_cache()
+            self.responses = _create_response_cache()
+            self.negative_cache = _create_negative_cache()
+            set_negative_cache(_create_negative_cache())
+            self.catalog = get_catalog()
+            if settings.get_float("POPULARITY_SAVE_INTERVAL", 300) > 0:
+                self.popularity_path = settings.get_str("POPULARITY_PATH", 
+                                                        "popularity.json")
+            self.popularity = _load_popularity(self.popularity_path)
+            set_rate_limiter(_create_rate_limiter())
+            set_retry_policy(RetryPolicy(
+                attempts=settings.get_int("API_RETRY_ATTEMPTS", 3)))
+            set_circuit_breaker_options(
+                failure_threshold=settings.get_int("API_CIRCUIT_FAILURES", 5),
+                reset_timeout=settings.get_float("API_CIRCUIT_RESET", 30))
+            self.message_concurrency = settings.get_int("MESSAGE_CONCURRENCY",
+                                                        4)
+            self.max_message_items = settings.get_int("MAX_MESSAGE_ITEMS",
+                                                        MAX_ITEMS)
+            self.max_message_length = settings.get_int("MAX_MESSAGE_LENGTH",
+                                                        MAX_LENGTH)
             self._token = _get_bot_token()
         except Exception as e:
             raise StartUpError(e)
 
+        registry = metrics.get_registry()
+        registry.register_collector(_collect_api_stats)
+        registry.register_collector(self._collect_response_stats)
+
         logger.info("Bot initialized successfully!")
 
     @property
@@ -235,34 +562,252 @@ class Bot(commands.Bot):
         """Setter for the `token` property"""
         self._token = value
     
+    def _collect_response_stats(self) -> Iterator[tuple]:
+        """Yield the counters of `bot.responses` and `bot.negative_cache` as
+        metric samples
+        """
+        for name, value in self.responses.stats.items():
+            kind, result = name.split("_")
+            yield ("hs_bot_response_cache_total", "counter",
+                    "Hits and misses of the formatted response cache",
+                    {"kind" : kind, "result" : result}, value)
+        yield from _negative_cache_samples("bot", self.negative_cache.stats)
+
+    async def start(self, *args, **kwargs) -> None:
+        """Open connections to the hearthstone api in the background and 
+        start the metrics endpoint when `METRICS_PORT` is set, while the 
+        parent Bot logs in and connects to Discord
+        """
+        self.loop.create_task(self._warm_up())
+
+        port = settings.get_int("METRICS_PORT", 0)
+        if port:
+            host = settings.get_str("METRICS_HOST", "127.0.0.1")
+            self._metrics_runner = await metrics.start_server(host, port)
+            logger.info(f"Serving metrics at http://{host}:{port}/metrics")
+
+        await super().start(*args, **kwargs)
+
+    async def _warm_up(self) -> None:
+        """Open `HTTP_WARM_CONNECTIONS` connections to the hearthstone api"""
+        connections = settings.get_int("HTTP_WARM_CONNECTIONS", 2)
+        opened = await warm_up(self.http_session, connections)
+        logger.info(f"Opened {opened}/{connections} connections to the "
+                    "hearthstone api")
+
     async def close(self) -> None:
         """Close the Discord connection and aiohttp session"""
         logger.warning("Request to close bot received...")
+        logger.info(f"Request coalescing: {get_coalescing_stats()}")
+        logger.info(f"Rate limiting: {get_rate_limit_stats()}")
+        logger.info(f"Retries: {get_retry_stats()}")
         await super().close()
 
         if self.http_session:
             await self.http_session.close()
+
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+
+        for task in (self._catalog_task, self._sync_task, 
+                        self._prefetch_task, self._popularity_task):
+            if task:
+                task.cancel()
+        for task in self._revalidations.values():
+            task.cancel()
+        if self.popularity and self.popularity_path:
+            try:
+                self.popularity.save(self.popularity_path)
+            except OSError as e:
+                logger.warning(f"Popularity sketch failed to save: {e!r}")
+
+        if self.cache:
+            self.cache.close()
     
 
     async def on_ready(self) -> None:
         """Event that logs the `bot.user.name` and `bot.user.id` when the bot 
-        client is done preparing the data received from Discord
+        client is done preparing the data received from Discord and starts
+        loading and syncing the card catalog, prefetching the most requested
+        cards, and saving the popularity sketch in the background. `on_ready`
+        can fire again after a reconnect, so each task is only started once
         """
         logger.info('Logging in USER: ' + self.user.name 
                 + ' ID: ' + str(self.user.id))
 
+        if self._catalog_task is None:
+            self._catalog_task = self.loop.create_task(self._load_catalog())
+        if self._sync_task is None:
+            self._sync_task = self.loop.create_task(self._sync_catalog())
+        if self._prefetch_task is None:
+            self._prefetch_task = self.loop.create_task(
+                self._prefetch_popular())
+        if self._popularity_task is None:
+            self._popularity_task = self.loop.create_task(
+                self._save_popularity())
+
+    async def _load_catalog(self) -> None:
+        """Load every card into `bot.catalog` as a background request. A 
+        failure is logged and leaves the bot answering requests from the 
+        hearthstone api
+
+        With an on-disk store the cards are read from the store when another
+        process or an earlier run stored them, so shards sharing a store 
+        fetch the /cards endpoint once between them
+        """
+        logger.info("Loading card catalog...")
+        try:
+            with request_priority(Priority.BACKGROUND):
+                await self.catalog.load(self.http_session)
+        except APIException as e:
+            logger.warning("Card catalog failed to load: " + repr(e))
+            return
+
+        logger.info(f"Card catalog loaded: {self.catalog}")
+
+    async def _sync_catalog(self) -> None:
+        """Sync `bot.catalog` with the /info endpoint every 
+        `CATALOG_SYNC_INTERVAL` seconds as a background request, once the
+        catalog has loaded. After a patch only the sets that may have changed
+        are fetched, and the cached searches and the cached results and 
+        formatted responses of cards that changed are invalidated. A catalog
+        that failed to load is loaded again instead, and a failed sync is 
+        logged and retried at the next interval
+
+        Settings:
+            - CATALOG_SYNC_INTERVAL : float
+                - seconds between syncs. `0` disables syncing. Default 3600
+        """
+        interval = settings.get_float("CATALOG_SYNC_INTERVAL", 3600)
+        if interval <= 0:
+            return
+
+        await asyncio.shield(self._catalog_task)
+        registry = metrics.get_registry()
+        while True:
+            if not self.catalog.loaded:
+                await self._load_catalog()
+            if self.catalog.loaded:
+                try:
+                    with request_priority(Priority.BACKGROUND):
+                        changes = await self.catalog.sync(self.http_session)
+                    outcome = "updated" if changes.changed else "unchanged"
+                except APIException as e:
+                    logger.warning(f"Card catalog failed to sync: {e!r}")
+                    outcome = "failed"
+                else:
+                    if changes.changed:
+                        self.negative_cache.clear()
+                        self.responses.invalidate(changes.queries)
+                        logger.info(f"Card catalog synced to patch "
+                                    f"{changes.patch}: {changes.added} added,"
+                                    f" {changes.updated} updated, "
+                                    f"{changes.removed} removed from "
+                                    f"{len(changes.sets)} sets")
+                registry.inc("hs_bot_catalog_syncs_total",
+                                help="Syncs of the card catalog with the "
+                                        "hearthstone api",
+                                result=outcome)
+            await asyncio.sleep(interval)
+
+    async def _prefetch_popular(self) -> None:
+        """Fetch the most requested items recorded in `bot.popularity` into 
+        `bot.cache` as background requests, so that the first requests after
+        a restart hit the cache. Prefetching waits for the catalog to load,
+        which answers most items without calling the hearthstone api, skips
+        items already cached, and stops once the rate limiter rejects a 
+        request
+
+        Settings:
+            - PREFETCH_POPULAR : int
+                - the number of items prefetched, at most the size of the 
+                cache. `0` disables prefetching. Default 50
+            - PREFETCH_CONCURRENCY : int
+                - the maximum number of items fetched at once. Default 2
+        """
+        count = min(settings.get_int("PREFETCH_POPULAR", 50), 
+                    self.cache.maxsize)
+        items = self.popularity.top(count) if count > 0 else []
+        if not items:
+            return
+
+        await asyncio.shield(self._catalog_task)
+        request = CardFetchRequest(items)
+        semaphore = asyncio.Semaphore(settings.get_int("PREFETCH_CONCURRENCY",
+                                                        2))
+        fetched = 0
+
+        async def prefetch(item :str) -> None:
+            nonlocal fetched
+            async with semaphore:
+                if self.cache.get(cache_key("/cards/search", item)):
+                    return
+                try:
+                    await request.API(self.http_session, item)
+                    fetched += 1
+                except RateLimitExceeded:
+                    raise
+                except APIException as e:
+                    logger.debug(f"Prefetching {item} failed: {e!r}")
+
+        start = time.monotonic()
+        with request_priority(Priority.BACKGROUND):
+            prefetches = [self.loop.create_task(prefetch(item))
+                            for item in request.items]
+            try:
+                await asyncio.gather(*prefetches)
+            except RateLimitExceeded as e:
+                logger.warning(f"Prefetching stopped by the rate limiter: "
+                                f"{e!r}")
+            finally:
+                for task in prefetches:
+                    task.cancel()
+
+        logger.info(f"Prefetched {fetched} of the {len(request.items)} most "
+                    f"requested items in {time.monotonic() - start:.1f}s")
+
+    async def _save_popularity(self) -> None:
+        """Save `bot.popularity` to `bot.popularity_path` every 
+        `POPULARITY_SAVE_INTERVAL` seconds, halving its counts once a day so
+        that recent requests outweigh old ones. The file is written off the
+        event loop
+
+        Settings:
+            - POPULARITY_PATH : str
+                - the JSON file the sketch is saved to. Default 
+                popularity.json
+            - POPULARITY_SAVE_INTERVAL : float
+                - seconds between saves. `0` disables saving. Default 300
+        """
+        interval = settings.get_float("POPULARITY_SAVE_INTERVAL", 300)
+        if self.popularity_path is None or interval <= 0:
+            return
+
+        while True:
+            await asyncio.sleep(interval)
+            if time.time() - self.popularity.decayed_at >= \
+                    _POPULARITY_HALF_LIFE:
+                self.popularity.decay()
+            try:
+                await self.loop.run_in_executor(None, write_sketch, 
+                                                self.popularity.to_dict(), 
+                                                self.popularity_path)
+            except OSError as e:
+                logger.warning(f"Popularity sketch failed to save: {e!r}")
+
     async def on_message(self, message: Message) -> None:
         """Event responds to a :class:`Discord.Message` being created and sent
         
-        if the message is found to be a valid fetch request to be handled by
-        the bot, a `request_id` will be generated and the message will be 
-        parsed. When the message is parsed, a :class:`FetchRequest` object will
-        be created for each valid fetch request found in message.
+        Messages without an opening bracket are ignored before any other 
+        work is done. Otherwise the message is scanned once, and if it
+        contains valid fetch requests a `request_id` will be generated. When 
+        the message is parsed, a :class:`FetchRequest` object will be created 
+        for each type of valid fetch request found in message.
         
         These objects have as attributes: 
             - a corresponding API callable 
             - a formatting callable 
-            - a set of strings that represent values to be passed to the API
+            - a list of strings that represent values to be passed to the API
             callable 
             
         The list of :class:`FetchRequest` objects is then passed to 
@@ -283,21 +828,26 @@ class Bot(commands.Bot):
 
         Any `Discord.Excpetion` raised is logged and calls `bot.close()`
         """
-        if message.author == self.user:
+        if (message.author == self.user or 
+                not has_request_brackets(message.content)):
             return
-        try: 
-            request_id = str(uuid.uuid1())       
-            if is_valid_request_str(message.content):        
-                logger.info(f"{request_id} Fetch message recieved: "
+        try:
+            with metrics.get_registry().timer("parse"):
+                fetch_requests = parse_message(message, 
+                                                self.max_message_items,
+                                                self.max_message_length)
+        except NoValidRequests:
+            return
+        except ParserException as e:
+            logger.warning(f"{e.exception!r} raised while parsing: "
                             f"{message.content}")
-                try:
-                    fetch_requests = parse_message(message)
-                except ParserException as e:
-                    logger.warning(request_id + " " + e.exception + " raised")
-                    return
+            return
 
-                await self._handle_requests(message, 
-                                            fetch_requests, request_id)    
+        request_id = str(uuid.uuid1())
+        logger.info(f"{request_id} Fetch message recieved: "
+                    f"{message.content}", extra={"request_id" : request_id})
+        try: 
+            await self._handle_requests(message, fetch_requests, request_id)
         except DiscordException as e:
             logger.error(request_id + " " + repr(e))
             await self.close()
@@ -307,8 +857,10 @@ class Bot(commands.Bot):
                                                     MetadataFetchRequest]],
                                 request_id :str) -> None:
         """Handle the list of `FetchRequest` objects created when parsing the 
-        `message.content` by calling `request.API` and passing the `item` for 
-        each `item` in `requests.items` 
+        `message.content` by calling `_fetch_item` for each `item` in 
+        `requests.items`. Items are fetched concurrently, at most 
+        `bot.message_concurrency` at a time, so the message waits on its 
+        slowest item rather than the sum of all of them
 
         Positional Arguments:
             -  message: Discord.Message:
@@ -323,28 +875,168 @@ class Bot(commands.Bot):
                 - the string representation of the uuid that denotes a valid
                 request made by a user and being handled by the bot
 
-        The response of `_handle_api_results` for each request is then passed 
-        to `message.channel.send(**response)` to send the response to the 
-        channel from which `message` is called
+        The response for each item is then passed to 
+        `message.channel.send(**response)` in the order the items appear in 
+        `requests`, to send the response to the channel from which `message` is
+        called. If sending fails, the remaining fetches are cancelled
         """
+        semaphore = asyncio.Semaphore(self.message_concurrency)
+        fetches = []
         for request in requests:
-            logger.info(f'{request_id} Executing request: {request}')
+            logger.info(f'{request_id} Executing request: {request}',
+                        extra={"request_id" : request_id})
             for item in request.items:
-                result = self.cache.get(item, None)
-                if not result:
-                    logger.info(f'{request_id} Fetching {item}')
-                    try: 
-                        result = await request.API(self.http_session, item)
-                    except APIException as e:
-                        logger.warning(request_id + " " + repr(e) + " raised")
-                        continue
-                try:
-                    response = _handle_api_results(self.cache, result, item,
-                                                    request, request_id)
-                except FormattingException as e:
-                    logger.warning(request_id + " " + repr(e) + " raised")
-                    response = {"content" : e}
+                self.popularity.record(item)
+                fetches.append(self.loop.create_task(
+                    self._fetch_item(request, item, semaphore, request_id)))
+
+        try:
+            for fetch in fetches:
+                response = await fetch
+                if response is not None:
+                    with metrics.get_registry().timer("send"):
+                        await message.channel.send(**response)
+        finally:
+            for fetch in fetches:
+                fetch.cancel()
 
-                await message.channel.send(**response)
+    async def _fetch_item(self, request :Union[CardFetchRequest, 
+                                                MetadataFetchRequest],
+                            item :str, semaphore :asyncio.Semaphore,
+                            request_id :str) -> Optional[dict]:
+        """Return the response for a single `item` of `request`. The item is
+        read from `bot.cache` or fetched by calling `request.API` while 
+        holding `semaphore`, which stores the result in `bot.cache`. A stale
+        result is returned at once and refreshed in the background. An item
+        that recently found no card is answered from `bot.negative_cache`
+        without calling the API
+
+        Positional Arguments:
+            - request : CardFetchRequest | MetadataFetchRequest
+                - an object that represents the type of request made by the 
+                user
+
+            - item : str
+                - the argument passed to `request.API`
+
+            - semaphore : asyncio.Semaphore
+                - bounds the number of concurrent fetches for one message
+
+            - request_id : str
+                - the string representation of the uuid that denotes a valid
+                request made by a user and being handled by the bot
+
+        Any exception raised while fetching is logged and isolated to this
+        item
+
+        Returns:
+            the result of `_handle_api_results` or `None` if the item could
+            not be fetched
+        """
+        registry = metrics.get_registry()
+        key = cache_key("/cards/search", item)
+        try:
+            with registry.timer("cache"):
+                entry = self.cache.lookup(key)
+                result = entry.value if entry is not None else None
+                stale = entry is not None and not self.cache.is_fresh(entry)
+            registry.inc("hs_bot_cache_total", 
+                            help="Lookups of the card cache of the bot",
+                            result="miss" if result is None else 
+                                    "stale" if stale else "hit")
+            if stale:
+                self._revalidate(request, item, key)
+            elif result is None:
+                self.negative_cache.check(normalize_query(item))
+                logger.info(f'{request_id} Fetching {item}',
+                            extra={"request_id" : request_id})
+                async with semaphore:
+                    with registry.timer("api", 
+                                        endpoint=request.API.__name__) as api:
+                        try:
+                            result = await request.API(self.http_session, 
+                                                        item)
+                        except NoCardFound as e:
+                            self.negative_cache.add(normalize_query(item), e)
+                            raise
+                logger.info(f"{request_id} Fetched {item} in "
+                            f"{api.elapsed:.3f}s", 
+                            extra={"request_id" : request_id, "stage" : "api",
+                                    "duration" : api.elapsed})
+        except APIException as e:
+            logger.warning(request_id + " " + repr(e) + " raised")
+            return None
+        except Exception as e:
+            logger.error(f"{request_id} Fetching {item} failed: {e!r}")
+            return None
+
+        try:
+            with registry.timer("format"):
+                return _handle_api_results(self.cache, self.responses, result,
+                                            item, request, request_id)
+        except FormattingException as e:
+            logger.warning(request_id + " " + repr(e) + " raised")
+            return {"content" : e}
+
+    def _revalidate(self, request :Union[CardFetchRequest, 
+                                            MetadataFetchRequest],
+                    item :str, key :str) -> None:
+        """Refresh the stale `item`, stored under `key` in `bot.cache`, as a
+        background request unless a refresh of it is already running, and
+        drop the responses formatted from the stale result. When the refresh
+        fails the stale result stays cached and is served until a refresh 
+        succeeds or it leaves the cache
+        """
+        if key in self._revalidations:
+            return
+
+        async def refresh() -> None:
+            registry = metrics.get_registry()
+            try:
+                with request_priority(Priority.BACKGROUND):
+                    result = await request.API(self.http_session, item)
+                self.responses.invalidate(_result_queries(item, result))
+                outcome = "refreshed"
+            except Exception as e:
+                logger.warning(f"Refreshing {item} failed, serving the stale "
+                                f"result: {e!r}")
+                outcome = "failed"
+            finally:
+                del self._revalidations[key]
+            registry.inc("hs_bot_cache_revalidations_total",
+                            help="Background refreshes of stale cache entries",
+                            result=outcome)
+
+        self._revalidations[key] = self.loop.create_task(refresh())
+
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """A :class:`Bot` that runs the range of shards given by `shard_ids` out
+    of `shard_count` in one process, launched by :mod:`shards`. The shards 
+    of every process share the card store at `CARD_STORE_PATH`, and each 
+    process gets an equal share of the api rate limits
+
+    Optional Arguments:
+        - process_count : int
+            - the number of processes sharing the api quota. Default 1
+
+    Attributes:
+        - process_count : int
+            - the number of processes sharing the api quota
+    """
+    def __init__(self, *args, process_count :int=1, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.process_count = process_count
+
+    def initialize(self) -> None:
+        """Initialize the bot and limit its requests to its share of the api
+        rate limits
+        
+        Any exception is raised as a `StartUpError`
+        """
+        super().initialize()
+        try:
+            set_rate_limiter(_create_rate_limiter(1 / self.process_count))
+        except Exception as e:
+            raise StartUpError(e)
 
-       
\ No newline at end of file
+        logger.info(f"Running shards {self.shard_ids} of {self.shard_count}")
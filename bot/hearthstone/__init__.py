@@ -1,16 +1,80 @@
-"""A basic wrapper for the Hearthstone API: 
+"""A basic wrapper for the Hearthstone API:
 https://rapidapi.com/omgvamp/api/hearthstone/
+
+Importing the package does no work. Each name below is imported from its
+module on first access, and the api configuration is resolved on the first
+request, see `configure`
 """
 
 all = [
-    "hearthstone", 
-    "errors", 
+    "hearthstone",
+    "errors",
+    "_api",
     "_card",
+    "_cache",
+    "_catalog",
+    "_store",
+    "_search",
+    "_stream",
+    "_coalesce",
+    "_negative",
+    "_ratelimit",
+    "_retry",
+    "_session",
 ]
 
-from .hearthstone import *
-from .errors import *
-from ._card import *
+#The public names of the package and the module that defines each of them
+_EXPORTS = {
+    "hearthstone" : (
+        "fetch_info", "fetch_cards", "fetch_cards_by_class",
+        "fetch_cards_by_race", "fetch_card_set", "fetch_cards_by_quality",
+        "fetch_cardbacks", "fetch_card_by_partial_name",
+        "fetch_cards_by_faction", "fetch_cards_by_type", "fetch_all_cards",
+        "stream_all_cards",
+        "set_rate_limiter", "get_rate_limit_stats", "set_retry_policy",
+        "set_circuit_breaker_options", "get_retry_stats",
+        "get_coalescing_stats", "get_response_stats", "set_cache",
+        "get_cache", "get_cache_stats", "set_negative_cache",
+        "get_negative_cache", "get_negative_cache_stats",
+    ),
+    "errors" : (
+        "APIException", "InvalidArgument", "HTTPException", "APIServerError",
+        "NoCardFound", "RateLimitExceeded", "APIConnectionError",
+        "CircuitOpen",
+    ),
+    "_api" : ("configure", "get_config"),
+    "_card" : ("CollectibleCard", "NonCollectibleCard", "MultipleCards",
+                "Cardback"),
+    "_cache" : ("cache_key", "CacheEntry", "CacheTier", "MemoryTier",
+                "StoreTier", "TieredCache"),
+    "_catalog" : ("CardCatalog", "CatalogChanges", "get_catalog",
+                    "search_card_by_partial_name"),
+    "_store" : ("CardStore",),
+    "_search" : ("TrigramIndex",),
+    "_stream" : ("CardStreamDecoder",),
+    "_coalesce" : ("RequestCoalescer",),
+    "_negative" : ("NegativeCache",),
+    "_ratelimit" : ("Priority", "RateLimiter", "request_priority",
+                    "get_request_priority"),
+    "_retry" : ("RetryPolicy", "CircuitBreaker"),
+    "_session" : ("create_session", "warm_up"),
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items()
+                for name in names}
+
+__all__ = tuple(_MODULE_OF)
+
+def __getattr__(name :str):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
 
+    return value
 
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,42 +1,124 @@
+"""Module that resolves the configuration of the Hearthstone API
 
-"""Module that loads environment variables for the Hearthstone API
+Nothing is read when the module is imported. The configuration is resolved
+on the first call to `get_config`, which happens on the first request made
+by the client, from the arguments passed to `configure`, then environment
+variables, then the `.env` file in the root of /hearthstone
 
-GLOBALS:
-    ENV : dict
-        API_URI - Base URL for the Hearthstone API
-        API_KEY - Key included in headers of requests to Hearthstone API
-        API_HOST - Host URL included in headers of requests to Hearthstone API
+CONFIGURATION:
+    API_URI - Base URL for the Hearthstone API. Read from the optional
+    RAPID_API_URI variable, E.G: to use a local mock server
+    API_KEY - Key included in headers of requests to Hearthstone API. Read
+    from the RAPID_API_KEY variable
+    API_HOST - Host URL included in headers of requests to Hearthstone API.
+    Read from the RAPID_API_HOST variable
 
-    A .env file must exist in the root of /hearthstone containing the 
-    RAPID_API_KEY and RAPID_API_HOST variables. Users should go to
-    'https://rapidapi.com/omgvamp/api/hearthstone/' and register to recieve
-    these values.
+    Users should go to 'https://rapidapi.com/omgvamp/api/hearthstone/' and
+    register to recieve the RAPID_API_KEY and RAPID_API_HOST values.
 """
 
-all = ['ENV']
+__all__ = (
+    "configure",
+    "get_config",
+)
 
-from os import environ, path
-from dotenv import load_dotenv
+from os import environ
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from .errors import APIException
 
-_env_file_path = str(Path(__file__).parent.resolve()) + "\.env"
-if not path.exists(_env_file_path):
-    raise APIException("Could not find .env file for hearthstone API. A "
-                        ".env file with 'RAPID_API_KEY', 'RAPID_API_HOST' in "
-                        "the root of the hearthstone package is missing.")
-else:
-    load_dotenv(dotenv_path=_env_file_path)
-
-try:
-    ENV = {
-        "API_URI" : "https://omgvamp-hearthstone-v1.p.rapidapi.com",
-        "API_KEY" : environ["RAPID_API_KEY"],
-        "API_HOST" : environ["RAPID_API_HOST"],
+_DEFAULT_URI = "https://omgvamp-hearthstone-v1.p.rapidapi.com"
+
+#`.env` in the package, then the file the package has always read, which is
+#a sibling of the package named `hearthstone\.env` outside of Windows
+_ENV_FILES = (
+    Path(__file__).parent / ".env",
+    Path(str(Path(__file__).parent.resolve()) + "\\.env"),
+)
+
+_overrides :Dict[str, str] = {}
+_config :Optional[Dict[str, str]] = None
+#The base URL and headers of every request, built with `_config`
+_request_config :Optional[Tuple[str, Dict[str, str]]] = None
+
+def configure(api_uri :Optional[str]=None, api_key :Optional[str]=None,
+                api_host :Optional[str]=None) -> None:
+    """Set the configuration of the Hearthstone API explicitly. Values that
+    are `None` are resolved from the environment on first use. Takes effect
+    for requests made after the call
+
+    Optional Arguments:
+        - api_uri : str
+            - the base URL of the api
+        - api_key : str
+            - the RapidAPI key sent with every request
+        - api_host : str
+            - the RapidAPI host sent with every request
+    """
+    global _config, _request_config
+    values = {"API_URI" : api_uri, "API_KEY" : api_key, "API_HOST" : api_host}
+    _overrides.update({k: v for k, v in values.items() if v is not None})
+    _config = _request_config = None
+
+def _load_env_file() -> None:
+    """Load the first `.env` file that exists into the environment, without
+    replacing variables that are already set
+    """
+    for env_file in _ENV_FILES:
+        if env_file.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path=env_file)
+            return
+
+def get_config() -> Dict[str, str]:
+    """Return the `API_URI`, `API_KEY`, and `API_HOST` of the Hearthstone API,
+    resolving them on the first call
+
+    Raises an `APIException` if the key or host cannot be found
+    """
+    global _config, _request_config
+    if _config is not None:
+        return _config
+
+    if not {"API_KEY", "API_HOST"} <= _overrides.keys():
+        _load_env_file()
+
+    config = {
+        "API_URI" : environ.get("RAPID_API_URI", _DEFAULT_URI),
+        "API_KEY" : environ.get("RAPID_API_KEY"),
+        "API_HOST" : environ.get("RAPID_API_HOST"),
     }
-except KeyError as e:
-    raise APIException(f"{e} required but not found in .env")
+    config.update(_overrides)
+    missing = [f"RAPID_{key}" for key in ("API_KEY", "API_HOST")
+                if not config[key]]
+    if missing:
+        raise APIException(f"{', '.join(missing)} required but not found. "
+                            "Set them in the environment, in a .env file in "
+                            "the root of the hearthstone package, or with "
+                            "hearthstone.configure()")
+
+    _config = config
+    _request_config = (config["API_URI"], {
+        'x-rapidapi-host': config["API_HOST"], 
+        'x-rapidapi-key' : config["API_KEY"]
+    })
+    return _config
 
+def get_request_config() -> Tuple[str, Dict[str, str]]:
+    """Return the base URL of the Hearthstone API and the RapidAPI headers
+    sent with every request. Both are built once when the configuration is
+    resolved and shared by every request, so the headers must not be 
+    modified
 
+    Raises an `APIException` if the key or host cannot be found
+    """
+    if _request_config is None:
+        get_config()
 
+    return _request_config
 
+def __getattr__(name :str):
+    #`ENV` was resolved at import time before configuration became lazy
+    if name == "ENV":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,540 @@
+__all__ = (
+    "cache_key",
+    "CacheEntry",
+    "CacheTier",
+    "MemoryTier",
+    "StoreTier",
+    "TieredCache",
+)
+
+import asyncio
+import time
+from abc import ABCMeta, abstractmethod
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional
+from typing import Iterable, Sequence, Tuple
+from cachetools import LRUCache
+from ._card import MultipleCards, _Card
+from ._parser import normalize_query
+from ._store import CardStore
+
+def cache_key(endpoint :str, *args :Any, **params :Any) -> str:
+    """Return the canonical cache key of a request to `endpoint` with the
+    arguments `args` and query parameters `params`. Arguments and parameters
+    are normalized and the locale defaults to `enUS`, so that equivalent
+    requests share one key, E.G: `/cards/search|ysera|locale=enus`
+
+    Positional Arguments:
+        - endpoint : str
+            - the endpoint without its arguments, E.G: `/cards/search`
+        - args : Any
+            - the arguments of the endpoint, E.G: a card name
+        - params : Any
+            - the query parameters of the request
+    """
+    params.setdefault("locale", "enUS")
+    parts = [endpoint]
+    parts.extend(normalize_query(arg) for arg in args)
+    parts.extend(f"{name}={normalize_query(value)}"
+                    for name, value in sorted(params.items()))
+
+    return "|".join(parts)
+
+class CacheEntry(NamedTuple):
+    """A cached value and the time, in seconds since the epoch, it was
+    stored
+    """
+    value :Any
+    stored :float
+
+class CacheTier(metaclass=ABCMeta):
+    """An abstract level of a :class:`TieredCache`. A tier holds entries up
+    to its own size budget; how long an entry is served is decided by the
+    :class:`TieredCache`
+
+    Attributes:
+        - name : str
+            - identifies the tier in the stats of the cache
+        - maxsize : int
+            - the maximum number of entries of the tier
+        - shared : bool
+            - `True` if other processes read and write the tier, in which
+            case it also provides leases so that a key is fetched by one
+            process at a time
+    """
+    name = "tier"
+    maxsize = 0
+    shared = False
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def get(self, key :str) -> Optional[CacheEntry]:
+        """Return the entry stored under `key` or `None`"""
+
+    @abstractmethod
+    def set(self, key :str, entry :CacheEntry) -> None:
+        """Store `entry` under `key`"""
+
+    def set_many(self, entries :Iterable[Tuple[str, CacheEntry]]) -> None:
+        """Store each `(key, entry)` of `entries`. Tiers that pay for each
+        write override this to store them at once
+        """
+        for key, entry in entries:
+            self.set(key, entry)
+
+    @abstractmethod
+    def delete(self, key :str) -> None:
+        """Delete the entry stored under `key` if there is one"""
+
+    @abstractmethod
+    def delete_prefix(self, prefix :str) -> int:
+        """Delete every entry whose key starts with `prefix` and return the
+        number deleted
+        """
+
+    def stored_at(self, key :str) -> Optional[float]:
+        """Return the time the entry under `key` was stored, or `None`. 
+        Tiers that decode their entries on read override this with a read of
+        the time alone
+        """
+        entry = self.get(key)
+        return entry.stored if entry is not None else None
+
+    def recent(self, limit :int, 
+                prefix :str="") -> List[Tuple[str, CacheEntry]]:
+        """Return up to `limit` of the most recently stored entries whose key
+        starts with `prefix`, most recent first. Tiers that do not outlive 
+        the process return none
+        """
+        return []
+
+    def acquire_lease(self, key :str, ttl :float) -> bool:
+        """Take the lease on `key` for `ttl` seconds"""
+        return True
+
+    def release_lease(self, key :str) -> None:
+        """Give up the lease on `key`"""
+
+    def is_leased(self, key :str) -> bool:
+        """Return `True` if another owner holds the lease on `key`"""
+        return False
+
+    def close(self) -> None:
+        """Release the resources held by the tier"""
+
+class MemoryTier(CacheTier):
+    """An in-process tier that evicts the least recently used entry once it
+    holds `maxsize` entries
+
+    Optional Arguments:
+        - maxsize : int
+            - the maximum number of entries
+    """
+    name = "memory"
+
+    def __init__(self, maxsize :int=1024) -> None:
+        self.maxsize = maxsize
+        self._entries = LRUCache(maxsize=maxsize)
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(MAXSIZE: {})".format(cls, self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key :str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def set(self, key :str, entry :CacheEntry) -> None:
+        self._entries[key] = entry
+
+    def delete(self, key :str) -> None:
+        self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix :str) -> int:
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+
+        return len(keys)
+
+class StoreTier(CacheTier):
+    """A tier on disk backed by a :class:`CardStore`, which survives a
+    restart and may be shared by several processes. Only card results are
+    stored; other values are kept by the tiers above it alone
+
+    Positional Arguments:
+        - store : CardStore
+            - the store of the tier
+
+    Attributes:
+        - store : CardStore
+            - the store of the tier
+    """
+    name = "store"
+    shared = True
+
+    def __init__(self, store :CardStore) -> None:
+        self.store = store
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}({})".format(cls, self.store)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def maxsize(self) -> int:
+        """Getter for the `maxsize` property"""
+        return self.store.max_entries
+
+    def get(self, key :str) -> Optional[CacheEntry]:
+        row = self.store.lookup(key)
+        return CacheEntry(*row) if row is not None else None
+
+    def set(self, key :str, entry :CacheEntry) -> None:
+        if isinstance(entry.value, (MultipleCards, _Card)):
+            self.store.set(key, entry.value)
+
+    def set_many(self, entries :Iterable[Tuple[str, CacheEntry]]) -> None:
+        self.store.set_many((key, entry.value) for key, entry in entries
+                            if isinstance(entry.value, (MultipleCards, _Card)))
+
+    def delete(self, key :str) -> None:
+        self.store.delete(key)
+
+    def delete_prefix(self, prefix :str) -> int:
+        return self.store.delete_prefix(prefix)
+
+    def stored_at(self, key :str) -> Optional[float]:
+        return self.store.stored_at(key)
+
+    def recent(self, limit :int, 
+                prefix :str="") -> List[Tuple[str, CacheEntry]]:
+        entries = []
+        for key, value in self.store.recent(limit, prefix):
+            stored = self.store.stored_at(key)
+            if stored is not None:
+                entries.append((key, CacheEntry(value, stored)))
+
+        return entries
+
+    def acquire_lease(self, key :str, ttl :float) -> bool:
+        return self.store.acquire_lease(key, ttl)
+
+    def release_lease(self, key :str) -> None:
+        self.store.release_lease(key)
+
+    def is_leased(self, key :str) -> bool:
+        return self.store.is_leased(key)
+
+    def close(self) -> None:
+        self.store.close()
+
+class TieredCache:
+    """The cache of the hearthstone package, shared by the API functions and
+    their callers. Lookups go through `tiers` in order, E.G: memory then
+    disk, and an entry found in a lower tier is copied into the tiers above
+    it. Writes go to every tier
+
+    Every tier follows one policy: an entry is fresh for `ttl` seconds after
+    it is stored, then stale for `stale_ttl` seconds, then dropped. Stale
+    entries are returned by `lookup` so that callers can serve them while
+    they are refreshed, but never by `fetch`
+
+    Positional Arguments:
+        - tiers : Sequence[CacheTier]
+            - the tiers of the cache, fastest first
+
+    Optional Arguments:
+        - ttl : float
+            - the seconds an entry is fresh
+        - stale_ttl : float
+            - the seconds an entry is kept after it stops being fresh
+
+    Attributes:
+        - tiers : List[CacheTier]
+            - the tiers of the cache, fastest first
+        - ttl : float
+            - the seconds an entry is fresh
+        - stale_ttl : float
+            - the seconds an entry is kept after it stops being fresh
+        - maxsize (property) : int
+            - the maximum number of entries of the fastest tier
+        - stats (property) : dict
+            - the hits of each tier, stale hits, misses, writes, and
+            invalidated entries
+
+    Methods:
+        - lookup
+            - return the fresh or stale entry for a key
+        - get
+            - return the fresh or stale value for a key
+        - is_fresh
+            - return whether an entry is fresh
+        - set
+            - store a value in every tier
+        - set_many
+            - store several values in every tier at once
+        - fetch
+            - return the fresh value for a key or fetch and store it, once
+            across every process sharing a tier
+        - invalidate
+            - delete the entry for a key from every tier
+        - invalidate_prefix
+            - delete every entry whose key starts with a prefix
+        - clear
+            - delete every entry from every tier
+        - warm
+            - copy the most recently stored entries into the tiers above
+            the tier they were found in
+        - close
+            - release the resources of every tier
+    """
+    def __init__(self, tiers :Sequence[CacheTier], ttl :float=600.0,
+                    stale_ttl :float=0.0) -> None:
+        if not tiers:
+            raise ValueError("'tiers' must contain at least one tier")
+        self.tiers = list(tiers)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._counters = {f"{tier.name}_hits" : 0 for tier in self.tiers}
+        self._counters.update(dict.fromkeys(("stale_hits", "misses", "sets",
+                                                "invalidations"), 0))
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(TIERS: {}, TTL: {}, STALE_TTL: {})" \
+                .format(cls, self.tiers, self.ttl, self.stale_ttl)
+
+    def __len__(self) -> int:
+        return len(self.tiers[0])
+
+    @property
+    def maxsize(self) -> int:
+        """Getter for the `maxsize` property"""
+        return self.tiers[0].maxsize
+
+    @property
+    def stats(self) -> dict:
+        """Getter for the `stats` property"""
+        return dict(self._counters)
+
+    def is_fresh(self, entry :CacheEntry) -> bool:
+        """Return `True` if `entry` was stored less than `ttl` seconds ago"""
+        return time.time() - entry.stored < self.ttl
+
+    def _is_kept(self, entry :CacheEntry) -> bool:
+        return time.time() - entry.stored < self.ttl + self.stale_ttl
+
+    def _promote(self, key :str, entry :CacheEntry,
+                    tiers :Sequence[CacheTier]) -> None:
+        for tier in tiers:
+            tier.set(key, entry)
+
+    def lookup(self, key :str, local :bool=True) -> Optional[CacheEntry]:
+        """Return the fresh or stale entry for `key`, or `None`. Entries
+        past `stale_ttl` are deleted from the tier they are found in
+
+        Optional Arguments:
+            - local : bool
+                - copy an entry found in a shared tier into the tiers of
+                this process. Default True
+        """
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is None:
+                continue
+            if not self._is_kept(entry):
+                tier.delete(key)
+                continue
+
+            self._counters[f"{tier.name}_hits"] += 1
+            if not self.is_fresh(entry):
+                self._counters["stale_hits"] += 1
+            self._promote(key, entry, [upper for upper in self.tiers[:i]
+                                        if local or upper.shared])
+            return entry
+
+        self._counters["misses"] += 1
+        return None
+
+    def _lookup_fresh(self, key :str, local :bool) -> Optional[CacheEntry]:
+        """Return the fresh entry for `key`, or `None`. The time each tier 
+        stored the key is checked before its entry is read, so a stale entry
+        is never decoded
+        """
+        for i, tier in enumerate(self.tiers):
+            stored = tier.stored_at(key)
+            if stored is None or time.time() - stored >= self.ttl:
+                continue
+            entry = tier.get(key)
+            if entry is None:
+                continue
+
+            self._counters[f"{tier.name}_hits"] += 1
+            self._promote(key, entry, [upper for upper in self.tiers[:i]
+                                        if local or upper.shared])
+            return entry
+
+        self._counters["misses"] += 1
+        return None
+
+    def get(self, key :str, default :Any=None) -> Any:
+        """Return the fresh or stale value for `key`, or `default`"""
+        entry = self.lookup(key)
+        return entry.value if entry is not None else default
+
+    def set(self, key :str, value :Any, local :bool=True,
+            shared :bool=True) -> None:
+        """Store `value` under `key` in every tier
+
+        Optional Arguments:
+            - local : bool
+                - also store `value` in the tiers of this process, which is
+                not wanted for large values kept elsewhere. Default True
+            - shared : bool
+                - also store `value` in the tiers shared with other 
+                processes, which is not wanted for values every process can
+                build cheaply. Default True
+        """
+        entry = CacheEntry(value, time.time())
+        for tier in self.tiers:
+            if (local or tier.shared) and (shared or not tier.shared):
+                tier.set(key, entry)
+        self._counters["sets"] += 1
+
+    def set_many(self, items :Iterable[Tuple[str, Any]], local :bool=True,
+                    shared :bool=True) -> None:
+        """Store each `(key, value)` of `items` in every tier, writing each
+        tier once, E.G: in one transaction of the on-disk store. The 
+        optional arguments are those of `set`
+        """
+        now = time.time()
+        entries = [(key, CacheEntry(value, now)) for key, value in items]
+        for tier in self.tiers:
+            if (local or tier.shared) and (shared or not tier.shared):
+                tier.set_many(entries)
+        self._counters["sets"] += len(entries)
+
+    async def fetch(self, key :str, fetch :Callable[[], Awaitable],
+                    lease_timeout :float=10.0, poll_interval :float=0.05,
+                    local :bool=True, offload :bool=False) -> Any:
+        """Return the fresh value for `key`, or await `fetch()` and store its
+        result. A stale entry is fetched again like a missing one. When a
+        tier is shared by several processes, only the process holding the
+        lease on `key` calls `fetch`; the others poll the shared tier for
+        its result and fetch it themselves only if the lease is released or
+        expires without one. Only the time an entry was stored is read 
+        while polling, and the entry itself once it is fresh
+
+        Positional Arguments:
+            - key : str
+                - the key of the value, see `cache_key`
+            - fetch : Callable[[], Awaitable]
+                - returns the awaitable that fetches the value
+
+        Optional Arguments:
+            - lease_timeout : float
+                - the seconds a fetch may hold the lease. Default 10
+            - poll_interval : float
+                - the seconds between reads of the shared tier while another
+                process fetches. Default 0.05
+            - local : bool
+                - also store the value in the tiers of this process.
+                Default True
+            - offload : bool
+                - read and write the entry in the default executor, so that
+                decoding and encoding a large value, E.G: the full card 
+                list, does not block the event loop. Default False
+
+        Any exception raised by `fetch` is raised and nothing is stored
+        """
+        async def call(func :Callable, *args) -> Any:
+            if offload:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, func, *args)
+            return func(*args)
+
+        entry = await call(self._lookup_fresh, key, local)
+        if entry is not None:
+            return entry.value
+
+        shared = next((tier for tier in self.tiers if tier.shared), None)
+        if shared is not None:
+            deadline = time.monotonic() + lease_timeout
+            while not shared.acquire_lease(key, lease_timeout):
+                await asyncio.sleep(poll_interval)
+                stored = shared.stored_at(key)
+                fresh = stored is not None and time.time() - stored < self.ttl
+                entry = await call(shared.get, key) if fresh else None
+                if entry is not None:
+                    self._promote(key, entry,
+                                    [tier for tier in self.tiers
+                                        if local and tier is not shared])
+                    return entry.value
+                if time.monotonic() > deadline or not shared.is_leased(key):
+                    break
+
+        try:
+            value = await fetch()
+            await call(self.set, key, value, local)
+        finally:
+            if shared is not None:
+                shared.release_lease(key)
+
+        return value
+
+    def invalidate(self, key :str) -> None:
+        """Delete the entry for `key` from every tier"""
+        for tier in self.tiers:
+            tier.delete(key)
+        self._counters["invalidations"] += 1
+
+    def invalidate_prefix(self, prefix :str) -> int:
+        """Delete every entry whose key starts with `prefix` from every tier,
+        E.G: every result of one endpoint
+
+        Returns:
+            the largest number of entries deleted from one tier
+        """
+        deleted = 0
+        for tier in self.tiers:
+            deleted = max(deleted, tier.delete_prefix(prefix))
+        self._counters["invalidations"] += deleted
+
+        return deleted
+
+    def clear(self) -> None:
+        """Delete every entry from every tier"""
+        self.invalidate_prefix("")
+
+    def warm(self, limit :int, prefix :str="") -> int:
+        """Copy up to `limit` of the most recently stored entries that are
+        still kept, and whose key starts with `prefix`, into the tiers above
+        the tier that holds them. A `prefix` such as `/cards/search|` keeps
+        large results like the full card list out of memory
+
+        Returns:
+            the number of entries copied
+        """
+        for i, tier in enumerate(self.tiers):
+            entries = [(key, entry) for key, entry 
+                        in tier.recent(limit, prefix)
+                        if self._is_kept(entry)]
+            if not entries:
+                continue
+            for key, entry in reversed(entries):
+                self._promote(key, entry, self.tiers[:i])
+            return len(entries)
+
+        return 0
+
+    def close(self) -> None:
+        """Release the resources of every tier"""
+        for tier in self.tiers:
+            tier.close()
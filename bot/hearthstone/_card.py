@@ -5,17 +5,83 @@ __all__ = (
 )
 
 import operator
+import sys
 from abc import ABCMeta
-from typing import Union
+from typing import Any, Dict, List, Tuple, Union
 from functools import reduce
 from .errors import NoCardFound 
 
+#Fields whose values repeat across most cards and are worth interning
+_INTERNED_FIELDS = frozenset({
+    "cardSet", "type", "faction", "rarity", "playerClass", "race", "locale",
+    "artist", "spellSchool", "multiClassGroup",
+})
+
+#Every distinct ordering of card keys seen so far mapped to its field layout
+_layouts :Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+def _get_layout(keys :Tuple[str, ...]) -> Dict[str, int]:
+    """Return the shared `{field: index}` layout for cards with `keys`"""
+    layout = _layouts.get(keys)
+    if layout is None:
+        keys = tuple(sys.intern(key) for key in keys)
+        layout = _layouts.setdefault(keys, {key: i 
+                                            for i, key in enumerate(keys)})
+
+    return layout
+
+def _intern_value(field :str, value :Any) -> Any:
+    """Return `value` interned if `field` holds commonly repeated strings"""
+    if field in _INTERNED_FIELDS and isinstance(value, str):
+        return sys.intern(value)
+
+    return value
+
 class _Card(metaclass=ABCMeta):
     """An abstract class that represents a Card returned by the hearthstone
     api
+
+    The metadata is stored as a tuple of values plus a field layout that is
+    shared by every card with the same keys, instead of a dict per card, and 
+    commonly repeated strings are interned. Fields are read as attributes or 
+    with `card[field]`, and `vars(card)` returns the metadata as a new `dict`
     """
+    __slots__ = ("_layout", "_values")
+
     def __init__(self, dict: dict):
-        self.__dict__ = dict
+        self._layout = _get_layout(tuple(dict))
+        self._values = tuple(_intern_value(field, value) 
+                                for field, value in dict.items())
+
+    @property
+    def __dict__(self) -> dict:
+        """Return the card metadata as a new `dict`"""
+        return dict(zip(self._layout, self._values))
+
+    def __getattr__(self, name :str) -> Any:
+        if name in _Card.__slots__:
+            raise AttributeError(name)
+        try:
+            return self._values[self._layout[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, field :str) -> Any:
+        return self._values[self._layout[field]]
+
+    def __contains__(self, field :str) -> bool:
+        return field in self._layout
+
+    def get(self, field :str, default :Any=None) -> Any:
+        """Return the value of `field` or `default` if the card has none"""
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Return the fields of the card in the order they were received"""
+        return self._layout.keys()
 
     def __repr__(self) -> str:
         cls = type(self).__name__
@@ -34,22 +100,25 @@ class _Card(metaclass=ABCMeta):
         return cls + ": " + name
 
     def __bool__(self) -> bool:
-        """Return `True` if all values in :class_attribute:`_Card.__dict__` are 
-        truthy
+        """Return `True` if all values of the card are truthy
         """
-        if all(value for value in self.__dict__.values()):
-            return True
-        else:
-            return False
+        return all(self._values)
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, _Card):
+            if self._layout is __o._layout:
+                return self._values == __o._values
             return (self.__dict__ == __o.__dict__)
+        elif isinstance(__o, dict):
+            return (self.__dict__ == __o)
         else:
             return False
 
     def __hash__(self) -> int:
-        return reduce(hash, self.__dict__.values(), 0)
+        """Return a hash of the `dbfId` of the card, which is unique in the
+        hearthstone api
+        """
+        return hash(self.get("dbfId"))
 
 class CollectibleCard(_Card):
     """A concrete class that subclasses :class:`_Card` and represents a 
@@ -57,6 +126,8 @@ class CollectibleCard(_Card):
     :class:`CollectibleCards` have a `collectible` attribute equal to 1 or a 
     truthy value
     """
+    __slots__ = ()
+
     def __init__(self, dict: dict):
         super().__init__(dict)
 
@@ -64,6 +135,8 @@ class NonCollectibleCard(_Card):
     """A concrete class that subclasses :class:`_Card` and represents a 
     non-collectible card returned by the hearthstone api.
     """
+    __slots__ = ()
+
     def __init__(self, dict: dict):
         super().__init__(dict)
         
@@ -71,17 +144,27 @@ class Cardback(_Card):
     """A concrete class that subclasses :class:`_Card` and represents a 
     cardback returned by the hearthstone api.
     """
+    __slots__ = ()
+
     def __init__(self, dict: dict):
         super().__init__(dict)
 
 class MultipleCards:
     """
     A data structure that represents multiple :class:`_Card` objects returned 
-    by the hearthstone API. This will typically occur when a user makes a query 
-    using partial name search.
+    by the hearthstone API. This will typically occur when a user makes a
+    query using partial name search.
+
+    Iterating yields the raw card dicts, or compact :class:`_Card` objects
+    when built from the catalog, both read with `card[field]`. Lookups by
+    name or `dbfId` go through dict indexes that are built on first use, and
+    the concrete :class:`_Card` object for each entry is created at most once
     """
     def __init__(self, cards: list):
         self._cards :list[dict] = [card for card in cards]
+        self._objects :list = [None] * len(self._cards)
+        self._by_name :Dict[str, List[int]] = None
+        self._by_dbf_id :Dict[str, int] = None
     
     def __iter__(self):
         return iter(self._cards)
@@ -90,25 +173,76 @@ class MultipleCards:
         return len(self._cards)
     
     def __getitem__(self, index):
-        """Given an `index`, if it's a `str`, iterate through the 
-        underlyingsequence of cards and attempt to match `index` to `card.name`.
-        If no such card exists such that `card[i].get('name') == index` raise 
-        `NoCardFound`. If such a card does exist, return a concrete `_Card` 
-        object based on the type of card.
+        """Given an `index`, if it's a `str`, look up the first card in the 
+        underlying sequence whose `name` is `index`. If no such card exists 
+        raise `NoCardFound`. If such a card does exist, return a concrete 
+        `_Card` object based on the type of card.
 
         If the `index` is not a string type, return `sequence[index]`
         """
         if isinstance(index, str):
-            for i in range(0, len(self)):
-                if self._cards[i].get("name") == index:
-                    return _find_card_type(self._cards[i])
-            raise NoCardFound(f"No card with name '{index}' found", None)
+            return self.get_all(index)[0]
         else:
             return self._cards[index]
 
+    def card(self, index :int) -> Union[
+                                    Cardback,
+                                    Union[CollectibleCard, NonCollectibleCard]
+                                ]:
+        """Return the concrete `_Card` object for the card at position 
+        `index`, creating it on first access
+        """
+        card = self._objects[index]
+        if card is None:
+            card = self._cards[index]
+            if not isinstance(card, _Card):
+                card = _find_card_type(card)
+            self._objects[index] = card
+
+        return card
+
+    def get_all(self, name :str) -> List[Union[
+                                        Cardback,
+                                        Union[
+                                            CollectibleCard, 
+                                            NonCollectibleCard
+                                        ]
+                                    ]]:
+        """Return the concrete `_Card` objects of every card whose `name` is 
+        `name`, in order. Raise `NoCardFound` if there are none
+        """
+        if self._by_name is None:
+            self._by_name = {}
+            for i, card in enumerate(self._cards):
+                self._by_name.setdefault(card.get("name"), []).append(i)
+
+        try:
+            return [self.card(i) for i in self._by_name[name]]
+        except KeyError:
+            raise NoCardFound(f"No card with name '{name}' found", None)
+
+    def get_by_dbf_id(self, dbf_id :Union[str, int]) -> Union[
+                                                        Cardback,
+                                                        Union[
+                                                            CollectibleCard, 
+                                                            NonCollectibleCard
+                                                        ]
+                                                    ]:
+        """Return the concrete `_Card` object of the card whose `dbfId` is 
+        `dbf_id`. Raise `NoCardFound` if there is none
+        """
+        if self._by_dbf_id is None:
+            self._by_dbf_id = {str(card.get("dbfId")): i 
+                                for i, card in enumerate(self._cards)}
+
+        try:
+            return self.card(self._by_dbf_id[str(dbf_id)])
+        except KeyError:
+            raise NoCardFound(f"No card with dbfId '{dbf_id}' found", None)
+
     def __repr__(self) -> str:
         cls = type(self).__name__
-        return "{}({})".format(cls, self.__dict__)
+        return "{}({})".format(cls, self._cards)
 
     def __str__(self) -> str:
         cls = type(self).__name__ +f" [{len(self)}]: "
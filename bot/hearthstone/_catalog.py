@@ -0,0 +1,487 @@
+__all__ = (
+    "CardCatalog",
+    "CatalogChanges",
+    "get_catalog",
+    "search_card_by_partial_name",
+)
+
+import asyncio
+import aiohttp
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+from typing import Sequence, Tuple, Union
+from .errors import NoCardFound
+from ._cache import cache_key
+from ._card import MultipleCards, CollectibleCard, NonCollectibleCard
+from ._card import _Card, _find_card_type
+from ._parser import normalize_query
+from ._search import TrigramIndex
+from .hearthstone import fetch_card_by_partial_name, stream_all_cards
+from .hearthstone import fetch_card_set, fetch_info
+from .hearthstone import get_cache, get_negative_cache
+
+#The cards of each set, then the dbfId, cardId, and name indexes and the
+#name trigram index built from them
+_Indexes = Tuple[Dict[str, List[_Card]], Dict[str, _Card], Dict[str, _Card],
+                    Dict[str, List[_Card]], TrigramIndex]
+
+class CatalogChanges(NamedTuple):
+    """The result of updating a :class:`CardCatalog`
+
+    Attributes:
+        - patch : str
+            - the patch the catalog is at after the update
+        - sets : Tuple[str, ...]
+            - the sets that were fetched again or removed
+        - added : int
+            - the number of cards that are new
+        - updated : int
+            - the number of cards whose metadata changed
+        - removed : int
+            - the number of cards that no longer exist
+        - queries : FrozenSet[str]
+            - the normalized `dbfId`, `cardId`, and name of every card that
+            was added, updated, or removed, before and after the update
+    """
+    patch :Optional[str] = None
+    sets :Tuple[str, ...] = ()
+    added :int = 0
+    updated :int = 0
+    removed :int = 0
+    queries :FrozenSet[str] = frozenset()
+
+    @property
+    def changed(self) -> bool:
+        """`True` if any card was added, updated, or removed"""
+        return bool(self.added or self.updated or self.removed)
+
+def _as_card(card :Union[dict, _Card]) -> _Card:
+    """Return `card` as a concrete :class:`_Card` object"""
+    return card if isinstance(card, _Card) else _find_card_type(card)
+
+def _card_queries(card :_Card) -> List[str]:
+    """Return the normalized queries that resolve to `card`"""
+    return [normalize_query(card[field]) for field in ("dbfId", "cardId", 
+                                                        "name")
+                if field in card]
+
+def _build_indexes(sets :Dict[str, List[_Card]]) -> _Indexes:
+    """Return the indexes of the cards of `sets`"""
+    by_dbf_id, by_card_id, by_name = {}, {}, {}
+    for cards in sets.values():
+        for card in cards:
+            if "dbfId" in card:
+                by_dbf_id[str(card["dbfId"])] = card
+            if "cardId" in card:
+                by_card_id[normalize_query(card["cardId"])] = card
+            if "name" in card:
+                by_name.setdefault(normalize_query(card["name"]),
+                                    []).append(card)
+
+    return sets, by_dbf_id, by_card_id, by_name, TrigramIndex(by_name)
+
+def _index_cards(cards :Iterable[Union[dict, _Card]]) -> _Indexes:
+    """Return the indexes of `cards`, grouped by set"""
+    sets = {}
+    for card in cards:
+        card = _as_card(card)
+        sets.setdefault(card.get("cardSet", ""), []).append(card)
+
+    return _build_indexes(sets)
+
+class CardCatalog:
+    """An in-memory index of every card returned by the /cards endpoint. Once
+    loaded, the catalog answers lookups by `dbfId`, `cardId`, or name without
+    making a request to the hearthstone api. Each card is held once as a
+    compact :class:`_Card` object shared by every index
+
+    Cards are grouped by set so that `sync` can bring the catalog up to date
+    after a patch by fetching only the sets that may have changed. New 
+    indexes always replace the old ones at once, so lookups never see a 
+    partly updated catalog
+
+    Attributes:
+        - loaded (property) : bool
+            - `True` once the catalog has been built at least once
+        - patch (property) : str
+            - the patch the catalog was last synced to, or `None` before the
+            first `sync`
+        - sets (property) : List[str]
+            - the names of the sets of the cards in the catalog
+
+    Methods:
+        - load
+            - stream every card from the /cards endpoint and build the 
+            indexes
+        - build
+            - build the indexes from an iterable of card dicts
+        - update
+            - replace the cards of some sets and invalidate the cached 
+            results of the cards that changed
+        - sync
+            - fetch the sets that changed since the last sync and update the
+            catalog with them
+        - get_by_dbf_id
+            - return the card with a given `dbfId`
+        - get_by_card_id
+            - return the card with a given `cardId`
+        - find
+            - return the card(s) matching a name, partial name, or dbfId
+    """
+    def __init__(self) -> None:
+        self._sets :Dict[str, List[_Card]] = {}
+        self._by_dbf_id :Dict[str, _Card] = {}
+        self._by_card_id :Dict[str, _Card] = {}
+        self._by_name :Dict[str, List[_Card]] = {}
+        self._name_index = TrigramIndex(())
+        self._loaded = False
+        self._patch :Optional[str] = None
+        #The set list of the /info endpoint at the last sync
+        self._listed :FrozenSet[str] = frozenset()
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(CARDS: {}, NAMES: {}, PATCH: {})".format(
+                cls, len(self), len(self._by_name), self._patch)
+
+    def __len__(self) -> int:
+        return len(self._by_dbf_id)
+
+    @property
+    def loaded(self) -> bool:
+        """Getter for the `loaded` property"""
+        return self._loaded
+
+    @property
+    def patch(self) -> Optional[str]:
+        """Getter for the `patch` property"""
+        return self._patch
+
+    @property
+    def sets(self) -> List[str]:
+        """Getter for the `sets` property"""
+        return list(self._sets)
+
+    async def load(self, session :aiohttp.ClientSession, **kwargs) -> None:
+        """Fetch every card from the /cards endpoint and build the indexes.
+        The response is streamed and each card is stored as a compact 
+        :class:`_Card` as soon as it is read, so the raw response is never 
+        held in memory, and the indexes are built off the event loop
+
+        When the shared cache holds a fresh card list, E.G: stored by 
+        another process sharing an on-disk store, the catalog is built from
+        it instead, and a streamed card list is stored in the shared tiers of
+        the cache. Processes sharing a store fetch the /cards endpoint once
+        between them. Reading and writing the stored list and building the
+        indexes from it all run in the default executor
+
+        Positional Arguments:
+            - session : aiohttp.ClientSession
+                - a reference to the aiohttp client session
+            - kwargs
+                - keyword parameters passed through to `stream_all_cards`
+
+        Raises `APIException` if the cards could not be fetched, leaving the
+        catalog unchanged
+        """
+        streamed = False
+
+        async def fetch() -> MultipleCards:
+            nonlocal streamed
+            sets = {}
+            async for card in stream_all_cards(session, **kwargs):
+                card = _find_card_type(card)
+                sets.setdefault(card.get("cardSet", ""), []).append(card)
+            if not sets:
+                raise NoCardFound("No cards returned by the /cards endpoint",
+                                    None)
+
+            loop = asyncio.get_running_loop()
+            self._swap(await loop.run_in_executor(None, _build_indexes, sets))
+            streamed = True
+            return MultipleCards([card for cards in sets.values()
+                                    for card in cards])
+
+        cache = get_cache()
+        if cache is None:
+            await fetch()
+            return
+
+        cards = await cache.fetch(cache_key("/cards", **kwargs), fetch,
+                                    lease_timeout=120, local=False, 
+                                    offload=True)
+        if not streamed:
+            loop = asyncio.get_running_loop()
+            self._swap(await loop.run_in_executor(None, _index_cards, cards))
+
+    def build(self, cards :Iterable[dict]) -> None:
+        """Build the `dbfId`, `cardId`, normalized name, and name trigram 
+        indexes from `cards`. The new indexes replace the old ones only once
+        they are complete, so lookups made while building see the previous 
+        catalog
+
+        Positional Arguments:
+            - cards : Iterable[dict]
+                - the card metadata dicts returned by the hearthstone api
+        """
+        self._swap(_index_cards(cards))
+
+    def _swap(self, indexes :_Indexes) -> None:
+        """Replace every index at once. Nothing here awaits, so no lookup
+        runs between the assignments
+        """
+        (self._sets, self._by_dbf_id, self._by_card_id, self._by_name,
+            self._name_index) = indexes
+        self._loaded = True
+
+    def _diff(self, sets :Dict[str, Iterable[dict]],
+                patch :Optional[str]) -> Tuple[_Indexes, CatalogChanges]:
+        """Return the indexes of the catalog with the cards of each of `sets`
+        replaced, and the changes from the current catalog. A set without 
+        cards is removed. Reads the current indexes without changing them, 
+        so it may run in another thread
+        """
+        old = {str(card["dbfId"]): card for name in sets 
+                    for card in self._sets.get(name, ()) if "dbfId" in card}
+        merged = {name: cards for name, cards in self._sets.items()
+                    if name not in sets}
+        new = {}
+        for name, cards in sets.items():
+            cards = [_as_card(card) for card in cards]
+            if cards:
+                merged[name] = cards
+            new.update((str(card["dbfId"]), card) for card in cards
+                        if "dbfId" in card)
+
+        added = [card for dbf_id, card in new.items() if dbf_id not in old]
+        removed = [card for dbf_id, card in old.items() if dbf_id not in new]
+        updated = [(old[dbf_id], card) for dbf_id, card in new.items()
+                    if dbf_id in old and old[dbf_id] != card]
+        queries = frozenset(query 
+                            for card in added + removed + 
+                                [card for pair in updated for card in pair]
+                            for query in _card_queries(card))
+
+        return _build_indexes(merged), CatalogChanges(
+                    patch, tuple(sets), len(added), len(updated), len(removed),
+                    queries)
+
+    def _commit(self, indexes :_Indexes, changes :CatalogChanges) -> None:
+        """Swap in `indexes` and delete the cached results of the cards in
+        `changes` from the shared cache and negative cache
+
+        Any cached search may be a partial name that now matches a card that
+        was added or renamed, so every search result is deleted once a card
+        changed. The changed sets are already stored under their patch by 
+        `_fetch_set`, so the stored list of every card is deleted rather
+        than written again and the next `load` fetches it
+        """
+        self._swap(indexes)
+        cache = get_cache()
+        if cache is not None:
+            for name in changes.sets:
+                cache.invalidate(cache_key("/cards/sets", name))
+            for query in changes.queries:
+                cache.invalidate(cache_key("/cards", query))
+            if changes.changed:
+                cache.invalidate_prefix("/cards/search|")
+                cache.invalidate(cache_key("/cards"))
+        negative_cache = get_negative_cache()
+        if negative_cache is not None and changes.changed:
+            negative_cache.clear()
+
+    def update(self, sets :Dict[str, Iterable[dict]], 
+                patch :Optional[str]=None) -> CatalogChanges:
+        """Replace the cards of each of `sets` with the cards given for it
+        and delete the cached results of every card that was added, updated,
+        or removed. A set given no cards is removed from the catalog
+
+        Positional Arguments:
+            - sets : Dict[str, Iterable[dict]]
+                - the card metadata dicts of each set, by set name
+
+        Optional Arguments:
+            - patch : str
+                - the patch the cards are from
+
+        Returns:
+            a `CatalogChanges`
+        """
+        indexes, changes = self._diff(sets, patch)
+        self._commit(indexes, changes)
+
+        return changes
+
+    async def sync(self, session :aiohttp.ClientSession, 
+                    **kwargs) -> CatalogChanges:
+        """Bring the catalog up to date with the patch and set list of the
+        /info endpoint. The first sync only records them, since the catalog
+        was just loaded. After that, sets added to the list are fetched, 
+        sets dropped from it are removed, and when the patch changes the sets
+        of the standard format are fetched again, as they are the ones 
+        balance changes touch. Each set is fetched once per patch across 
+        every process sharing the cache. The new indexes are built off the
+        event loop and swapped in at once
+
+        Positional Arguments:
+            - session : aiohttp.ClientSession
+                - a reference to the aiohttp client session
+            - kwargs
+                - keyword parameters passed through to `fetch_info` and 
+                `fetch_card_set`, E.G: `locale`
+
+        Raises `APIException` if the /info endpoint or a set could not be 
+        fetched, leaving the catalog unchanged
+
+        Returns:
+            a `CatalogChanges`
+        """
+        info = await fetch_info.__wrapped__(session, **kwargs)
+        patch = info.get("patch")
+        listed = frozenset(info.get("sets", ()))
+        if self._patch is None:
+            self._patch, self._listed = patch, listed
+            return CatalogChanges(patch)
+
+        fetched = listed - self._listed
+        if patch != self._patch:
+            fetched |= listed & frozenset(info.get("standard", listed))
+        sets = dict.fromkeys(self._listed - listed, ())
+        for name in sorted(fetched):
+            sets[name] = await self._fetch_set(session, name, patch, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        indexes, changes = await loop.run_in_executor(None, self._diff, sets,
+                                                        patch)
+        self._commit(indexes, changes)
+        self._patch, self._listed = patch, listed
+
+        return changes
+
+    async def _fetch_set(self, session :aiohttp.ClientSession, name :str,
+                            patch :Optional[str], 
+                            **kwargs) -> Sequence[Union[dict, _Card]]:
+        """Return the cards of the set `name` at `patch`, or none if the set
+        has no cards. The result is shared through the cache under a key 
+        that includes the patch
+        """
+        fetch = lambda: fetch_card_set.__wrapped__(session, name, **kwargs)
+        cache = get_cache()
+        try:
+            if cache is None:
+                result = await fetch()
+            else:
+                result = await cache.fetch(cache_key("/cards/sets", name,
+                                                        patch=patch, **kwargs),
+                                            fetch, local=False)
+        except NoCardFound:
+            return []
+
+        return list(result) if isinstance(result, MultipleCards) else [result]
+
+    def get_by_dbf_id(self, dbf_id :Union[str, int]) -> Union[
+                                                        CollectibleCard,
+                                                        NonCollectibleCard
+                                                    ]:
+        """Return the card whose `dbfId` is `dbf_id`
+
+        Raises `NoCardFound` if no such card exists in the catalog
+        """
+        try:
+            return self._by_dbf_id[str(dbf_id).strip()]
+        except KeyError:
+            raise NoCardFound(f"No card with dbfId '{dbf_id}' found", None)
+
+    def get_by_card_id(self, card_id :str) -> Union[
+                                                CollectibleCard,
+                                                NonCollectibleCard
+                                            ]:
+        """Return the card whose `cardId` is `card_id`
+
+        Raises `NoCardFound` if no such card exists in the catalog
+        """
+        try:
+            return self._by_card_id[normalize_query(card_id)]
+        except KeyError:
+            raise NoCardFound(f"No card with cardId '{card_id}' found", None)
+
+    def find(self, query :str) -> Union[
+                                    MultipleCards,
+                                    Union[CollectibleCard, NonCollectibleCard]
+                                ]:
+        """Return the card(s) matching `query` the same way the
+        /cards/search/`{name}` endpoint would. A `query` that is a known
+        `dbfId` or `cardId` returns that single card, otherwise every card
+        whose name contains `query` is returned
+
+        Positional Arguments:
+            - query : str
+                - the name, partial name, `dbfId`, or `cardId` of a card
+
+        Raises `NoCardFound` if no card in the catalog matches `query`
+
+        Returns:
+            a `MultipleCards`, `CollectibleCard`, or a `NonCollectibleCard`
+            object
+        """
+        key = normalize_query(query)
+        card = self._by_dbf_id.get(key) or self._by_card_id.get(key)
+        if card is not None:
+            return card
+
+        matches = [card for name in self._name_index.search(key)
+                            for card in self._by_name[name]]
+        if not matches:
+            raise NoCardFound(f"No card with name '{query}' found", None)
+
+        return matches[0] if len(matches) == 1 else MultipleCards(matches)
+
+_catalog = CardCatalog()
+
+def get_catalog() -> CardCatalog:
+    """Return the shared :class:`CardCatalog` for the hearthstone package"""
+    return _catalog
+
+async def search_card_by_partial_name(session :aiohttp.ClientSession,
+                                        partial_name :str,
+                                        **kwargs) -> Union[
+                                            MultipleCards,
+                                            Union[
+                                                CollectibleCard,
+                                                NonCollectibleCard
+                                            ]
+                                        ]:
+    """A drop-in replacement for `fetch_card_by_partial_name` that answers
+    from the shared :class:`CardCatalog` when it is loaded. The request is
+    sent to the /cards/search/`{partial_name}` endpoint when the catalog is 
+    not loaded, has no matching card, or `kwargs` filter the search. Results
+    are cached under the same key as `fetch_card_by_partial_name`, but cards
+    found in the catalog are only kept in the tiers of this process, since 
+    every process can find them again without encoding and storing them
+
+    Positional Arguments:
+        - session : aiohttp.ClientSession
+            - a reference to the aiohttp client session
+        - partial_name : str
+            - the partial name of a hearthstone card
+        - kwargs
+            - keyword parameters passed through to 
+            `fetch_card_by_partial_name`
+
+    Returns:
+        a `MultipleCards`, `CollectibleCard`, or a `NonCollectibleCard` object.
+        If neither the catalog nor the endpoint returned data a `NoCardFound`
+        exception will be raised
+    """
+    if _catalog.loaded and partial_name and not kwargs:
+        try:
+            result = _catalog.find(partial_name)
+        except NoCardFound:
+            pass
+        else:
+            cache = get_cache()
+            if cache is not None:
+                cache.set(cache_key("/cards/search", partial_name), result,
+                            shared=False)
+            return result
+
+    return await fetch_card_by_partial_name(session, partial_name, **kwargs)
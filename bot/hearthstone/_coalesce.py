@@ -0,0 +1,75 @@
+__all__ = (
+    "RequestCoalescer",
+)
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class RequestCoalescer:
+    """Coalesces concurrent calls that share a key into a single pending 
+    task, so that identical lookups made while one is already in flight wait
+    on its result instead of making their own request
+
+    The shared task is shielded from its callers, so a caller that is
+    cancelled does not cancel the request for the others. Exceptions raised by
+    the task are raised in every caller
+
+    Attributes:
+        - stats (property) : dict
+            - `leaders` : the number of calls that started a task
+            - `merged` : the number of calls that waited on another's task
+            - `inflight` : the number of tasks currently pending
+
+    Methods:
+        - run
+            - await the pending task for a key, starting one if there is none
+    """
+    def __init__(self) -> None:
+        self._inflight :Dict[Hashable, asyncio.Future] = {}
+        self._leaders = 0
+        self._merged = 0
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}({})".format(cls, self.stats)
+
+    @property
+    def stats(self) -> dict:
+        """Getter for the `stats` property"""
+        return {
+            "leaders" : self._leaders,
+            "merged" : self._merged,
+            "inflight" : len(self._inflight),
+        }
+
+    async def run(self, key :Hashable, 
+                    factory :Callable[[], Awaitable]) -> Any:
+        """Return the result of the pending task for `key`. If no task is 
+        pending, `factory()` is scheduled as the task for `key` until it
+        completes
+
+        Positional Arguments:
+            - key : Hashable
+                - identifies calls that are interchangeable
+            - factory : Callable[[], Awaitable]
+                - creates the awaitable when no task for `key` is pending
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self._leaders += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._merged += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key :Hashable, task :asyncio.Future) -> None:
+        """Forget `task` once it is done and mark its exception retrieved so
+        a task whose callers were all cancelled is not reported as unhandled
+        """
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
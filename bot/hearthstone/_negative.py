@@ -0,0 +1,78 @@
+__all__ = (
+    "NegativeCache",
+)
+
+import time
+from typing import Any, Callable, Hashable, Optional, Tuple
+from cachetools import TTLCache
+from .errors import NoCardFound
+
+class NegativeCache:
+    """A bounded cache of queries that found no card, so that repeated typos
+    and joke queries are answered without a request to the hearthstone api.
+    A miss is remembered for `ttl` seconds, short enough that a card added by
+    a patch is found soon after it is released
+
+    Optional Arguments:
+        - maxsize : int
+            - the maximum number of queries remembered
+        - ttl : float
+            - the seconds a query is remembered
+
+    Attributes:
+        - stats (property) : dict
+            - `hits` : lookups answered from the cache
+            - `misses` : lookups of queries not in the cache
+            - `stored` : the number of queries added
+            - `size` : the number of queries currently remembered
+
+    Methods:
+        - check
+            - raise the remembered `NoCardFound` for a query
+        - add
+            - remember that a query found no card
+        - clear
+            - forget every query
+    """
+    def __init__(self, maxsize :int=1024, ttl :float=300.0,
+                    timer :Callable[[], float]=time.monotonic) -> None:
+        self._errors = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._counters = dict.fromkeys(("hits", "misses", "stored"), 0)
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}({})".format(cls, self.stats)
+
+    def __len__(self) -> int:
+        return len(self._errors)
+
+    def __contains__(self, key :Hashable) -> bool:
+        return key in self._errors
+
+    @property
+    def stats(self) -> dict:
+        """Getter for the `stats` property"""
+        return dict(self._counters, size=len(self._errors))
+
+    def check(self, key :Hashable) -> None:
+        """Raise a `NoCardFound` with the message and status of the miss
+        remembered for `key`, or return if `key` is not remembered
+        """
+        miss :Optional[Tuple[str, Any]] = self._errors.get(key)
+        if miss is None:
+            self._counters["misses"] += 1
+            return
+
+        self._counters["hits"] += 1
+        raise NoCardFound(*miss)
+
+    def add(self, key :Hashable, error :NoCardFound) -> None:
+        """Remember that `key` found no card, raising `error`. Only the 
+        message and status of `error` are kept, not its traceback
+        """
+        self._errors[key] = (error.message, error.status)
+        self._counters["stored"] += 1
+
+    def clear(self) -> None:
+        """Forget every remembered query"""
+        self._errors.clear()
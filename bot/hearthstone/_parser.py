@@ -31,4 +31,16 @@ def parse_api_result(api_result :dict) \
     elif collectible:
         return CollectibleCard(api_result[0])
     else:
-        return NonCollectibleCard(api_result[0])
\ No newline at end of file
+        return NonCollectibleCard(api_result[0])
+def normalize_query(query :str) -> str:
+    """Return `query` with surrounding whitespace stripped, inner whitespace
+    collapsed, and case folded so that equivalent user queries share one key
+
+    Positional Arguments:
+        - query : str
+            - a card name, partial name, or dbfId
+
+    Returns:
+        the normalized `str`
+    """
+    return " ".join(str(query).split()).casefold()
@@ -0,0 +1,192 @@
+__all__ = (
+    "Priority",
+    "RateLimiter",
+    "request_priority",
+    "get_request_priority",
+)
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Iterator, Optional
+from .errors import RateLimitExceeded
+
+class Priority(IntEnum):
+    """The priority class of a request to the hearthstone api. Interactive
+    requests are made on behalf of a user waiting for a reply, background 
+    requests are made by tasks such as syncing or warming caches
+    """
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+_priority :ContextVar = ContextVar("hearthstone_request_priority",
+                                    default=Priority.INTERACTIVE)
+
+@contextmanager
+def request_priority(priority :Priority) -> Iterator[None]:
+    """Context manager that sets the :class:`Priority` of every request made 
+    inside it, including requests made by tasks created inside it
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def get_request_priority() -> Priority:
+    """Return the :class:`Priority` of requests made in the current context"""
+    return _priority.get()
+
+class RateLimiter:
+    """A client-side token bucket that keeps requests to the hearthstone api
+    within a per-second rate and an optional per-day budget
+
+    Interactive requests may take any token and wait up to `max_wait` seconds
+    for one. Background requests leave `background_reserve` of the bucket, 
+    at most all but one token, and of the daily budget to interactive 
+    requests, and wait up to `background_max_wait` seconds. A request that 
+    would wait longer, or that finds the daily budget spent, is rejected 
+    with `RateLimitExceeded`
+
+    Positional Arguments:
+        - per_second : float
+            - the rate tokens are added to the bucket
+
+    Optional Arguments:
+        - burst : int
+            - the size of the bucket. Defaults to `per_second` rounded up
+        - per_day : int
+            - the number of requests allowed per UTC day. `None` is unlimited
+        - background_reserve : float
+            - the fraction of the bucket and daily budget kept for interactive
+            requests
+        - max_wait : float
+            - seconds an interactive request may wait for a token
+        - background_max_wait : float
+            - seconds a background request may wait for a token
+
+    Attributes:
+        - stats (property) : dict
+            - counters of granted, waited, and rejected requests and the 
+            tokens and daily budget used
+    """
+    def __init__(self, per_second :float, burst :Optional[int]=None,
+                    per_day :Optional[int]=None, 
+                    background_reserve :float=0.5, max_wait :float=1.0,
+                    background_max_wait :float=60.0) -> None:
+        if per_second <= 0:
+            raise ValueError("'per_second' must be greater than 0")
+
+        self.per_second = per_second
+        self.burst = burst or max(1, int(-(-per_second // 1)))
+        self.per_day = per_day
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self.background_max_wait = background_max_wait
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._day = self._today()
+        self._day_used = 0
+        self._granted = {priority: 0 for priority in Priority}
+        self._waited = 0
+        self._rejected = 0
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(PER_SECOND: {}, BURST: {}, PER_DAY: {})" \
+                .format(cls, self.per_second, self.burst, self.per_day)
+
+    @property
+    def stats(self) -> dict:
+        """Getter for the `stats` property"""
+        self._refill()
+        return {
+            "granted_interactive" : self._granted[Priority.INTERACTIVE],
+            "granted_background" : self._granted[Priority.BACKGROUND],
+            "waited" : self._waited,
+            "rejected" : self._rejected,
+            "tokens" : self._tokens,
+            "day_used" : self._day_used,
+        }
+
+    @staticmethod
+    def _today() -> int:
+        return int(time.time() // 86400)
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill to the bucket"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens 
+                                + (now - self._updated) * self.per_second)
+        self._updated = now
+
+    def _check_daily_budget(self, priority :Priority) -> None:
+        """Raise `RateLimitExceeded` if `priority` requests have spent their
+        share of the daily budget
+        """
+        if self.per_day is None:
+            return
+
+        today = self._today()
+        if today != self._day:
+            self._day, self._day_used = today, 0
+
+        budget = self.per_day
+        if priority is Priority.BACKGROUND:
+            budget = self.per_day * (1 - self.background_reserve)
+        if self._day_used >= budget:
+            self._rejected += 1
+            raise RateLimitExceeded(f"Daily budget of {self.per_day} "
+                                    "requests spent", 429)
+
+    def _reject(self, wait :float) -> None:
+        self._rejected += 1
+        raise RateLimitExceeded(f"Rate limit of {self.per_second}/s "
+                                f"exceeded, next token in {wait:.2f}s", 429)
+
+    def _grant(self, priority :Priority) -> None:
+        self._tokens -= 1
+        self._day_used += 1
+        self._granted[priority] += 1
+
+    async def acquire(self, priority :Optional[Priority]=None) -> None:
+        """Wait for a token for a request of `priority`, which defaults to 
+        the priority of the current context
+
+        Raises `RateLimitExceeded` if the daily budget is spent or no token 
+        is available within the wait allowed for `priority`
+        """
+        if priority is None:
+            priority = get_request_priority()
+        self._check_daily_budget(priority)
+        self._refill()
+
+        if priority is Priority.INTERACTIVE:
+            #Reserve the next token now so concurrent callers queue fairly
+            wait = max(0.0, 1 - self._tokens) / self.per_second
+            if wait > self.max_wait:
+                self._reject(wait)
+            self._grant(priority)
+            if wait:
+                self._waited += 1
+                await asyncio.sleep(wait)
+            return
+
+        #Background requests never reserve a token, they only take one while
+        #the bucket holds more than the interactive reserve. A bucket too
+        #small to hold the reserve and a token only keeps them from waiting
+        #ahead of interactive requests
+        floor = min(self.burst * self.background_reserve, self.burst - 1)
+        deadline = time.monotonic() + self.background_max_wait
+        while self._tokens < floor + 1:
+            wait = (floor + 1 - self._tokens) / self.per_second
+            if time.monotonic() + wait > deadline:
+                self._reject(wait)
+            self._waited += 1
+            await asyncio.sleep(wait)
+            self._refill()
+        self._check_daily_budget(priority)
+        self._grant(priority)
@@ -0,0 +1,149 @@
+__all__ = (
+    "RetryPolicy",
+    "CircuitBreaker",
+)
+
+import random
+import time
+from typing import Optional
+from .errors import APIConnectionError, APIServerError, CircuitOpen
+from .errors import HTTPException
+
+class RetryPolicy:
+    """Decides whether a failed request to the hearthstone api is retried and
+    how long to wait before the next attempt. Every request to the api is an
+    idempotent GET, so any server error, connection error, or `429` response
+    is retried
+
+    The delay before attempt `n` is drawn uniformly from 
+    `[0, min(max_delay, base_delay * 2**n)]` so that clients retrying the same
+    outage spread out. A `Retry-After` sent by the server is used instead, 
+    and a request whose `Retry-After` exceeds `max_delay` is not retried
+
+    Optional Arguments:
+        - attempts : int
+            - the maximum number of attempts, including the first
+        - base_delay : float
+            - the backoff delay in seconds before jitter for the first retry
+        - max_delay : float
+            - the longest delay in seconds before any retry
+
+    Attributes:
+        - retries : int
+            - the number of retries made under this policy
+    """
+    def __init__(self, attempts :int=3, base_delay :float=0.25,
+                    max_delay :float=4.0) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(ATTEMPTS: {}, BASE_DELAY: {}, MAX_DELAY: {})" \
+                .format(cls, self.attempts, self.base_delay, self.max_delay)
+
+    def delay(self, attempt :int, error :Exception) -> Optional[float]:
+        """Return the seconds to wait before retrying after `error` was 
+        raised by attempt number `attempt`, counting from `0`, or `None` if 
+        the request should not be retried
+        """
+        if attempt + 1 >= self.attempts or not _is_retryable(error):
+            return None
+
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+
+        return random.uniform(0, min(self.max_delay, 
+                                        self.base_delay * 2 ** attempt))
+
+def _is_retryable(error :Exception) -> bool:
+    """Return `True` if `error` is a transient failure of the api"""
+    if isinstance(error, CircuitOpen):
+        return False
+
+    return (isinstance(error, (APIServerError, APIConnectionError)) or
+            (isinstance(error, HTTPException) and error.status == 429))
+
+class CircuitBreaker:
+    """A circuit breaker for one endpoint of the hearthstone api
+
+    The circuit opens after `failure_threshold` consecutive server or 
+    connection errors, and while open every request fails fast with 
+    `CircuitOpen`. Once `reset_timeout` seconds have passed a single probe 
+    request is let through. The circuit closes if the probe succeeds and 
+    opens again if it fails
+
+    Optional Arguments:
+        - failure_threshold : int
+            - consecutive failures that open the circuit
+        - reset_timeout : float
+            - seconds the circuit stays open before a probe is allowed
+
+    Attributes:
+        - state (property) : str
+            - `closed`, `open`, or `half-open`
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold :int=5, 
+                    reset_timeout :float=30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(STATE: {}, FAILURES: {})".format(cls, self.state,
+                                                    self._failures)
+
+    @property
+    def state(self) -> str:
+        """Getter for the `state` property"""
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self, endpoint :str) -> None:
+        """Raise `CircuitOpen` if a request to `endpoint` may not be sent"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+
+        raise CircuitOpen(f"Circuit for '{endpoint}' is open after "
+                            f"{self._failures} consecutive failures", None)
+
+    def cancel_probe(self) -> None:
+        """Allow another probe after a probe request was never sent"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a request succeeded"""
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self, error :Exception) -> None:
+        """Count `error` against the circuit if it is a server or connection
+        error, opening the circuit once the threshold is reached
+        """
+        if not isinstance(error, (APIServerError, APIConnectionError)):
+            self.record_success()
+            return
+
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
@@ -0,0 +1,59 @@
+__all__ = (
+    "TrigramIndex",
+)
+
+from typing import Dict, Iterable, List, Set
+
+def _trigrams(text :str) -> Set[str]:
+    """Return the set of every three character substring of `text`"""
+    return {text[i:i+3] for i in range(0, len(text) - 2)}
+
+class TrigramIndex:
+    """An inverted index from every trigram of a name to the names that
+    contain it. A substring query is answered by intersecting the postings of
+    its own trigrams and then confirming each remaining candidate, so only a
+    handful of names are ever compared against the query
+
+    Positional Arguments:
+        - names : Iterable[str]
+            - the normalized names to index. Search results keep this order
+
+    Methods:
+        - search
+            - return every indexed name that contains a query
+    """
+    def __init__(self, names :Iterable[str]) -> None:
+        self._names :List[str] = list(names)
+        self._postings :Dict[str, Set[int]] = {}
+
+        for i, name in enumerate(self._names):
+            for gram in _trigrams(name):
+                self._postings.setdefault(gram, set()).add(i)
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(NAMES: {}, TRIGRAMS: {})".format(cls, len(self._names),
+                                                    len(self._postings))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, query :str) -> List[str]:
+        """Return every indexed name that contains `query`, in the order the
+        names were indexed. Queries shorter than a trigram are compared
+        against every name
+
+        Positional Arguments:
+            - query : str
+                - a normalized name or partial name
+        """
+        grams = _trigrams(query)
+        if not grams:
+            return [name for name in self._names if query in name]
+
+        postings = sorted((self._postings.get(gram, set()) for gram in grams),
+                            key=len)
+        candidates = postings[0].intersection(*postings[1:])
+
+        return [self._names[i] for i in sorted(candidates)
+                                if query in self._names[i]]
@@ -0,0 +1,85 @@
+__all__ = (
+    "create_session",
+    "warm_up",
+)
+
+import asyncio
+import aiohttp
+from typing import Optional
+from ._api import get_config
+
+def create_session(limit :int=100, limit_per_host :int=20,
+                    keepalive_timeout :float=60.0, 
+                    dns_cache_ttl :Optional[int]=300,
+                    connect_timeout :float=3.0, read_timeout :float=10.0,
+                    total_timeout :Optional[float]=None) \
+                        -> aiohttp.ClientSession:
+    """Create an `aiohttp.ClientSession` tuned for the hearthstone api
+
+    Connections are pooled and kept alive between requests, the address of 
+    the api host is cached, and the connect and read phases of a request have
+    separate timeouts. The whole request is unbounded by default because the
+    /cards endpoint returns a large body
+
+    Optional Arguments:
+        - limit : int
+            - the maximum number of open connections
+        - limit_per_host : int
+            - the maximum number of open connections to one host
+        - keepalive_timeout : float
+            - seconds an idle connection is kept open
+        - dns_cache_ttl : int
+            - seconds a resolved host address is cached. `None` caches forever
+        - connect_timeout : float
+            - seconds allowed to acquire and open a connection
+        - read_timeout : float
+            - seconds allowed between reads of a response
+        - total_timeout : float
+            - seconds allowed for a whole request. `None` is unbounded
+
+    Returns:
+        an `aiohttp.ClientSession`
+    """
+    connector = aiohttp.TCPConnector(limit=limit, 
+                                        limit_per_host=limit_per_host,
+                                        keepalive_timeout=keepalive_timeout,
+                                        use_dns_cache=True,
+                                        ttl_dns_cache=dns_cache_ttl)
+    timeout = aiohttp.ClientTimeout(total=total_timeout, 
+                                    connect=connect_timeout,
+                                    sock_read=read_timeout)
+
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+async def _open_connection(session :aiohttp.ClientSession) -> bool:
+    """Send a `HEAD` request to the api host without credentials so that a
+    connection is opened and returned to the pool of `session`
+    """
+    try:
+        async with session.head(get_config()["API_URI"],
+                                    allow_redirects=False):
+            return True
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
+async def warm_up(session :aiohttp.ClientSession, connections :int=2) -> int:
+    """Resolve the api host and open `connections` keep-alive connections to
+    it ahead of the first request, so the first lookup does not pay for the 
+    TCP and TLS handshakes. The requests carry no api key and do not count
+    against the quota of the api
+
+    Positional Arguments:
+        - session : aiohttp.ClientSession
+            - the session whose pool is warmed
+
+    Optional Arguments:
+        - connections : int
+            - the number of connections to open
+
+    Returns:
+        the number of connections opened
+    """
+    opened = await asyncio.gather(*(_open_connection(session) 
+                                        for _ in range(connections)))
+
+    return sum(opened)
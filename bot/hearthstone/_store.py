@@ -0,0 +1,302 @@
+__all__ = (
+    "CardStore",
+)
+
+import json
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple, Union
+from ._card import MultipleCards, CollectibleCard, NonCollectibleCard
+from ._parser import parse_api_result
+from ._stream import CardStreamDecoder
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    stored REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cards_stored ON cards (stored);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+_PRUNE_INTERVAL = 256
+#Payloads of more characters are decoded card by card
+_STREAM_THRESHOLD = 1 << 20
+
+def _to_payload(result :Union[MultipleCards,
+                            Union[CollectibleCard, NonCollectibleCard]]) \
+                                -> str:
+    """Serialize `result` as the `JSON` list of card dicts that the
+    hearthstone api would have returned for it
+    """
+    if isinstance(result, MultipleCards):
+        cards = [dict(card) for card in result]
+    else:
+        cards = [vars(result)]
+
+    #One call per card, so that encoding the full card list in an executor
+    #does not hold the GIL for the whole list
+    return "[" + ",".join(json.dumps(card, separators=(",", ":")) 
+                            for card in cards) + "]"
+
+def _from_payload(payload :str) -> Union[MultipleCards,
+                                        Union[CollectibleCard, 
+                                                NonCollectibleCard]]:
+    """Parse a payload written by `_to_payload`. A large payload, E.G: the
+    full card list, is decoded card by card for the same reason it is 
+    encoded that way
+    """
+    if len(payload) < _STREAM_THRESHOLD:
+        return parse_api_result(json.loads(payload))
+
+    decoder = CardStreamDecoder()
+    return parse_api_result(decoder.feed(payload.encode()) + decoder.close())
+
+class CardStore:
+    """A persistent cache of parsed api results backed by a local SQLite file
+    in WAL mode, so that cached cards survive a restart of the process
+
+    Every entry is keyed by a normalized query or `dbfId`, expires `ttl`
+    seconds after it is stored, and the oldest entries are pruned once the
+    store holds more than `max_entries`. Reads and writes are single indexed
+    statements, cheap enough to run on the event loop
+
+    Several processes may open the same file. A process about to fetch a
+    missing key can take a short lease on it, so that the other processes 
+    wait for the stored result instead of fetching the same key
+
+    Attributes:
+        - path : str
+            - the path of the SQLite database file
+        - ttl : float
+            - the number of seconds an entry is served for after being stored
+        - max_entries : int
+            - the maximum number of entries kept in the store
+        - owner : str
+            - identifies the leases taken through this connection
+
+    Methods:
+        - get
+            - return the result stored under a key
+        - lookup
+            - return the result stored under a key and the time it was stored
+        - stored_at
+            - return the time the result under a key was stored, without 
+            decoding it
+        - set
+            - store a result under a key
+        - set_many
+            - store several results in one transaction
+        - delete
+            - delete the result stored under a key
+        - delete_prefix
+            - delete every result whose key starts with a prefix
+        - recent
+            - return the most recently stored results
+        - prune
+            - delete expired entries and entries beyond `max_entries`
+        - acquire_lease
+            - take the lease on a key if no other owner holds it
+        - release_lease
+            - give up a lease taken with `acquire_lease`
+        - is_leased
+            - return whether any owner holds the lease on a key
+        - close
+            - close the database connection
+    """
+    def __init__(self, path :str, ttl :float=86400,
+                    max_entries :int=50000) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.owner = f"{os.getpid()}:{id(self):x}"
+
+        self._conn = sqlite3.connect(path, isolation_level=None,
+                                        check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._writes = 0
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(PATH: {}, TTL: {}, MAX_ENTRIES: {})" \
+                .format(cls, self.path, self.ttl, self.max_entries)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def get(self, key :str, 
+            max_age :Optional[float]=None) -> Optional[Union[
+                                        MultipleCards,
+                                        Union[
+                                            CollectibleCard,
+                                            NonCollectibleCard
+                                        ]
+                                    ]]:
+        """Return the unexpired result stored under `key` or `None`. With 
+        `max_age`, only a result stored within the last `max_age` seconds is
+        returned
+        """
+        now = time.time()
+        stored_after = 0.0 if max_age is None else now - max_age
+        row = self._conn.execute("SELECT payload FROM cards "
+                                "WHERE key = ? AND expires > ? "
+                                "AND stored > ?",
+                                (key, now, stored_after)).fetchone()
+        if row is None:
+            return None
+
+        return _from_payload(row[0])
+
+    def lookup(self, key :str) -> Optional[Tuple[Union[
+                                                    MultipleCards,
+                                                    Union[
+                                                        CollectibleCard,
+                                                        NonCollectibleCard
+                                                    ]
+                                                ], float]]:
+        """Return the unexpired result stored under `key` and the time, in
+        seconds since the epoch, it was stored, or `None`
+        """
+        row = self._conn.execute("SELECT payload, stored FROM cards "
+                                "WHERE key = ? AND expires > ?",
+                                (key, time.time())).fetchone()
+        if row is None:
+            return None
+
+        return _from_payload(row[0]), row[1]
+
+    def stored_at(self, key :str) -> Optional[float]:
+        """Return the time, in seconds since the epoch, the unexpired result
+        under `key` was stored, or `None`. The result is not read, so this is
+        cheap even for a large result
+        """
+        row = self._conn.execute("SELECT stored FROM cards "
+                                "WHERE key = ? AND expires > ?",
+                                (key, time.time())).fetchone()
+
+        return row[0] if row is not None else None
+
+    def set(self, key :str, result :Union[
+                                    MultipleCards,
+                                    Union[CollectibleCard, NonCollectibleCard]
+                                ]) -> None:
+        """Store `result` under `key`, replacing any previous entry"""
+        now = time.time()
+        self._conn.execute("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?)",
+                            (key, _to_payload(result), now, now + self.ttl))
+
+        self._writes += 1
+        if self._writes % _PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def set_many(self, results :Iterable[Tuple[str, Union[
+                                    MultipleCards,
+                                    Union[CollectibleCard, NonCollectibleCard]
+                                ]]]) -> None:
+        """Store each `(key, result)` of `results` in one transaction, 
+        replacing any previous entries
+        """
+        now = time.time()
+        rows = [(key, _to_payload(result), now, now + self.ttl)
+                    for key, result in results]
+        if not rows:
+            return
+
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("INSERT OR REPLACE INTO cards "
+                                    "VALUES (?, ?, ?, ?)", rows)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+        writes, self._writes = self._writes, self._writes + len(rows)
+        if writes // _PRUNE_INTERVAL != self._writes // _PRUNE_INTERVAL:
+            self.prune()
+
+    def delete(self, key :str) -> None:
+        """Delete the result stored under `key` if there is one"""
+        self._conn.execute("DELETE FROM cards WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix :str) -> int:
+        """Delete every result whose key starts with `prefix`
+
+        Returns:
+            the number of results deleted
+        """
+        cursor = self._conn.execute("DELETE FROM cards WHERE substr(key, 1, ?)"
+                                    " = ?", (len(prefix), prefix))
+        return cursor.rowcount
+
+    def recent(self, limit :int, 
+                prefix :str="") -> List[Tuple[str, Union[
+                                                    MultipleCards,
+                                                    Union[
+                                                        CollectibleCard,
+                                                        NonCollectibleCard
+                                                    ]
+                                                ]]]:
+        """Return up to `limit` unexpired `(key, result)` pairs whose key 
+        starts with `prefix`, most recently stored first
+        """
+        rows = self._conn.execute("SELECT key, payload FROM cards "
+                                "WHERE expires > ? AND substr(key, 1, ?) = ? "
+                                "ORDER BY stored DESC LIMIT ?", 
+                                (time.time(), len(prefix), prefix, 
+                                    limit)).fetchall()
+
+        return [(key, _from_payload(payload))
+                    for key, payload in rows]
+
+    def prune(self) -> None:
+        """Delete expired entries and then the oldest entries beyond
+        `max_entries`
+        """
+        self._conn.execute("DELETE FROM cards WHERE expires <= ?",
+                            (time.time(),))
+        self._conn.execute("DELETE FROM cards WHERE key IN ("
+                            "SELECT key FROM cards ORDER BY stored DESC "
+                            "LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def acquire_lease(self, key :str, ttl :float) -> bool:
+        """Take the lease on `key` for `ttl` seconds. An expired lease is
+        taken over
+
+        Returns:
+            `True` if the lease was taken, `False` if another owner holds it
+        """
+        now = time.time()
+        self._conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?",
+                            (key, now))
+        cursor = self._conn.execute("INSERT OR IGNORE INTO leases "
+                                    "VALUES (?, ?, ?)", 
+                                    (key, self.owner, now + ttl))
+        return cursor.rowcount == 1
+
+    def release_lease(self, key :str) -> None:
+        """Give up the lease on `key` if it is held by this owner"""
+        self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?",
+                            (key, self.owner))
+
+    def is_leased(self, key :str) -> bool:
+        """Return `True` if an unexpired lease on `key` is held by any 
+        owner
+        """
+        row = self._conn.execute("SELECT 1 FROM leases "
+                                "WHERE key = ? AND expires > ?",
+                                (key, time.time())).fetchone()
+        return row is not None
+
+    def close(self) -> None:
+        """Close the connection to the database file"""
+        self._conn.close()
@@ -0,0 +1,200 @@
+__all__ = (
+    "CardStreamDecoder",
+)
+
+import codecs
+import json
+from typing import Any, List, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+#States of the decoder, named after what it expects next
+_DOCUMENT = "document"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_AFTER_VALUE = "after value"
+_ITEM = "item"
+_AFTER_ITEM = "after item"
+_DONE = "done"
+
+class CardStreamDecoder:
+    """An incremental decoder for the card lists returned by the bulk
+    endpoints of the hearthstone api. The response is fed in chunks of bytes
+    as it is read and each card is returned as soon as its closing brace
+    arrives, so the whole body is never held or decoded at once
+
+    Both shapes the api returns are accepted: a list of cards, and an object
+    of card lists by set name like the /cards endpoint returns. Only the
+    card being decoded is kept in the buffer
+
+    Attributes:
+        - cards : int
+            - the number of cards decoded
+
+    Methods:
+        - feed
+            - decode the next chunk of the response
+        - close
+            - decode what remains once the response has ended
+    """
+    def __init__(self) -> None:
+        self.cards = 0
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _DOCUMENT
+        self._in_object = False
+        self._first = True
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(CARDS: {}, STATE: {})".format(cls, self.cards, self._state)
+
+    def feed(self, data :bytes) -> List[dict]:
+        """Decode the next chunk of the response
+
+        Raises a `ValueError` if the response is not a card list
+
+        Returns:
+            the cards completed by `data`, in order
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(data)
+        self._pos = 0
+
+        return self._parse(final=False)
+
+    def close(self) -> List[dict]:
+        """Decode what remains of the response once it has ended
+
+        Raises a `ValueError` if the response ended early or is not a card
+        list
+
+        Returns:
+            the remaining cards, in order
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b"",
+                                                                    True)
+        self._pos = 0
+        cards = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError(f"response ended while expecting {self._state}")
+
+        return cards
+
+    def _next_char(self) -> str:
+        """Skip whitespace and return the next character, or an empty
+        string if the buffer is exhausted
+        """
+        while (self._pos < len(self._buffer) and
+                self._buffer[self._pos] in _WHITESPACE):
+            self._pos += 1
+
+        return self._buffer[self._pos:self._pos + 1]
+
+    def _decode_value(self, final :bool) -> Tuple[bool, Any]:
+        """Decode the JSON value at the position of the buffer
+
+        Returns:
+            `(False, None)` if the value is not complete yet, otherwise
+            `(True, value)`
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        #A number at the end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final and \
+                not isinstance(value, (dict, list, str)):
+            return False, None
+
+        self._pos = end
+        return True, value
+
+    def _expect(self, char :str, expected :str) -> None:
+        raise ValueError(f"expected {expected} at character {self._pos} of "
+                            f"the buffer, found {char!r}")
+
+    def _parse(self, final :bool) -> List[dict]:
+        cards = []
+        while True:
+            char = self._next_char()
+            if not char:
+                return cards
+
+            if self._state == _DOCUMENT:
+                if char not in "{[":
+                    self._expect(char, "'{' or '['")
+                self._pos += 1
+                self._in_object = char == "{"
+                self._state = _KEY if self._in_object else _ITEM
+                self._first = True
+
+            elif self._state == _KEY:
+                if char == "}" and self._first:
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                if char != '"':
+                    self._expect(char, "a set name")
+                complete, _ = self._decode_value(final)
+                if not complete:
+                    return cards
+                self._state = _COLON
+
+            elif self._state == _COLON:
+                if char != ":":
+                    self._expect(char, "':'")
+                self._pos += 1
+                self._state = _VALUE
+
+            elif self._state == _VALUE:
+                if char == "[":
+                    self._pos += 1
+                    self._state = _ITEM
+                    self._first = True
+                    continue
+                complete, _ = self._decode_value(final)
+                if not complete:
+                    return cards
+                self._state = _AFTER_VALUE
+
+            elif self._state == _AFTER_VALUE:
+                if char not in ",}":
+                    self._expect(char, "',' or '}'")
+                self._pos += 1
+                self._state = _KEY if char == "," else _DONE
+                self._first = False
+
+            elif self._state == _ITEM:
+                if char == "]" and self._first:
+                    self._end_list()
+                    continue
+                complete, card = self._decode_value(final)
+                if not complete:
+                    return cards
+                if isinstance(card, dict):
+                    cards.append(card)
+                    self.cards += 1
+                self._state = _AFTER_ITEM
+
+            elif self._state == _AFTER_ITEM:
+                if char not in ",]":
+                    self._expect(char, "',' or ']'")
+                if char == ",":
+                    self._pos += 1
+                    self._state = _ITEM
+                    self._first = False
+                else:
+                    self._end_list()
+
+            else:
+                self._expect(char, "the end of the response")
+
+    def _end_list(self) -> None:
+        """Consume the `]` that closes a card list"""
+        self._pos += 1
+        self._state = _AFTER_VALUE if self._in_object else _DONE
@@ -5,6 +5,9 @@ __all__ = (
     "HTTPException",
     "APIServerError",
     "NoCardFound",
+    "RateLimitExceeded",
+    "APIConnectionError",
+    "CircuitOpen",
 )
 
 class APIException(Exception):
@@ -20,11 +23,15 @@ class InvalidArgument(APIException):
 class HTTPException(APIException):
     """Exception that's raised when errors are recieved during requests
     to the API endpoints
+
+    `retry_after` holds the seconds the server asked clients to wait before
+    retrying, parsed from the `Retry-After` header, or `None`
     """
 
-    def __init__(self, message, status):
+    def __init__(self, message, status, retry_after=None):
         self.message = message
         self.status = status
+        self.retry_after = retry_after
 
         super().__init__(self.message)
 
@@ -42,4 +49,29 @@ class NoCardFound(HTTPException):
 
     Subclassed from :class:`HTTPExcpetion`
     """
-    pass
\ No newline at end of file
+    pass
+
+class RateLimitExceeded(HTTPException):
+    """Exception that's raised when a request is rejected by the client-side
+    rate limiter before it is sent, because the rate or daily budget for the 
+    hearthstone api is exhausted
+
+    Subclassed from :class:`HTTPExcpetion`
+    """
+    pass
+
+class APIConnectionError(HTTPException):
+    """Exception that's raised when a request fails before a response is
+    recieved, such as when the connection is refused or times out
+
+    Subclassed from :class:`HTTPExcpetion`
+    """
+    pass
+
+class CircuitOpen(APIServerError):
+    """Exception that's raised without sending a request when the circuit 
+    breaker for an endpoint is open after repeated server errors
+
+    Subclassed from :class:`APIServerError`
+    """
+    pass
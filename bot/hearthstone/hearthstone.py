@@ -1,39 +1,212 @@
 import aiohttp
-from typing import Any, Coroutine, Union
-from cache import AsyncLRU
+import asyncio
+import functools
+from email.utils import parsedate_to_datetime
+from time import time
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Optional
+from typing import Union
+from urllib.parse import urlsplit
 from .errors import APIServerError, HTTPException, InvalidArgument, NoCardFound
+from .errors import APIConnectionError, APIException, RateLimitExceeded
 from ._parser import parse_api_result
 from ._card import MultipleCards, CollectibleCard, NonCollectibleCard, Cardback
-from ._api import ENV
+from ._cache import MemoryTier, TieredCache, cache_key
+from ._coalesce import RequestCoalescer
+from ._negative import NegativeCache
+from ._ratelimit import RateLimiter
+from ._retry import CircuitBreaker, RetryPolicy
+from ._stream import CardStreamDecoder
+from ._api import get_request_config
+
+_coalescer = RequestCoalescer()
+_rate_limiter :Optional[RateLimiter] = None
+
+def set_rate_limiter(limiter :Optional[RateLimiter]) -> None:
+    """Set the :class:`RateLimiter` every request to the hearthstone api must
+    acquire a token from before being sent. `None` disables rate limiting
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
+
+_negative_cache :Optional[NegativeCache] = NegativeCache()
+
+def set_negative_cache(cache :Optional[NegativeCache]) -> None:
+    """Set the :class:`NegativeCache` that remembers requests answered with 
+    `NoCardFound`, so that repeating them raises without a request to the
+    hearthstone api. `None` disables negative caching
+    """
+    global _negative_cache
+    _negative_cache = cache
+
+def get_negative_cache() -> Optional[NegativeCache]:
+    """Return the :class:`NegativeCache` of the API functions"""
+    return _negative_cache
+
+def get_negative_cache_stats() -> dict:
+    """Return the counters of the negative cache, or an empty `dict` when 
+    negative caching is disabled
+    """
+    return _negative_cache.stats if _negative_cache is not None else {}
+
+_response_counts :Dict[str, Dict[str, int]] = {}
+
+def get_response_stats() -> dict:
+    """Return the number of responses recieved from each endpoint by status,
+    where `2xx` counts every successful response and `error` counts requests
+    that recieved no response
+    """
+    return {endpoint: dict(counts) 
+                for endpoint, counts in _response_counts.items()}
+
+def _count_response(endpoint :str, status :Any) -> None:
+    counts = _response_counts.setdefault(endpoint, {})
+    status = "error" if status is None else str(status)
+    counts[status] = counts.get(status, 0) + 1
+
+_cache :Optional[TieredCache] = TieredCache([MemoryTier()])
+
+def set_cache(cache :Optional[TieredCache]) -> None:
+    """Set the :class:`TieredCache` the API functions read their results 
+    through. `None` disables caching
+    """
+    global _cache
+    _cache = cache
+
+def get_cache() -> Optional[TieredCache]:
+    """Return the :class:`TieredCache` of the API functions"""
+    return _cache
+
+def get_cache_stats() -> dict:
+    """Return the counters of the cache of the API functions, or an empty
+    `dict` when caching is disabled
+    """
+    return _cache.stats if _cache is not None else {}
+
+def _cached(endpoint :str) -> Callable:
+    """Decorator that reads the result of an API function through the shared
+    :class:`TieredCache` under the `cache_key` of `endpoint`, the arguments
+    after the session, and the keyword arguments. The undecorated function is
+    available as `__wrapped__`
+    """
+    def decorator(func :Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(session :aiohttp.ClientSession, *args, **kwargs):
+            cache = _cache
+            if cache is None:
+                return await func(session, *args, **kwargs)
+            return await cache.fetch(cache_key(endpoint, *args, **kwargs),
+                                        lambda: func(session, *args, **kwargs))
+        return wrapper
+    return decorator
+
+_retry_policy = RetryPolicy()
+_circuit_options = {"failure_threshold" : 5, "reset_timeout" : 30.0}
+_circuits :Dict[str, CircuitBreaker] = {}
+
+def set_retry_policy(policy :Optional[RetryPolicy]) -> None:
+    """Set the :class:`RetryPolicy` for failed requests to the hearthstone 
+    api. `None` disables retries
+    """
+    global _retry_policy
+    _retry_policy = policy if policy is not None else RetryPolicy(attempts=1)
+
+def set_circuit_breaker_options(failure_threshold :int, 
+                                reset_timeout :float) -> None:
+    """Set the options of the :class:`CircuitBreaker` of each endpoint. 
+    Existing circuits are discarded and start closed
+    """
+    _circuit_options["failure_threshold"] = failure_threshold
+    _circuit_options["reset_timeout"] = reset_timeout
+    _circuits.clear()
+
+def get_retry_stats() -> dict:
+    """Return the number of retries made and the state of the circuit of 
+    each endpoint that has been requested
+    """
+    return {
+        "retries" : _retry_policy.retries,
+        "circuits" : {endpoint: circuit.state 
+                        for endpoint, circuit in _circuits.items()},
+    }
+
+def _endpoint_key(url :str) -> str:
+    """Return the endpoint of `url` without its card specific argument, 
+    E.G: `/cards/search` for `/cards/search/Ysera`
+    """
+    segments = urlsplit(url).path.strip("/").split("/")
+    if segments[0] == "cards" and len(segments) == 2:
+        return "/cards/{name}"
+    if segments[0] == "cards" and len(segments) > 2:
+        return "/cards/" + segments[1]
 
-_BASE_URL = ENV["API_URI"]
-_HEADERS =  {
-        'x-rapidapi-host': ENV["API_HOST"], 
-        'x-rapidapi-key' : ENV["API_KEY"]
-} 
+    return "/" + "/".join(segments)
+
+def _parse_retry_after(headers :Any) -> Optional[float]:
+    """Return the seconds to wait given by the `Retry-After` header in 
+    `headers`, which is either a number of seconds or an HTTP date
+    """
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+def get_rate_limit_stats() -> dict:
+    """Return the counters of the rate limiter, or an empty `dict` when rate
+    limiting is disabled
+    """
+    return _rate_limiter.stats if _rate_limiter is not None else {}
+
+def get_coalescing_stats() -> dict:
+    """Return the counters of the coalescer shared by every API function.
+    `merged` is the number of requests that waited on an identical request
+    already in flight instead of being sent
+    """
+    return _coalescer.stats
+
+def _request_key(url :str, params :dict) -> tuple:
+    """Return the key identifying interchangeable requests to `url` with
+    `params`. The hearthstone api is case-insensitive, so `url` is case folded
+    """
+    params = params or {}
+    return (url.casefold(), 
+            tuple(sorted((k, str(v)) for k, v in params.items())))
 
 async def _make_request(session :aiohttp.ClientSession, 
                         url :str, headers :dict, params :dict) -> Coroutine:
     """Make an asynchronous request using session.get passing
-    url=url, headers=headers, params=params and return the parsed result
+    url=url, headers=headers, params=params and return the parsed result.
+    Identical requests made while one is in flight share its response, failed
+    requests are retried according to the retry policy, and requests to an 
+    endpoint whose circuit is open fail fast. A request recently answered 
+    with `NoCardFound` raises it again from the negative cache without being
+    sent
 
     Positional Arguments
         - session : aiohttp.ClientSession
             - a reference to the aiohttp client session
         - url : str
-            - the API endpoint url, which is a combination of the `_BASE_URL`
-            global module variable concatenated with an `endpoint` variable 
-            from each API function
+            - the API endpoint url, which is the base URL from 
+            `get_request_config()` followed by the endpoint of each API 
+            function
         - headers : dict
-            - the headers to be passed in. Every header includes the
-            `_HEADERS` global module dict variable which contains `API_HOST` 
-            and `API_KEY` keys, plus any new key:value pairs passed in from each
-            API function
+            - the headers to be passed in, the shared dict from 
+            `get_request_config()` which contains the `API_HOST` and 
+            `API_KEY` values
         - params : dict
             - keyword parameters to pass to session.get(). Recieved from
             the calling function as kwargs
     
     Raises:
+        - RateLimitExceeded when the rate limiter rejects the request
+        - CircuitOpen when the circuit of the endpoint is open
+        - APIConnectionError when no response is recieved
         - NoCardFound when `response.status` == `404`
         - APIServerError when `response.status` >= `500`
         - HTTPException when any other status is flagged by the client session
@@ -41,21 +214,106 @@ async def _make_request(session :aiohttp.ClientSession,
     Returns:
         the `Coroutine` from `await request.json()`
     """
-    async with session.get(url=url, headers=headers, params=params) as req:
+    key = _request_key(url, params)
+    negative_cache = _negative_cache
+    if negative_cache is not None:
+        negative_cache.check(key)
+    try:
+        return await _coalescer.run(key, 
+                                    lambda: _send_with_retries(session, url, 
+                                                                headers, 
+                                                                params))
+    except NoCardFound as e:
+        if negative_cache is not None:
+            negative_cache.add(key, e)
+        raise
+
+async def _send_with_retries(session :aiohttp.ClientSession, 
+                                url :str, headers :dict, params :dict,
+                                send :Callable=None) -> Coroutine:
+    """Send the request described by the arguments of `_make_request` 
+    through the circuit of its endpoint, retrying while the retry policy 
+    allows, and return the result of `send`, `_send_request` by default
+    """
+    send = send or _send_request
+    endpoint = _endpoint_key(url)
+    circuit = _circuits.get(endpoint)
+    if circuit is None:
+        circuit = _circuits[endpoint] = CircuitBreaker(**_circuit_options)
+
+    attempt = 0
+    while True:
+        circuit.before_request(endpoint)
         try:
-            response = await req.json()
-            req.raise_for_status()
-        except aiohttp.ClientResponseError as e:
-            if e.status == 404:
-                raise NoCardFound(str(e), e.status)
-            elif e.status >= 500:
-                raise APIServerError(str(e), e.status)
-            else:
-                raise HTTPException(str(e), e.status)
+            if _rate_limiter is not None:
+                await _rate_limiter.acquire()
+            response = await send(session, url, headers, params)
+        except (RateLimitExceeded, asyncio.CancelledError):
+            circuit.cancel_probe()
+            raise
+        except APIException as e:
+            _count_response(endpoint, e.status)
+            circuit.record_failure(e)
+            delay = _retry_policy.delay(attempt, e)
+            if delay is None:
+                raise
+            _retry_policy.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+        else:
+            _count_response(endpoint, "2xx")
+            circuit.record_success()
+            return response
+
+async def _send_request(session :aiohttp.ClientSession, 
+                        url :str, headers :dict, params :dict) -> Coroutine:
+    """Send the request described by the arguments of `_make_request` and 
+    return the parsed result. The status is checked before the body is 
+    decoded, since error pages from a gateway are often not `JSON`
+    """
+    try:
+        async with session.get(url=url, headers=headers, 
+                                params=params) as req:
+            try:
+                req.raise_for_status()
+                response = await req.json()
+            except aiohttp.ClientResponseError as e:
+                raise _response_error(e)
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+        raise APIConnectionError(repr(e), None)
     
     return response
 
-@AsyncLRU(maxsize=128)
+async def _open_response(session :aiohttp.ClientSession, 
+                            url :str, headers :dict, 
+                            params :dict) -> aiohttp.ClientResponse:
+    """Send the request described by the arguments of `_make_request` and 
+    return the response once its status is successful, before its body is 
+    read. The caller must release the response
+    """
+    try:
+        response = await session.get(url=url, headers=headers, params=params)
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+        raise APIConnectionError(repr(e), None)
+    try:
+        response.raise_for_status()
+    except aiohttp.ClientResponseError as e:
+        response.release()
+        raise _response_error(e)
+
+    return response
+
+def _response_error(e :aiohttp.ClientResponseError) -> HTTPException:
+    """Return the :class:`HTTPException` for the failed response `e`"""
+    retry_after = _parse_retry_after(e.headers)
+    if e.status == 404:
+        return NoCardFound(str(e), e.status)
+    elif e.status >= 500:
+        return APIServerError(str(e), e.status, retry_after)
+    else:
+        return HTTPException(str(e), e.status, retry_after)
+
+@_cached("/info")
 async def fetch_info(session :aiohttp.ClientSession, **kwargs) -> Any:
     """Make an asynchronous request to /info endpoint.
 
@@ -76,13 +334,13 @@ async def fetch_info(session :aiohttp.ClientSession, **kwargs) -> Any:
     Returns:
         the raw response from the endpoint as a `JSON`
     """
-    endpoint = "/info"
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/info"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return api_result
 
-@AsyncLRU(maxsize=128) 
+@_cached("/cards")
 async def fetch_cards(session :aiohttp.ClientSession, name :str, 
                       **kwargs) -> Union[
                                     MultipleCards, 
@@ -118,13 +376,13 @@ async def fetch_cards(session :aiohttp.ClientSession, name :str,
     if not name:
         raise InvalidArgument("'name' argument must not be empty or NoneType")
     
-    endpoint = f"/cards/{name}"
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/{name}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/classes")
 async def fetch_cards_by_class(session :aiohttp.ClientSession, hs_class :str, 
                                **kwargs) -> Union[
                                                 MultipleCards, 
@@ -172,13 +430,13 @@ async def fetch_cards_by_class(session :aiohttp.ClientSession, hs_class :str,
         raise InvalidArgument("'hs_class' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/classes/{hs_class}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/classes/{hs_class}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/races")
 async def fetch_cards_by_race(session :aiohttp.ClientSession, race :str, 
                               **kwargs) -> Union[
                                                 MultipleCards, 
@@ -226,13 +484,13 @@ async def fetch_cards_by_race(session :aiohttp.ClientSession, race :str,
         raise InvalidArgument("'race' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/races/{race}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/races/{race}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/sets")
 async def fetch_card_set(session :aiohttp.ClientSession, hs_set :str, 
                          **kwargs) -> Union[
                                             MultipleCards, 
@@ -280,13 +538,13 @@ async def fetch_card_set(session :aiohttp.ClientSession, hs_set :str,
         raise InvalidArgument("'hs_set' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/sets/{hs_set}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/sets/{hs_set}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/qualities")
 async def fetch_cards_by_quality(session :aiohttp.ClientSession, quality :str, 
                                  **kwargs) -> Union[
                                                 MultipleCards, 
@@ -334,13 +592,13 @@ async def fetch_cards_by_quality(session :aiohttp.ClientSession, quality :str,
         raise InvalidArgument("'quality' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/qualities/{quality}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs) 
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/qualities/{quality}"
+    api_result = await _make_request(session, url, headers, kwargs) 
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=4)
+@_cached("/cardbacks")
 async def fetch_cardbacks(session :aiohttp.ClientSession, **kwargs) \
                         -> Union[MultipleCards, Cardback]: #BUG - Content Type
     """Make an asynchronous request to /cardbacks endpoint.
@@ -364,13 +622,13 @@ async def fetch_cardbacks(session :aiohttp.ClientSession, **kwargs) \
         return data a `NoCardbackFound` exception will be raised
     """       
 
-    endpoint = "/cardsbacks"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cardsbacks"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/search")
 async def fetch_card_by_partial_name(session :aiohttp.ClientSession, 
                                      partial_name :str, **kwargs) \
                                      -> Union[
@@ -411,13 +669,13 @@ async def fetch_card_by_partial_name(session :aiohttp.ClientSession,
         raise InvalidArgument("'partial_name' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/search/{partial_name}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/search/{partial_name}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/factions")
 async def fetch_cards_by_faction(session :aiohttp.ClientSession, faction :str, 
                                  **kwargs) -> Union[
                                                 MultipleCards, 
@@ -465,13 +723,13 @@ async def fetch_cards_by_faction(session :aiohttp.ClientSession, faction :str,
         raise InvalidArgument("'faction' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/factions/{faction}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/factions/{faction}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=128)
+@_cached("/cards/types")
 async def fetch_cards_by_type(session :aiohttp.ClientSession, card_type :str, 
                               **kwargs) -> Union[
                                             MultipleCards, 
@@ -519,13 +777,58 @@ async def fetch_cards_by_type(session :aiohttp.ClientSession, card_type :str,
         raise InvalidArgument("'card_type' argument must not be "
                                 "empty or NoneType")
     
-    endpoint = f"/cards/types/{card_type}"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards/types/{card_type}"
+    api_result = await _make_request(session, url, headers, kwargs)
     
     return parse_api_result(api_result)
 
-@AsyncLRU(maxsize=2)
+async def stream_all_cards(session :aiohttp.ClientSession, 
+                            chunk_size :int=65536,
+                            **kwargs) -> AsyncIterator[dict]:
+    """Make an asynchronous request to /cards endpoint and yield each card
+    dict as soon as it has been read. The response is decoded in chunks of
+    `chunk_size` bytes, so the whole body is never held in memory and no 
+    single decode blocks the event loop
+
+    Positional Arguments:
+        - session : aiohttp.ClientSession
+            - a reference to the aiohttp client session
+
+    Optional Arguments:
+        - chunk_size : int
+            - the bytes read from the response at a time. Default 65536
+        - kwargs
+            -  keyword parameters to pass to session.get() as params, see
+            `fetch_all_cards`
+
+    The request is rate limited and retried like any other until the 
+    response starts. A response that fails once cards have been yielded
+    raises an `APIConnectionError`, or an `APIServerError` if it is not a
+    valid card list, and is not retried
+
+    Yields:
+        the card metadata dicts in the order of the response
+    """
+    base_url, headers = get_request_config()
+    url = f"{base_url}/cards"
+    response = await _send_with_retries(session, url, headers, kwargs, 
+                                        send=_open_response)
+    decoder = CardStreamDecoder()
+    try:
+        async for chunk in response.content.iter_chunked(chunk_size):
+            for card in decoder.feed(chunk):
+                yield card
+        for card in decoder.close():
+            yield card
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise APIConnectionError(repr(e), None)
+    except ValueError as e:
+        raise APIServerError(f"Invalid card list after {decoder.cards} "
+                                f"cards: {e}", None)
+    finally:
+        response.release()
+
 async def fetch_all_cards(session :aiohttp.ClientSession, **kwargs) \
                             -> Union[
                                     MultipleCards, 
@@ -565,10 +868,13 @@ async def fetch_all_cards(session :aiohttp.ClientSession, **kwargs) \
     Returns:
         a `MultipleCards` object. If the endpoint failed to return data a 
         `NoCardFound` exception will be raised
+
+    The endpoint groups cards by set name, so the sets are flattened into a
+    single sequence of cards as the response is read with `stream_all_cards`
     """       
 
-    endpoint = "/cards"  
-    api_result = await _make_request(session, _BASE_URL+endpoint,
-                                    _HEADERS, kwargs)
+    api_result = [card async for card in stream_all_cards(session, **kwargs)]
+    if not api_result:
+        raise NoCardFound("No cards returned by the /cards endpoint", None)
     
     return parse_api_result(api_result)
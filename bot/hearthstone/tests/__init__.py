@@ -4,13 +4,37 @@ Modules
 ---
     - test_api: tests related to the API server and making API requests
     - test_cards: tests related to functionality of the _Card objects 
+    - test_catalog: tests related to the local CardCatalog and TrigramIndex
+    - test_store: tests related to the on-disk CardStore
+    - test_cache: tests related to the TieredCache and its cache keys
+    - test_stream: tests related to decoding card lists in chunks
+    - test_coalesce: tests related to coalescing identical requests
+    - test_negative: tests related to caching requests that found no card
+    - test_ratelimit: tests related to the client-side RateLimiter
+    - test_retry: tests related to retrying requests and circuit breakers
 
 """
 
 all = (
     "API_TEST_SUITE",
-    "CARD_TEST_SUITE"
+    "CARD_TEST_SUITE",
+    "CATALOG_TEST_SUITE",
+    "STORE_TEST_SUITE",
+    "CACHE_TEST_SUITE",
+    "STREAM_TEST_SUITE",
+    "COALESCE_TEST_SUITE",
+    "NEGATIVE_TEST_SUITE",
+    "RATE_LIMIT_TEST_SUITE",
+    "RETRY_TEST_SUITE"
 )
 
 from .test_api import API_TEST_SUITE
 from .test_cards import CARD_TEST_SUITE
+from .test_catalog import CATALOG_TEST_SUITE
+from .test_store import STORE_TEST_SUITE
+from .test_cache import CACHE_TEST_SUITE
+from .test_stream import STREAM_TEST_SUITE
+from .test_coalesce import COALESCE_TEST_SUITE
+from .test_negative import NEGATIVE_TEST_SUITE
+from .test_ratelimit import RATE_LIMIT_TEST_SUITE
+from .test_retry import RETRY_TEST_SUITE
@@ -1,11 +1,13 @@
 import unittest
 import warnings
 from random import randint
+from unittest import mock
 from aiohttp.test_utils import AioHTTPTestCase
 from aiohttp.web import Application, Response
 from hearthstone import *
 from hearthstone._parser import parse_api_result
 from hearthstone.hearthstone import _make_request
+from hearthstone import _api
 
 class TestEndpoints(AioHTTPTestCase):
     
@@ -151,10 +153,38 @@ class TestParsing(unittest.TestCase):
             res = parse_api_result([self._card_data[1]])
             self.assertIsInstance(res, NonCollectibleCard)
 
+class TestRequestConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        patches = (mock.patch.dict(_api._overrides, clear=True),
+                    mock.patch.object(_api, "_config", None),
+                    mock.patch.object(_api, "_request_config", None))
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_request_config_is_built_once(self):
+        configure("http://localhost:1", "key", "host")
+        base_url, headers = _api.get_request_config()
+
+        self.assertEqual(base_url, "http://localhost:1")
+        self.assertEqual(headers, {"x-rapidapi-host" : "host",
+                                    "x-rapidapi-key" : "key"})
+        self.assertIs(_api.get_request_config()[1], headers)
+
+    def test_configure_rebuilds_request_config(self):
+        configure("http://localhost:1", "key", "host")
+        _, headers = _api.get_request_config()
+        configure(api_key="other")
+
+        self.assertIsNot(_api.get_request_config()[1], headers)
+        self.assertEqual(_api.get_request_config()[1]["x-rapidapi-key"],
+                            "other")
+
 API_TEST_SUITE = unittest.TestSuite([
     unittest.TestLoader().loadTestsFromTestCase(TestEndpoints),
     unittest.TestLoader().loadTestsFromTestCase(TestAPIExceptions),
     unittest.TestLoader().loadTestsFromTestCase(TestAPIFunctionCalls),
+    unittest.TestLoader().loadTestsFromTestCase(TestRequestConfig),
     unittest.TestLoader().loadTestsFromTestCase(TestParsing)
 ])
 
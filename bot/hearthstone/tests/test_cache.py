@@ -0,0 +1,207 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from hearthstone._card import *
+from hearthstone._cache import *
+from hearthstone._store import CardStore
+from hearthstone import hearthstone
+
+class TestCacheKey(unittest.TestCase):
+    def test_equivalent_requests_share_key(self):
+        self.assertEqual(cache_key("/cards/search", " Ysera "),
+                            cache_key("/cards/search", "ysera", locale="enUS"))
+        self.assertEqual(cache_key("/cards/search", "ysera"),
+                            "/cards/search|ysera|locale=enus")
+
+    def test_endpoint_and_locale_are_part_of_key(self):
+        self.assertNotEqual(cache_key("/cards/search", "ysera"),
+                            cache_key("/cards/sets", "ysera"))
+        self.assertNotEqual(cache_key("/cards/search", "ysera"),
+                            cache_key("/cards/search", "ysera", locale="deDE"))
+
+class TestTieredCache(unittest.TestCase):
+    _card_data = {"cardId": "EX1_572", "dbfId": "1186", "collectible": 1,
+                    "name": "Ysera"}
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "cards.db")
+        self.card = CollectibleCard(self._card_data)
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def _create_cache(self, **kwargs) -> TieredCache:
+        cache = TieredCache([MemoryTier(2), StoreTier(CardStore(self.path))],
+                            **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_lower_tier_hit_is_promoted(self):
+        self._create_cache().set("ysera", self.card)
+        cache = self._create_cache()
+
+        self.assertEqual(cache.get("ysera"), self.card)
+        self.assertEqual(cache.get("ysera"), self.card)
+        self.assertEqual(cache.stats["store_hits"], 1)
+        self.assertEqual(cache.stats["memory_hits"], 1)
+
+    def test_only_cards_reach_the_store(self):
+        cache = self._create_cache()
+        cache.set("info", {"patch": "23.0"})
+        cache.tiers[0].delete("info")
+
+        self.assertIsNone(cache.get("info"))
+
+    def test_stale_entry_is_returned_by_lookup_only(self):
+        cache = self._create_cache(ttl=-1, stale_ttl=60)
+        cache.set("ysera", self.card)
+
+        entry = cache.lookup("ysera")
+        self.assertFalse(cache.is_fresh(entry))
+        self.assertEqual(cache.stats["stale_hits"], 1)
+
+        async def fetch():
+            return "fetched"
+        self.assertEqual(asyncio.run(cache.fetch("ysera", fetch)), "fetched")
+
+    def test_set_many_writes_every_tier(self):
+        cache = self._create_cache()
+        cache.set_many([("ysera", self.card), ("info", {"patch": "23.0"})])
+
+        self.assertEqual(cache.tiers[0].get("info").value, {"patch": "23.0"})
+        self.assertEqual(cache.tiers[1].get("ysera").value, self.card)
+        self.assertIsNone(cache.tiers[1].get("info"))
+        self.assertEqual(cache.stats["sets"], 2)
+
+    def test_unshared_entry_skips_store(self):
+        cache = self._create_cache()
+        cache.set("ysera", self.card, shared=False)
+
+        self.assertEqual(cache.tiers[0].get("ysera").value, self.card)
+        self.assertIsNone(cache.tiers[1].get("ysera"))
+
+    def test_expired_entry_is_dropped(self):
+        cache = self._create_cache(ttl=-1)
+        cache.set("ysera", self.card)
+
+        self.assertIsNone(cache.get("ysera"))
+        self.assertEqual(len(cache.tiers[1]), 0)
+
+    def test_memory_tier_is_bounded(self):
+        cache = self._create_cache()
+        for key in ("a", "b", "c"):
+            cache.set(key, self.card)
+
+        self.assertEqual(len(cache), 2)
+
+    def test_invalidate(self):
+        cache = self._create_cache()
+        cache.set(cache_key("/cards/search", "ysera"), self.card)
+        cache.set(cache_key("/cards/search", "1186"), self.card)
+        cache.set(cache_key("/cards/sets", "core"), self.card)
+
+        cache.invalidate(cache_key("/cards/sets", "core"))
+        self.assertIsNone(cache.get(cache_key("/cards/sets", "core")))
+        self.assertEqual(cache.invalidate_prefix("/cards/search|"), 2)
+        self.assertIsNone(cache.get(cache_key("/cards/search", "ysera")))
+
+    def test_warm_copies_recent_entries_into_memory(self):
+        self._create_cache().set("ysera", self.card)
+        cache = self._create_cache()
+
+        self.assertEqual(cache.warm(10), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_warm_only_copies_keys_with_prefix(self):
+        writer = self._create_cache()
+        writer.set(cache_key("/cards/search", "ysera"), self.card)
+        writer.set(cache_key("/cards"), MultipleCards([self._card_data] * 2))
+        cache = self._create_cache()
+
+        self.assertEqual(cache.warm(10, prefix="/cards/search|"), 1)
+        self.assertIsNone(cache.tiers[0].get(cache_key("/cards")))
+
+    def test_fetch_does_not_decode_stale_entries(self):
+        reads = []
+
+        class CountingStoreTier(StoreTier):
+            def get(self, key :str):
+                reads.append(key)
+                return super().get(key)
+
+        store = CardStore(self.path)
+        cache = TieredCache([MemoryTier(), CountingStoreTier(store)], ttl=-1,
+                            stale_ttl=60)
+        self.addCleanup(cache.close)
+        cache.set("ysera", self.card, local=False)
+
+        async def fetch():
+            return self.card
+        asyncio.run(cache.fetch("ysera", fetch, local=False))
+        self.assertEqual(reads, [])
+
+    def test_shared_tier_fetches_key_once(self):
+        first, second = self._create_cache(), self._create_cache()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            return self.card
+
+        async def fetch_from_both():
+            return await asyncio.gather(
+                first.fetch("ysera", fetch, poll_interval=0.01),
+                second.fetch("ysera", fetch, poll_interval=0.01))
+
+        self.assertEqual(asyncio.run(fetch_from_both()), [self.card] * 2)
+        self.assertEqual(calls, 1)
+
+class TestCachedRequests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = TieredCache([MemoryTier()])
+        hearthstone.set_cache(self.cache)
+
+    def tearDown(self) -> None:
+        hearthstone.set_cache(TieredCache([MemoryTier()]))
+
+    def test_result_is_cached_under_endpoint_key(self):
+        calls = []
+
+        @hearthstone._cached("/cards/search")
+        async def search(session, name :str):
+            calls.append(name)
+            return name
+
+        async def search_twice():
+            return [await search(None, "Ysera"), await search(None, "ysera")]
+
+        self.assertEqual(asyncio.run(search_twice()), ["Ysera", "Ysera"])
+        self.assertEqual(calls, ["Ysera"])
+        self.assertEqual(self.cache.get(cache_key("/cards/search", "ysera")),
+                            "Ysera")
+
+    def test_disabled_cache_calls_function(self):
+        hearthstone.set_cache(None)
+        calls = []
+
+        @hearthstone._cached("/cards/search")
+        async def search(session, name :str):
+            calls.append(name)
+
+        asyncio.run(search(None, "Ysera"))
+        asyncio.run(search(None, "Ysera"))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(hearthstone.get_cache_stats(), {})
+
+CACHE_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestCacheKey),
+    unittest.TestLoader().loadTestsFromTestCase(TestTieredCache),
+    unittest.TestLoader().loadTestsFromTestCase(TestCachedRequests)
+])
+
+if __name__ == "__main__":
+    unittest.main()
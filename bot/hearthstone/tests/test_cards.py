@@ -28,15 +28,55 @@ class TestCard(unittest.TestCase):
         self.assertEqual(card_one, card_one_clone)
         self.assertNotEqual(card_one, card_two)
 
+    def test_card_fields(self):
+        metadata = {"cardId": "EX1_572", "dbfId": "1186", "name": "Ysera",
+                    "cardSet": "Classic", "collectible": 1}
+        card = CollectibleCard(metadata)
+
+        self.assertEqual(vars(card), metadata)
+        self.assertEqual(card.cardSet, "Classic")
+        self.assertEqual(card["dbfId"], "1186")
+        self.assertIsNone(card.get("race"))
+        with self.assertRaises(AttributeError):
+            card.race
+
+    def test_card_hash(self):
+        card = CollectibleCard({"dbfId": "1186", "mechanics": [{"name": "x"}]})
+        card_clone = CollectibleCard({"dbfId": "1186", 
+                                        "mechanics": [{"name": "x"}]})
+
+        self.assertEqual(hash(card), hash(card_clone))
+        self.assertEqual(len({card, card_clone}), 1)
+
     def test_multiplecards_return_card_object(self):
         card_by_name = self._multipleCards["CollectibleCard"]
         card_by_ix = CollectibleCard(self._multipleCards[0])
 
         self.assertEqual(card_by_name, card_by_ix)
     
+    def test_multiplecards_index_duplicate_names(self):
+        multiple_cards = MultipleCards([
+                {"dbfId": "1186", "collectible": 1, "name": "Ysera"}, 
+                {"dbfId": "1189", "name": "Ysera Awakens"},
+                {"dbfId": "2262", "name": "Ysera"}
+        ])
+
+        self.assertEqual([card.dbfId for card in 
+                            multiple_cards.get_all("Ysera")], ["1186", "2262"])
+        self.assertEqual(multiple_cards["Ysera"].dbfId, "1186")
+        self.assertEqual(multiple_cards.get_by_dbf_id(2262).name, "Ysera")
+
+    def test_multiplecards_creates_card_once(self):
+        card = self._multipleCards.card(1)
+
+        self.assertIsInstance(card, NonCollectibleCard)
+        self.assertIs(card, self._multipleCards["NonCollectibleCard"])
+
     def test_multiplecards_throws_NoCardFound(self):
         with self.assertRaises(NoCardFound):
             self._multipleCards["NA"]
+        with self.assertRaises(NoCardFound):
+            self._multipleCards.get_by_dbf_id("NA")
 
     def test_multiplecards_equality(self):
         multiple_cards_clone = MultipleCards([
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+from hearthstone._card import *
+from hearthstone._cache import MemoryTier, StoreTier, TieredCache, cache_key
+from hearthstone._catalog import CardCatalog, search_card_by_partial_name
+from hearthstone._store import CardStore
+from hearthstone import _catalog
+from hearthstone._negative import NegativeCache
+from hearthstone._search import TrigramIndex
+from hearthstone.errors import NoCardFound
+from hearthstone import hearthstone
+
+class TestCatalog(unittest.TestCase):
+    _card_data = [
+        {"cardId": "EX1_572", "dbfId": "1186", "collectible": 1, 
+        "name": "Ysera"},
+        {"cardId": "DREAM_02", "dbfId": "1189", "name": "Ysera Awakens"},
+        {"cardId": "CS2_029", "dbfId": "315", "collectible": 1,
+        "name": "Fireball"}
+    ]
+
+    def setUp(self) -> None:
+        self.catalog = CardCatalog()
+        self.catalog.build(self._card_data)
+
+    def test_catalog_is_loaded(self):
+        self.assertFalse(CardCatalog().loaded)
+        self.assertTrue(self.catalog.loaded)
+        self.assertEqual(len(self.catalog), 3)
+
+    def test_find_by_dbf_id(self):
+        card = self.catalog.find("1189")
+
+        self.assertIsInstance(card, NonCollectibleCard)
+        self.assertEqual(card.name, "Ysera Awakens")
+
+    def test_find_by_card_id(self):
+        card = self.catalog.get_by_card_id("cs2_029")
+
+        self.assertIsInstance(card, CollectibleCard)
+        self.assertEqual(card.dbfId, "315")
+
+    def test_find_by_partial_name(self):
+        cards = self.catalog.find("  YSERA ")
+        card = self.catalog.find("Firebal")
+
+        self.assertIsInstance(cards, MultipleCards)
+        self.assertEqual(len(cards), 2)
+        self.assertEqual(card.name, "Fireball")
+
+    def test_find_throws_NoCardFound(self):
+        with self.assertRaises(NoCardFound):
+            self.catalog.find("Insert Card Here")
+        with self.assertRaises(NoCardFound):
+            self.catalog.get_by_dbf_id("0")
+
+class TestCatalogUpdate(unittest.TestCase):
+    _card_data = [
+        {"cardId": "EX1_572", "dbfId": "1186", "collectible": 1,
+        "name": "Ysera", "cardSet": "Legacy", "cost": 9},
+        {"cardId": "CS2_029", "dbfId": "315", "collectible": 1,
+        "name": "Fireball", "cardSet": "Legacy", "cost": 4},
+        {"cardId": "DRG_001", "dbfId": "55000", "collectible": 1,
+        "name": "Dragon Egg", "cardSet": "Dragons", "cost": 1}
+    ]
+
+    def setUp(self) -> None:
+        self.cache = TieredCache([MemoryTier()])
+        self.negative_cache = NegativeCache()
+        hearthstone.set_cache(self.cache)
+        hearthstone.set_negative_cache(self.negative_cache)
+        self.catalog = CardCatalog()
+        self.catalog.build(self._card_data)
+
+    def tearDown(self) -> None:
+        hearthstone.set_cache(TieredCache([MemoryTier()]))
+        hearthstone.set_negative_cache(NegativeCache())
+
+    def test_build_groups_cards_by_set(self):
+        self.assertEqual(sorted(self.catalog.sets), ["Dragons", "Legacy"])
+
+    def test_update_replaces_only_given_sets(self):
+        nerfed = dict(self._card_data[0], cost=10)
+        added = {"cardId": "CORE_001", "dbfId": "70000", "collectible": 1,
+                    "name": "Shield Slam", "cardSet": "Legacy"}
+        changes = self.catalog.update({"Legacy": [nerfed, added]}, "24.0")
+
+        self.assertEqual((changes.added, changes.updated, changes.removed),
+                            (1, 1, 1))
+        self.assertEqual(self.catalog.find("ysera").cost, 10)
+        self.assertEqual(self.catalog.find("dragon egg").dbfId, "55000")
+        with self.assertRaises(NoCardFound):
+            self.catalog.find("fireball")
+        self.assertIn("315", changes.queries)
+        self.assertNotIn("55000", changes.queries)
+
+    def test_update_removes_set_without_cards(self):
+        changes = self.catalog.update({"Dragons": []})
+
+        self.assertEqual(changes.removed, 1)
+        self.assertEqual(self.catalog.sets, ["Legacy"])
+
+    def test_update_invalidates_changed_cards_only(self):
+        for query in ("ysera", "1186", "dragon egg"):
+            self.cache.set(cache_key("/cards", query), query)
+        self.negative_cache.add("shield slam", NoCardFound("No card", 404))
+        nerfed = dict(self._card_data[0], cost=10)
+        self.catalog.update({"Legacy": [nerfed, self._card_data[1]]})
+
+        self.assertIsNone(self.cache.get(cache_key("/cards", "ysera")))
+        self.assertIsNone(self.cache.get(cache_key("/cards", "1186")))
+        self.assertEqual(self.cache.get(cache_key("/cards", "dragon egg")),
+                            "dragon egg")
+        self.assertEqual(len(self.negative_cache), 0)
+
+    def test_update_invalidates_stale_partial_matches(self):
+        self.cache.set(cache_key("/cards/search", "yse"),
+                        self.catalog.find("ysera"))
+        added = {"cardId": "YOD_009", "dbfId": "59723", "collectible": 1,
+                    "name": "Ysera, Unleashed", "cardSet": "Dragons"}
+        self.catalog.update({"Dragons": [self._card_data[2], added]})
+
+        self.assertIsNone(self.cache.get(cache_key("/cards/search", "yse")))
+        self.assertIsInstance(self.catalog.find("yse"), MultipleCards)
+
+    def test_catalog_hits_stay_in_memory(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = TieredCache([MemoryTier(), StoreTier(CardStore(
+                                os.path.join(directory.name, "cards.db")))])
+        self.addCleanup(cache.close)
+        hearthstone.set_cache(cache)
+
+        with mock.patch.object(_catalog, "_catalog", self.catalog):
+            card = asyncio.run(search_card_by_partial_name(None, "Ysera"))
+
+        key = cache_key("/cards/search", "ysera")
+        self.assertEqual(card.dbfId, "1186")
+        self.assertIs(cache.tiers[0].get(key).value, card)
+        self.assertIsNone(cache.tiers[1].get(key))
+
+    def test_update_deletes_stored_card_list(self):
+        self.cache.set(cache_key("/cards"), MultipleCards(self._card_data))
+        self.catalog.update({"Dragons": []})
+
+        self.assertIsNone(self.cache.get(cache_key("/cards")))
+
+    def test_unchanged_update_keeps_cache(self):
+        self.cache.set(cache_key("/cards/search", "ysera"), "ysera")
+        changes = self.catalog.update({"Legacy": self._card_data[:2]})
+
+        self.assertFalse(changes.changed)
+        self.assertEqual(self.cache.get(cache_key("/cards/search", "ysera")),
+                            "ysera")
+
+class TestTrigramIndex(unittest.TestCase):
+    _names = ["ysera", "ysera awakens", "fireball", "dream"]
+
+    def setUp(self) -> None:
+        self.index = TrigramIndex(self._names)
+
+    def test_search_substring(self):
+        self.assertEqual(self.index.search("sera"), ["ysera", "ysera awakens"])
+        self.assertEqual(self.index.search("a awa"), ["ysera awakens"])
+
+    def test_search_short_query(self):
+        self.assertEqual(self.index.search("re"), ["fireball", "dream"])
+
+    def test_search_matches_linear_scan(self):
+        for query in ("e", "ea", "rea", "ball", "yser", "zzz", "ysera a"):
+            with self.subTest(query=query):
+                expected = [name for name in self._names if query in name]
+                self.assertEqual(self.index.search(query), expected)
+
+CATALOG_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestCatalog),
+    unittest.TestLoader().loadTestsFromTestCase(TestCatalogUpdate),
+    unittest.TestLoader().loadTestsFromTestCase(TestTrigramIndex)
+])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+from hearthstone._coalesce import RequestCoalescer
+from hearthstone.errors import NoCardFound
+
+class TestCoalescer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.coalescer = RequestCoalescer()
+        self.calls = 0
+
+    async def _fetch(self, result):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _run_concurrently(self, key, result, count):
+        return await asyncio.gather(
+            *(self.coalescer.run(key, lambda: self._fetch(result))
+                for _ in range(count)), return_exceptions=True)
+
+    def test_identical_calls_are_merged(self):
+        results = asyncio.run(self._run_concurrently("ysera", "card", 5))
+
+        self.assertEqual(results, ["card"] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.coalescer.stats, 
+                            {"leaders": 1, "merged": 4, "inflight": 0})
+
+    def test_exception_raised_in_every_caller(self):
+        error = NoCardFound("No card found", 404)
+        results = asyncio.run(self._run_concurrently("lol", error, 3))
+
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.calls, 1)
+
+    def test_sequential_calls_are_not_merged(self):
+        async def run_twice():
+            await self.coalescer.run("reno", lambda: self._fetch("card"))
+            await self.coalescer.run("reno", lambda: self._fetch("card"))
+
+        asyncio.run(run_twice())
+        self.assertEqual(self.calls, 2)
+
+COALESCE_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestCoalescer)
+])
+
+if __name__ == "__main__":
+    unittest.main()
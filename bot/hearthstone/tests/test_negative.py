@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+import aiohttp
+from aiohttp.test_utils import TestServer
+from aiohttp.web import Application, Response
+from hearthstone._negative import NegativeCache
+from hearthstone.errors import NoCardFound
+from hearthstone import hearthstone
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.cache = NegativeCache(maxsize=2, ttl=60, timer=lambda: self.now)
+
+    def test_remembers_miss(self):
+        self.cache.check("lol")
+        self.cache.add("lol", NoCardFound("No card found", 404))
+
+        with self.assertRaises(NoCardFound) as raised:
+            self.cache.check("lol")
+        self.assertEqual(raised.exception.status, 404)
+        self.assertEqual(self.cache.stats,
+                            {"hits": 1, "misses": 1, "stored": 1, "size": 1})
+
+    def test_forgets_miss_after_ttl(self):
+        self.cache.add("lol", NoCardFound("No card found", 404))
+        self.now = 61
+
+        self.cache.check("lol")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_is_bounded(self):
+        for query in ("lol", "insert card here", "asdf"):
+            self.cache.add(query, NoCardFound("No card found", 404))
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertNotIn("lol", self.cache)
+
+class TestNegativeCachedRequests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.requests = 0
+        self.cache = NegativeCache()
+        hearthstone.set_negative_cache(self.cache)
+
+    def tearDown(self) -> None:
+        hearthstone.set_negative_cache(NegativeCache())
+
+    async def _respond(self, request):
+        self.requests += 1
+        return Response(status=404, body=b"[]",
+                        headers={"content-type": "application/json"})
+
+    async def _request_twice(self, first :str, second :str):
+        app = Application()
+        app.router.add_get("/cards/search/{name}", self._respond)
+        async with TestServer(app) as server:
+            async with aiohttp.ClientSession() as session:
+                for name in (first, second):
+                    url = str(server.make_url(f"/cards/search/{name}"))
+                    with self.assertRaises(NoCardFound):
+                        await hearthstone._make_request(session, url,
+                                                        None, None)
+
+    def test_repeated_miss_is_not_sent(self):
+        asyncio.run(self._request_twice("lol", "LOL"))
+
+        self.assertEqual(self.requests, 1)
+        self.assertEqual(hearthstone.get_negative_cache_stats()["hits"], 1)
+
+    def test_disabled_cache_sends_every_request(self):
+        hearthstone.set_negative_cache(None)
+        asyncio.run(self._request_twice("lol", "lol"))
+
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(hearthstone.get_negative_cache_stats(), {})
+
+NEGATIVE_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestNegativeCache),
+    unittest.TestLoader().loadTestsFromTestCase(TestNegativeCachedRequests)
+])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from hearthstone._ratelimit import Priority, RateLimiter, request_priority
+from hearthstone.errors import RateLimitExceeded
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_is_granted_immediately(self):
+        limiter = RateLimiter(10, burst=3, max_wait=0)
+
+        async def acquire_burst():
+            for _ in range(3):
+                await limiter.acquire()
+
+        asyncio.run(acquire_burst())
+        self.assertEqual(limiter.stats["granted_interactive"], 3)
+        self.assertEqual(limiter.stats["waited"], 0)
+
+    def test_rejects_when_bucket_is_empty(self):
+        limiter = RateLimiter(1, burst=1, max_wait=0.1)
+
+        async def acquire_twice():
+            await limiter.acquire()
+            await limiter.acquire()
+
+        with self.assertRaises(RateLimitExceeded):
+            asyncio.run(acquire_twice())
+        self.assertEqual(limiter.stats["rejected"], 1)
+
+    def test_rejects_when_daily_budget_is_spent(self):
+        limiter = RateLimiter(100, burst=10, per_day=2)
+
+        async def acquire_three_times():
+            for _ in range(3):
+                await limiter.acquire()
+
+        with self.assertRaises(RateLimitExceeded):
+            asyncio.run(acquire_three_times())
+        self.assertEqual(limiter.stats["day_used"], 2)
+
+    def test_background_leaves_interactive_reserve(self):
+        limiter = RateLimiter(1, burst=4, background_reserve=0.5,
+                                background_max_wait=0)
+
+        async def acquire_background():
+            with request_priority(Priority.BACKGROUND):
+                for _ in range(3):
+                    await limiter.acquire()
+
+        with self.assertRaises(RateLimitExceeded):
+            asyncio.run(acquire_background())
+        self.assertEqual(limiter.stats["granted_background"], 2)
+        asyncio.run(limiter.acquire(Priority.INTERACTIVE))
+
+    def test_background_is_granted_by_single_token_bucket(self):
+        for per_second in (5, 5 / 6):
+            with self.subTest(per_second=per_second):
+                limiter = RateLimiter(per_second, burst=1,
+                                        background_max_wait=0)
+                asyncio.run(limiter.acquire(Priority.BACKGROUND))
+                self.assertEqual(limiter.stats["granted_background"], 1)
+
+RATE_LIMIT_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestRateLimiter)
+])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+import aiohttp
+from aiohttp.test_utils import TestServer
+from aiohttp.web import Application, Response
+from hearthstone._retry import CircuitBreaker, RetryPolicy
+from hearthstone.errors import *
+from hearthstone import hearthstone
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_retries_transient_errors(self):
+        policy = RetryPolicy(attempts=3, base_delay=0.1, max_delay=1)
+
+        self.assertIsNotNone(policy.delay(0, APIServerError("", 503)))
+        self.assertIsNotNone(policy.delay(0, HTTPException("", 429)))
+        self.assertIsNotNone(policy.delay(1, APIConnectionError("", None)))
+        self.assertIsNone(policy.delay(2, APIServerError("", 503)))
+
+    def test_does_not_retry_client_errors(self):
+        policy = RetryPolicy()
+
+        self.assertIsNone(policy.delay(0, NoCardFound("", 404)))
+        self.assertIsNone(policy.delay(0, HTTPException("", 403)))
+        self.assertIsNone(policy.delay(0, CircuitOpen("", None)))
+
+    def test_respects_retry_after(self):
+        policy = RetryPolicy(max_delay=2)
+
+        self.assertEqual(policy.delay(0, HTTPException("", 429, 1.5)), 1.5)
+        self.assertIsNone(policy.delay(0, HTTPException("", 429, 30)))
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        circuit = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        circuit.record_failure(APIServerError("", 500))
+        circuit.record_failure(NoCardFound("", 404))
+        circuit.record_failure(APIServerError("", 500))
+
+        self.assertEqual(circuit.state, CircuitBreaker.CLOSED)
+        circuit.record_failure(APIServerError("", 500))
+        self.assertEqual(circuit.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpen):
+            circuit.before_request("/cards/search")
+
+    def test_half_open_allows_one_probe(self):
+        circuit = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        circuit.record_failure(APIConnectionError("", None))
+
+        circuit.before_request("/info")
+        with self.assertRaises(CircuitOpen):
+            circuit.before_request("/info")
+        circuit.record_success()
+        self.assertEqual(circuit.state, CircuitBreaker.CLOSED)
+
+class TestRetriedRequests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.statuses = []
+        hearthstone.set_retry_policy(RetryPolicy(attempts=3, base_delay=0))
+        hearthstone.set_circuit_breaker_options(failure_threshold=5,
+                                                reset_timeout=60)
+
+    def tearDown(self) -> None:
+        hearthstone.set_retry_policy(RetryPolicy())
+        hearthstone.set_circuit_breaker_options(failure_threshold=5,
+                                                reset_timeout=30)
+
+    async def _respond(self, request):
+        status = self.statuses.pop(0)
+        if isinstance(status, tuple):
+            status, body, headers = status
+            return Response(status=status, body=body, headers=headers)
+        return Response(status=status, body=b"[]",
+                        headers={"content-type": "application/json"})
+
+    async def _request(self):
+        app = Application()
+        app.router.add_get("/cards/search/{name}", self._respond)
+        async with TestServer(app) as server:
+            async with aiohttp.ClientSession() as session:
+                url = str(server.make_url("/cards/search/Ysera"))
+                return await hearthstone._make_request(session, url, 
+                                                        None, None)
+
+    def test_server_error_is_retried(self):
+        self.statuses = [503, 502, 200]
+
+        self.assertEqual(asyncio.run(self._request()), [])
+        self.assertEqual(self.statuses, [])
+
+    def test_html_error_page_is_retried(self):
+        page = (503, b"<html><body>Service Unavailable</body></html>",
+                {"content-type": "text/html", "Retry-After": "0"})
+        self.statuses = [page, page, 200]
+
+        self.assertEqual(asyncio.run(self._request()), [])
+        self.assertEqual(self.statuses, [])
+
+    def test_html_error_page_opens_circuit(self):
+        hearthstone.set_retry_policy(RetryPolicy(attempts=1))
+        hearthstone.set_circuit_breaker_options(failure_threshold=2,
+                                                reset_timeout=60)
+        page = (502, b"<html>Bad Gateway</html>", 
+                {"content-type": "text/html"})
+        self.statuses = [page, page, 200]
+
+        for _ in range(2):
+            with self.assertRaises(APIServerError):
+                asyncio.run(self._request())
+        with self.assertRaises(CircuitOpen):
+            asyncio.run(self._request())
+        self.assertEqual(self.statuses, [200])
+
+    def test_gives_up_after_attempts(self):
+        self.statuses = [500, 500, 500, 200]
+
+        with self.assertRaises(APIServerError):
+            asyncio.run(self._request())
+        self.assertEqual(self.statuses, [200])
+        self.assertEqual(hearthstone.get_retry_stats()["circuits"],
+                            {"/cards/search": CircuitBreaker.CLOSED})
+
+RETRY_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestRetryPolicy),
+    unittest.TestLoader().loadTestsFromTestCase(TestCircuitBreaker),
+    unittest.TestLoader().loadTestsFromTestCase(TestRetriedRequests)
+])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from hearthstone._card import *
+from hearthstone import _store
+from hearthstone._store import CardStore
+
+class TestStore(unittest.TestCase):
+    _card_data = [
+        {"cardId": "EX1_572", "dbfId": "1186", "collectible": 1, 
+        "name": "Ysera"},
+        {"cardId": "DREAM_02", "dbfId": "1189", "name": "Ysera Awakens"}
+    ]
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "cards.db")
+        self.store = CardStore(self.path)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self._dir.cleanup()
+
+    def test_store_round_trip(self):
+        self.store.set("ysera", MultipleCards(self._card_data))
+        self.store.set("1186", CollectibleCard(self._card_data[0]))
+
+        self.assertEqual(self.store.get("ysera"), 
+                            MultipleCards(self._card_data))
+        self.assertEqual(self.store.get("1186"), 
+                            CollectibleCard(self._card_data[0]))
+        self.assertIsNone(self.store.get("reno"))
+
+    def test_store_round_trips_large_result(self):
+        threshold = _store._STREAM_THRESHOLD
+        _store._STREAM_THRESHOLD = 0
+        try:
+            self.store.set("/cards", MultipleCards(self._card_data))
+
+            self.assertEqual(self.store.get("/cards"),
+                                MultipleCards(self._card_data))
+        finally:
+            _store._STREAM_THRESHOLD = threshold
+
+    def test_store_sets_many_at_once(self):
+        self.store.set_many([("1186", CollectibleCard(self._card_data[0])),
+                            ("1189", NonCollectibleCard(self._card_data[1]))])
+
+        self.assertEqual(self.store.get("1186"), 
+                            CollectibleCard(self._card_data[0]))
+        self.assertEqual(self.store.stored_at("1186"),
+                            self.store.stored_at("1189"))
+        self.assertFalse(self.store._conn.in_transaction)
+
+    def test_store_survives_reopen(self):
+        self.store.set("1189", NonCollectibleCard(self._card_data[1]))
+        self.store.close()
+        self.store = CardStore(self.path)
+
+        self.assertEqual([key for key, _ in self.store.recent(10)], ["1189"])
+
+    def test_store_expires_entries(self):
+        self.store.ttl = -1
+        self.store.set("1186", CollectibleCard(self._card_data[0]))
+
+        self.assertIsNone(self.store.get("1186"))
+        self.store.prune()
+        self.assertEqual(len(self.store), 0)
+
+    def test_store_prunes_oldest_entries(self):
+        self.store.max_entries = 1
+        self.store.set("1186", CollectibleCard(self._card_data[0]))
+        self.store.set("1189", NonCollectibleCard(self._card_data[1]))
+        self.store.prune()
+
+        self.assertIsNone(self.store.get("1186"))
+        self.assertIsNotNone(self.store.get("1189"))
+
+    def test_store_get_filters_by_age(self):
+        self.store.set("1186", CollectibleCard(self._card_data[0]))
+
+        self.assertIsNotNone(self.store.get("1186", max_age=60))
+        self.assertIsNone(self.store.get("1186", max_age=-1))
+
+    def test_store_reads_stored_time_without_result(self):
+        self.assertIsNone(self.store.stored_at("1186"))
+        self.store.set("1186", CollectibleCard(self._card_data[0]))
+
+        self.assertEqual(self.store.stored_at("1186"),
+                            self.store.lookup("1186")[1])
+        self.assertEqual([key for key, _ in self.store.recent(10, "11")],
+                            ["1186"])
+        self.assertEqual(self.store.recent(10, "ys"), [])
+
+    def test_store_leases_key_to_one_owner(self):
+        other = CardStore(self.path)
+        try:
+            self.assertTrue(self.store.acquire_lease("ysera", 10))
+            self.assertFalse(other.acquire_lease("ysera", 10))
+            self.assertTrue(other.is_leased("ysera"))
+
+            other.release_lease("ysera")
+            self.assertTrue(self.store.is_leased("ysera"))
+            self.store.release_lease("ysera")
+            self.assertTrue(other.acquire_lease("ysera", 10))
+        finally:
+            other.close()
+
+    def test_store_takes_over_expired_lease(self):
+        other = CardStore(self.path)
+        try:
+            self.assertTrue(self.store.acquire_lease("ysera", -1))
+            self.assertFalse(other.is_leased("ysera"))
+            self.assertTrue(other.acquire_lease("ysera", 10))
+        finally:
+            other.close()
+
+STORE_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestStore)
+])
+
+if __name__ == "__main__":
+    unittest.main()
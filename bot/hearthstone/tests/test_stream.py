@@ -0,0 +1,63 @@
+import json
+import unittest
+from hearthstone._stream import CardStreamDecoder
+
+class TestCardStreamDecoder(unittest.TestCase):
+    _card_data = [
+        {"cardId": "EX1_572", "dbfId": 1186, "collectible": True,
+        "name": "Ysera", "cardSet": "Legacy", "text": "[x]At the end of "
+        "your turn, add a Dream Card to your hand.", "mechanics": []},
+        {"cardId": "DREAM_02", "dbfId": 1189, "name": "Ysera Awakens",
+        "cardSet": "Legacy", "text": "Deal 5 damage to all characters "
+        "except Ysera. éè"},
+        {"cardId": "DRG_001", "dbfId": 55000, "name": "Dragon Egg",
+        "cardSet": "Descent of Dragons", "cost": 1}
+    ]
+
+    def _decode(self, payload :bytes, size :int) -> list:
+        decoder = CardStreamDecoder()
+        cards = []
+        for i in range(0, len(payload), size):
+            cards.extend(decoder.feed(payload[i:i + size]))
+        cards.extend(decoder.close())
+
+        return cards
+
+    def test_decodes_card_list_in_any_chunks(self):
+        payload = json.dumps(self._card_data, ensure_ascii=False).encode()
+
+        for size in (1, 2, 7, 64, len(payload)):
+            with self.subTest(size=size):
+                self.assertEqual(self._decode(payload, size), self._card_data)
+
+    def test_decodes_cards_by_set(self):
+        by_set = {"Legacy": self._card_data[:2], "Credits": [],
+                    "Descent of Dragons": self._card_data[2:]}
+        payload = json.dumps(by_set, indent=2).encode()
+
+        self.assertEqual(self._decode(payload, 5), self._card_data)
+
+    def test_cards_are_returned_as_they_complete(self):
+        payload = json.dumps(self._card_data).encode()
+        first_card_end = payload.index(b"}") + 1
+        decoder = CardStreamDecoder()
+
+        self.assertEqual(decoder.feed(payload[:first_card_end - 1]), [])
+        self.assertEqual(decoder.feed(payload[first_card_end - 1:
+                                                first_card_end]),
+                            self._card_data[:1])
+        self.assertEqual(decoder.cards, 1)
+
+    def test_invalid_responses_raise_ValueError(self):
+        for payload in (b'[{"dbfId": 1}', b'"No cards"', b'[{"dbfId": 1}] x',
+                        b'{"Legacy": [{}] "Basic": []}'):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError):
+                    self._decode(payload, 4)
+
+STREAM_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestCardStreamDecoder)
+])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,31 +1,142 @@
-from logging import Logger, Formatter, getLogger, handlers, INFO
+import atexit
+import json
+import queue
+import zlib
+from logging import Filter, Formatter, Logger, LogRecord, getLogger, handlers
+from logging import INFO
 from pathlib import Path
+from typing import Optional
+
+from . import settings
 
 _BOT_LOGGER_NAME = 'hs-card-discord-bot'
 
+#Attributes of a `LogRecord` copied into a JSON line when set with `extra`
+_STRUCTURED_FIELDS = ("request_id", "stage", "duration")
+
+_listener :Optional[handlers.QueueListener] = None
+
+class JSONFormatter(Formatter):
+    """Format each record as one `JSON` object per line with the time, level,
+    and message of the record and the `request_id`, `stage`, and `duration`
+    fields when they are passed to the logger with `extra`
+    """
+    def format(self, record :LogRecord) -> str:
+        line = {
+            "time" : self.formatTime(record, self.datefmt),
+            "level" : record.levelname,
+            "message" : record.getMessage(),
+        }
+        for field in _STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                line[field] = value
+        if record.exc_info:
+            line["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(line, ensure_ascii=False)
+
+class SamplingFilter(Filter):
+    """Keep a `rate` fraction of the `INFO` records logged for a request,
+    identified by the `request_id` passed with `extra`. Every record of a
+    sampled request is kept, so its log lines stay complete. Records without
+    a `request_id` and records above `INFO` are always kept
+
+    Positional Arguments:
+        - rate : float
+            - the fraction of requests whose `INFO` records are kept
+    """
+    def __init__(self, rate :float) -> None:
+        super().__init__()
+        self.rate = rate
+        self._threshold = int(max(0.0, min(rate, 1.0)) * 0xFFFFFFFF)
+
+    def filter(self, record :LogRecord) -> bool:
+        if record.levelno > INFO:
+            return True
+
+        request_id = getattr(record, "request_id", None)
+        if request_id is None:
+            return True
+
+        return zlib.crc32(request_id.encode()) <= self._threshold
+
+class _DroppingQueueHandler(handlers.QueueHandler):
+    """A `QueueHandler` that drops records when its bounded queue is full
+    instead of blocking the event loop or raising
+    """
+    def __init__(self, queue_ :queue.Queue) -> None:
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def enqueue(self, record :LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 def setup() -> None:
-    """Set up the bot `Logger`"""
+    """Set up the bot `Logger`. Records are put on a bounded queue by the
+    calling thread and written to the rotating log file by a
+    `QueueListener` on a background thread, so file I/O never runs on the
+    event loop
+
+    Settings:
+        - LOG_FILE : str
+            - the path of the log file. Default `logs/bot.log`
+        - LOG_FORMAT : str
+            - `json` writes one `JSON` object per line. Default `text`
+        - LOG_INFO_SAMPLE_RATE : float
+            - the fraction of requests whose `INFO` lines are written.
+            Default 1
+        - LOG_QUEUE_SIZE : int
+            - the maximum number of records waiting to be written. Default
+            10000
+    """
+    global _listener
+
     logger = getLogger(_BOT_LOGGER_NAME)
     logger.setLevel(INFO)
-    
-    log_file = Path("logs", "bot.log")
-    log_file.parent.mkdir(exist_ok=True)
-  
-    formatter = Formatter('%(asctime)s - %(levelname)s - %(message)s', 
-                            datefmt='%m/%d/%Y %H:%M:%S')
+
+    log_file = Path(settings.get_str("LOG_FILE") or Path("logs", "bot.log"))
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    if settings.get_str("LOG_FORMAT", "text").lower() == "json":
+        formatter = JSONFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+    else:
+        formatter = Formatter('%(asctime)s - %(levelname)s - %(message)s',
+                                datefmt='%m/%d/%Y %H:%M:%S')
     file_handler = handlers.RotatingFileHandler(log_file, maxBytes=2097152,
                         backupCount=5, encoding="utf-8")
     file_handler.setFormatter(formatter)
     file_handler.setLevel(INFO)
 
-    logger.addHandler(file_handler)
+    queue_handler = _DroppingQueueHandler(
+        queue.Queue(settings.get_int("LOG_QUEUE_SIZE", 10000)))
+    sample_rate = settings.get_float("LOG_INFO_SAMPLE_RATE", 1.0)
+    if sample_rate < 1:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    _listener = handlers.QueueListener(queue_handler.queue, file_handler,
+                                        respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+    logger.addHandler(queue_handler)
 
     return None
 
+def shutdown() -> None:
+    """Write every queued record and stop the background logging thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 def get_logger() -> Logger:
-    """Return the logger for the bot. If this is the first call to 
+    """Return the logger for the bot. If this is the first call to
     `get_logger`, call `log.setup()` to configure the logger
-    
+
     Returns:
         logger for the bot
     """
@@ -35,4 +146,3 @@ def get_logger() -> Logger:
         setup()
 
     return logger_
-
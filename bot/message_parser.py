@@ -1,8 +1,15 @@
 import re
-from typing import Union, List
+from typing import NamedTuple, Union, List
 from discord import Message
 from bot._fetch_request import CardFetchRequest, MetadataFetchRequest
 
+MAX_ITEMS = 10
+MAX_LENGTH = 2000
+
+_BRACKET_PAIRS = {'[':']', '{':'}'}
+_BRACKETS = re.compile(r"[\[\]{}]")
+_REQUEST_TYPES = {'[':CardFetchRequest, '{':MetadataFetchRequest}
+
 class ParserException(Exception):
     """Base exception raised when an error occurs while parsing"""
     def __init__(self, base: Exception):
@@ -15,10 +22,89 @@ class NoValidRequests(ParserException):
     """
     pass
 
+class RequestToken(NamedTuple):
+    """A bracketed fetch request found in the content of a message
+
+    Attributes:
+        - bracket : str
+            - the opening bracket, `[` or `{`
+        - items : List[str]
+            - the stripped, non-empty `|` separated items inside the brackets
+        - position : int
+            - the index of the opening bracket in the message content
+    """
+    bracket: str
+    items: List[str]
+    position: int
+
+def has_request_brackets(msg_content :str) -> bool:
+    """Return `True` if `msg_content` contains an opening `[` or `{` bracket.
+    This is a cheap first check that rejects most messages before they are
+    scanned
+    """
+    return '[' in msg_content or '{' in msg_content
+
+def scan_message(msg_content :str, max_items :int=MAX_ITEMS,
+                    max_length :int=MAX_LENGTH) -> List[RequestToken]:
+    """Validate the brackets of `msg_content` and extract every `[]` and `{}`
+    request in a single pass over the bracket characters of the message
+
+    Brackets are invalid when a closing bracket has no matching opening
+    bracket, when brackets are nested, or when an opening bracket is never
+    closed. Only the first `max_length` characters are scanned, and a request
+    cut off by that limit is ignored rather than treated as invalid. Scanning
+    stops once `max_items` items have been found
+
+    Positional Arguments:
+        - msg_content : str
+            - the text representation of the Discord.Message message
+
+    Optional Arguments:
+        - max_items : int
+            - the maximum number of items to extract
+        - max_length : int
+            - the maximum number of characters to scan
+
+    Returns:
+        a list of :class:`RequestToken` in the order they appear, or an empty
+        list if the brackets are invalid
+    """
+    truncated = len(msg_content) > max_length
+    if truncated:
+        msg_content = msg_content[:max_length]
+
+    tokens = []
+    item_count = 0
+    opening, start = None, 0
+    for match in _BRACKETS.finditer(msg_content):
+        bracket = match.group()
+        if bracket in _BRACKET_PAIRS:
+            if opening is not None:
+                return []
+            opening, start = bracket, match.start()
+        elif opening is None or _BRACKET_PAIRS[opening] != bracket:
+            return []
+        else:
+            items = [item.strip() for item 
+                        in msg_content[start+1:match.start()].split('|')
+                        if item.strip()]
+            items = items[:max_items - item_count]
+            if items:
+                tokens.append(RequestToken(opening, items, start))
+                item_count += len(items)
+            if item_count >= max_items:
+                return tokens
+            opening = None
+
+    if opening is not None and not truncated:
+        return []
+
+    return tokens
+
 def is_valid_request_str(msg_content: str) -> bool:
     """Determine whether the :class:`Discord.Message` content has a proper 
-    closing bracket for every valid open bracket. Valid brackets are either 
-    `[]` or `{}`
+    closing bracket for every valid open bracket and at least one non-empty 
+    request. Valid brackets are either `[]` or `{}`
 
     Positional Arguemnts:
         - msg_content : str
@@ -28,63 +114,56 @@ def is_valid_request_str(msg_content: str) -> bool:
         `True` if there is a proper corresponding closing bracket for every
         valid opening bracket
     """
-    _valid_brackets = {']':'[', '}':'{'}
-
-    stack = []
-    total_stack_count = 0
-    for s in msg_content:
-        if s in _valid_brackets.values(): 
-            total_stack_count += 1
-            stack.append(s)
-        elif s in _valid_brackets.keys():
-            i = stack.pop()
-            if _valid_brackets[s] != i:
-                return False
-        else:
-            continue
-        
-    return stack == [] and total_stack_count > 0
+    return has_request_brackets(msg_content) and \
+            bool(scan_message(msg_content))
 
-def _parse_message_str(msg_content :str) -> List[
+def _parse_message_str(msg_content :str, max_items :int=MAX_ITEMS,
+                        max_length :int=MAX_LENGTH) -> List[
                                                 Union[
                                                     CardFetchRequest, 
                                                     MetadataFetchRequest
                                                 ]
                                             ]:
-    """Generate a :class:`FetchObject` for each valid NON-NESTED fetch request 
-    found in the :class:`Discord.Message`. Valid fetch requests are wrapped in
-    `[]` for :class:`CardFetchRequests` and `{}` for 
+    """Generate a :class:`FetchObject` for each type of valid NON-NESTED fetch
+    request found in the :class:`Discord.Message`. Valid fetch requests are 
+    wrapped in `[]` for :class:`CardFetchRequests` and `{}` for 
     :class:`MetadataFetchRequests`.
         - E.g: "[card_name] or {card_name} or [card_dbfid]" or "Man [card_name]
         and {other_card_name} are too strong right now!"
     
     Attempts to nest fetch requests - "[ [card_name] too good!]" will result in
-    the first child request that matches the outer request to be invalid
+    no fetch requests
 
     Positional Arguemnts:
         - msg_content : str
             - the text representation of the Discord.Message message
+
+    Optional Arguments:
+        - max_items : int
+            - the maximum number of items to extract
+        - max_length : int
+            - the maximum number of characters to scan
     
     Returns:
-        a list of :class:`FetchRequest` objects
+        a list of :class:`FetchRequest` objects in the order their brackets
+        appear in the message. Neighbouring brackets of the same type share 
+        one :class:`FetchRequest`, so "{b} [a] [c]" fetches b, then a and c
 
     """
-    fetch_requests = []
-    _brackets = [['[',']'], ['{','}']]
-
-    for i in range(0, len(_brackets)):
-        pattern = f"\{_brackets[i][0]}(.*?)\{_brackets[i][1]}"
-        req = re.findall(pattern, msg_content) 
-        if req and i == 0:
-            fetch_requests.append(CardFetchRequest(req))
-        elif req and i ==1:
-            fetch_requests.append(MetadataFetchRequest(req))
+    runs = []
+    tokens = sorted(scan_message(msg_content, max_items, max_length),
+                    key=lambda token: token.position)
+    for token in tokens:
+        if runs and runs[-1][0] == token.bracket:
+            runs[-1][1].extend(token.items)
         else:
-            continue
-        
-    return fetch_requests 
+            runs.append((token.bracket, list(token.items)))
+
+    return [_REQUEST_TYPES[bracket](bracket_items) 
+                for bracket, bracket_items in runs]
 
-def parse_message(msg :Message) -> List[Union[
+def parse_message(msg :Message, max_items :int=MAX_ITEMS,
+                    max_length :int=MAX_LENGTH) -> List[Union[
                                             CardFetchRequest, 
                                             MetadataFetchRequest
                                         ]
@@ -96,6 +175,12 @@ def parse_message(msg :Message) -> List[Union[
         msg : Discord.Message
             - Message object that represents a message sent in a discord 
             server
+
+    Optional Arguments:
+        - max_items : int
+            - the maximum number of items to extract
+        - max_length : int
+            - the maximum number of characters to scan
             
     Returns
         list of :class:`FetchRequests` objects
@@ -104,7 +189,8 @@ def parse_message(msg :Message) -> List[Union[
     exception is raised. Any other exception raises a `ParserException`
     """
     try:
-        fetch_requests =  _parse_message_str(msg.content)
+        fetch_requests =  _parse_message_str(msg.content, max_items, 
+                                                max_length)
     except Exception as e:
         raise ParserException(e)
         
@@ -0,0 +1,180 @@
+"""Module that records latency histograms and counters for the stages of a
+request handled by the bot and exposes them in the Prometheus text format,
+optionally on a local HTTP endpoint
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from aiohttp import web
+
+_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+            1.0, 2.5, 5.0, 10.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+#A collector returns `(name, type, help, labels, value)` samples when scraped
+_Sample = Tuple[str, str, str, Dict[str, str], float]
+
+class _Histogram:
+    """Bucketed counts, sum, and count of observed durations"""
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value :float) -> None:
+        self.buckets[bisect_left(_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Stopwatch:
+    """The duration of a :meth:`Registry.timer` block, set when it exits"""
+    __slots__ = ("elapsed",)
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+
+class Registry:
+    """Holds every counter and histogram recorded by the bot and the
+    collectors that report the counters of other components when scraped
+
+    Methods:
+        - inc
+            - add to a counter
+        - observe
+            - record a duration in a histogram
+        - timer
+            - context manager that records the duration of its block
+        - register_collector
+            - add a callable that returns samples when scraped
+        - render
+            - return every metric in the Prometheus text format
+    """
+    def __init__(self) -> None:
+        self._help :Dict[str, Tuple[str, str]] = {}
+        self._counters :Dict[str, Dict[_Labels, float]] = {}
+        self._histograms :Dict[str, Dict[_Labels, _Histogram]] = {}
+        self._collectors :List[Callable[[], Iterable[_Sample]]] = []
+
+    def inc(self, name :str, amount :float=1, help :str="",
+            **labels :str) -> None:
+        """Add `amount` to the counter `name` with `labels`"""
+        self._help.setdefault(name, ("counter", help))
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name :str, seconds :float, help :str="",
+                **labels :str) -> None:
+        """Record `seconds` in the histogram `name` with `labels`"""
+        self._help.setdefault(name, ("histogram", help))
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage :str, **labels :str) -> Iterator[_Stopwatch]:
+        """Record the duration of the block in the
+        `hs_bot_stage_duration_seconds` histogram for `stage`, including
+        blocks that raise. The yielded object's `elapsed` attribute holds the
+        duration once the block exits
+        """
+        stopwatch = _Stopwatch()
+        start = time.perf_counter()
+        try:
+            yield stopwatch
+        finally:
+            stopwatch.elapsed = time.perf_counter() - start
+            self.observe("hs_bot_stage_duration_seconds",
+                            stopwatch.elapsed,
+                            "Duration of each stage of handling a request",
+                            stage=stage, **labels)
+
+    def register_collector(self,
+                            collector :Callable[[], Iterable[_Sample]]) \
+                                -> None:
+        """Add `collector`, which returns `(name, type, help, labels, value)`
+        samples each time the metrics are rendered
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for name, series in self._counters.items():
+            _header(lines, name, *self._help[name])
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for name, series in self._histograms.items():
+            _header(lines, name, *self._help[name])
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(_BUCKETS + ("+Inf",),
+                                        histogram.buckets):
+                    cumulative += count
+                    le = labels + (("le", str(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(le)} "
+                                    f"{cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} "
+                                f"{histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} "
+                                f"{histogram.count}")
+
+        collected :Dict[str, List[str]] = {}
+        for collector in self._collectors:
+            for name, type_, help, labels, value in collector():
+                if name not in collected:
+                    collected[name] = []
+                    _header(collected[name], name, type_, help)
+                labels = tuple(sorted(labels.items()))
+                collected[name].append(f"{name}{_format_labels(labels)} "
+                                        f"{value}")
+        for samples in collected.values():
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+def _header(lines :List[str], name :str, type_ :str, help :str) -> None:
+    if help:
+        lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {type_}")
+
+def _format_labels(labels :_Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join('{}="{}"'.format(key, str(value).replace("\\", "\\\\")
+                                            .replace('"', '\\"')
+                                            .replace("\n", "\\n"))
+                        for key, value in labels)
+    return "{" + pairs + "}"
+
+_registry = Registry()
+
+def get_registry() -> Registry:
+    """Return the :class:`Registry` of the bot"""
+    return _registry
+
+async def start_server(host :str, port :int) -> web.AppRunner:
+    """Serve the metrics of the bot registry at `http://host:port/metrics`
+
+    Returns:
+        the `aiohttp.web.AppRunner` of the server, to be cleaned up on close
+    """
+    async def handle_metrics(request :web.Request) -> web.Response:
+        return web.Response(text=_registry.render(),
+                            content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+
+    return runner
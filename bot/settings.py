@@ -0,0 +1,69 @@
+"""Module that reads the optional settings of the bot from environment 
+variables. The `.env` file in the immediate parent directory of `settings.py` 
+is loaded once before the first setting is read, or the legacy `.env` file
+next to the package when there is none
+"""
+
+from os import getenv
+from pathlib import Path
+from typing import Optional
+
+_env_loaded = False
+
+#`.env` in the package, then the file the bot has always read, which is a
+#sibling of the package named `bot\.env` outside of Windows. The `.env` of
+#the hearthstone package is found the same way by `hearthstone._api`
+_ENV_FILES = (
+    Path(__file__).parent / ".env",
+    Path(str(Path(__file__).parent.resolve()) + "\\.env"),
+)
+
+def load_env() -> None:
+    """Load the first `.env` file of the bot that exists into the 
+    environment if it has not been loaded yet
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+
+    for env_file in _ENV_FILES:
+        if env_file.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path=env_file)
+            break
+    _env_loaded = True
+
+def get_str(name :str, default :Optional[str]=None) -> Optional[str]:
+    """Return the environment variable `name` or `default` if it is unset or
+    empty
+    """
+    load_env()
+    value = getenv(name)
+
+    return value if value else default
+
+def get_int(name :str, default :int) -> int:
+    """Return the environment variable `name` as an `int` or `default` if it
+    is unset. Raises `ValueError` if the value is not an integer
+    """
+    value = get_str(name)
+
+    return default if value is None else int(value)
+
+def get_float(name :str, default :float) -> float:
+    """Return the environment variable `name` as a `float` or `default` if it
+    is unset. Raises `ValueError` if the value is not a number
+    """
+    value = get_str(name)
+
+    return default if value is None else float(value)
+
+def get_bool(name :str, default :bool) -> bool:
+    """Return `True` if the environment variable `name` is one of `1`, `true`,
+    `yes` or `on`, `False` for any other value, or `default` if it is unset
+    """
+    value = get_str(name)
+    if value is None:
+        return default
+
+    return value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,212 @@
+"""Module that launches and supervises a sharded deployment of the bot. The
+shards are split into contiguous ranges, one :class:`ShardedBot` process per
+range, and a process that exits is restarted with an exponential backoff
+
+Every process shares the on-disk card store at `CARD_STORE_PATH`, so a card
+is fetched from the hearthstone api by one process and read from the store by
+the others. The cache of formatted responses is kept by each process, since 
+formatting a stored card costs less than reading a response from the store.
+Each process logs to its own file and serves its metrics on `METRICS_PORT` 
+plus its index
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from typing import Dict, List, Optional
+
+from . import settings
+from .log import get_logger
+
+#Exit code of a process that failed to start, which is not restarted
+STARTUP_FAILED = 183
+
+_DEFAULT_STORE_PATH = "cards.sqlite"
+_MIN_BACKOFF = 1.0
+_MAX_BACKOFF = 60.0
+#A process that ran for this long before exiting restarts without backoff
+_HEALTHY_UPTIME = 60.0
+
+def shard_ranges(shard_count :int, processes :int) -> List[List[int]]:
+    """Split the shard ids `0` to `shard_count - 1` into `processes`
+    contiguous ranges whose sizes differ by at most one
+    """
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+def _run_process(index :int, shard_ids :List[int], shard_count :int,
+                    processes :int) -> None:
+    """Target of a shard process. Configures the per-process log file and
+    metrics port, then creates and runs a :class:`ShardedBot`
+    """
+    os.environ["LOG_FILE"] = str(os.path.join("logs", f"bot-{index}.log"))
+    #A process serves the same shards after every restart, so it keeps its
+    #own record of the cards they request
+    root, ext = os.path.splitext(settings.get_str("POPULARITY_PATH",
+                                                    "popularity.json"))
+    os.environ["POPULARITY_PATH"] = f"{root}-{index}{ext}"
+    metrics_port = settings.get_int("METRICS_PORT", 0)
+    if metrics_port:
+        os.environ["METRICS_PORT"] = str(metrics_port + index)
+
+    from .bot import ShardedBot, StartUpError
+    try:
+        instance = ShardedBot.create(command_prefix='!', shard_ids=shard_ids,
+                                        shard_count=shard_count,
+                                        process_count=processes)
+        instance.initialize()
+        instance.run(instance.token)
+    except StartUpError as e:
+        get_logger().fatal(e.exception)
+        raise SystemExit(STARTUP_FAILED)
+
+class ShardSupervisor:
+    """Starts one process per range of shards and restarts the processes
+    that exit until it is stopped
+
+    Positional Arguments:
+        - shard_count : int
+            - the total number of shards of the bot
+
+    Optional Arguments:
+        - processes : int
+            - the number of processes. Default one per CPU, at most one per
+            shard
+
+    Methods:
+        - run
+            - start the processes and supervise them until stopped
+        - stop
+            - terminate every process
+    """
+    def __init__(self, shard_count :int,
+                    processes :Optional[int]=None) -> None:
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count,
+                                    processes or os.cpu_count() or 1)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes :Dict[int, multiprocessing.Process] = {}
+        self._started :Dict[int, float] = {}
+        self._backoff :Dict[int, float] = {}
+        self._restart_at :Dict[int, float] = {}
+        self._stopping = False
+        self._logger = get_logger()
+
+    def __repr__(self) -> str:
+        cls = type(self).__name__
+        return "{}(SHARDS: {}, PROCESSES: {})".format(cls, self.shard_count,
+                                                        len(self.ranges))
+
+    def _start(self, index :int) -> None:
+        process = self._context.Process(
+            target=_run_process, name=f"shard-process-{index}",
+            args=(index, self.ranges[index], self.shard_count,
+                    len(self.ranges)))
+        process.start()
+        self._processes[index] = process
+        self._started[index] = time.monotonic()
+        self._logger.info(f"Started process {index} (pid {process.pid}) for "
+                            f"shards {self.ranges[index]}")
+
+    def _check(self, index :int) -> Optional[int]:
+        """Schedule or perform the restart of process `index` if it exited.
+        Returns the exit code when the process failed to start
+        """
+        process = self._processes[index]
+        if process.is_alive():
+            return None
+
+        now = time.monotonic()
+        if index not in self._restart_at:
+            if process.exitcode == STARTUP_FAILED:
+                return STARTUP_FAILED
+
+            uptime = now - self._started[index]
+            if uptime >= _HEALTHY_UPTIME:
+                self._backoff[index] = _MIN_BACKOFF
+            else:
+                self._backoff[index] = min(_MAX_BACKOFF,
+                                            self._backoff.get(index,
+                                                            _MIN_BACKOFF / 2)
+                                                * 2)
+            self._restart_at[index] = now + self._backoff[index]
+            self._logger.warning(f"Process {index} exited with code "
+                                    f"{process.exitcode} after {uptime:.0f}s, "
+                                    f"restarting in {self._backoff[index]:g}s")
+        elif now >= self._restart_at[index]:
+            del self._restart_at[index]
+            self._start(index)
+
+        return None
+
+    def run(self, poll_interval :float=0.5) -> int:
+        """Start a process for each range of shards and restart any process
+        that exits until `stop` is called or SIGINT or SIGTERM is received
+
+        Returns:
+            `0`, or `STARTUP_FAILED` if a process failed to start
+        """
+        def handle_signal(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGINT, handle_signal)
+        signal.signal(signal.SIGTERM, handle_signal)
+
+        store_path = settings.get_str("CARD_STORE_PATH")
+        if not store_path:
+            os.environ["CARD_STORE_PATH"] = _DEFAULT_STORE_PATH
+            store_path = _DEFAULT_STORE_PATH
+        self._logger.info(f"Launching {self} sharing the card store "
+                            f"{store_path}")
+
+        for index in range(len(self.ranges)):
+            self._start(index)
+
+        code = 0
+        try:
+            while not self._stopping:
+                for index in range(len(self.ranges)):
+                    if self._check(index) == STARTUP_FAILED:
+                        self._logger.critical(f"Process {index} failed to "
+                                                "start, stopping every shard")
+                        code = STARTUP_FAILED
+                        self._stopping = True
+                        break
+                time.sleep(poll_interval)
+        finally:
+            self.stop()
+
+        return code
+
+    def stop(self, timeout :float=10.0) -> None:
+        """Terminate every process, killing those that do not exit within
+        `timeout` seconds
+        """
+        self._stopping = True
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._logger.info("Every shard process stopped")
+
+def run_shards(shard_count :int, processes :Optional[int]=None) -> int:
+    """Run `shard_count` shards in `processes` supervised processes until
+    interrupted
+
+    Returns:
+        the exit code of the launcher
+    """
+    return ShardSupervisor(shard_count, processes).run()
@@ -0,0 +1,23 @@
+"""Test package for the discord bot
+
+Modules
+---
+    - test_bot: tests related to the Bot and its helper functions
+    - test_message_parser: tests related to finding fetch requests in 
+    messages
+    - test_response_cache: tests related to caching formatted responses
+    - test_popularity: tests related to counting requested items
+
+"""
+
+all = (
+    "BOT_TEST_SUITE",
+    "MESSAGE_PARSER_TEST_SUITE",
+    "RESPONSE_CACHE_TEST_SUITE",
+    "POPULARITY_TEST_SUITE",
+)
+
+from .test_bot import BOT_TEST_SUITE
+from .test_message_parser import MESSAGE_PARSER_TEST_SUITE
+from .test_response_cache import RESPONSE_CACHE_TEST_SUITE
+from .test_popularity import POPULARITY_TEST_SUITE
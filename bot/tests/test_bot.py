@@ -0,0 +1,196 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+from bot._fetch_request import CardFetchRequest
+from bot._popularity import PopularitySketch
+from bot._response_cache import ResponseCache
+from bot.bot import Bot, _create_rate_limiter
+from bot.hearthstone import CollectibleCard, MemoryTier, MultipleCards
+from bot.hearthstone import NegativeCache
+from bot.hearthstone import NoCardFound, Priority, TieredCache, cache_key
+
+def _card(name :str, dbf_id :str) -> CollectibleCard:
+    return CollectibleCard({"dbfId": dbf_id, "name": name, "collectible": 1,
+                            "img": f"https://img/{dbf_id}.png"})
+
+class _BotTestCase(unittest.IsolatedAsyncioTestCase):
+    """Creates a `Bot` that is never connected to discord, with in-memory
+    caches and a `CardFetchRequest` whose API is `self.api`
+    """
+    async def asyncSetUp(self) -> None:
+        self.bot = Bot(command_prefix="!", loop=asyncio.get_running_loop())
+        self.bot.cache = TieredCache([MemoryTier()], ttl=60, stale_ttl=600)
+        self.bot.responses = ResponseCache()
+        self.bot.negative_cache = NegativeCache()
+        self.bot.popularity = PopularitySketch()
+        self.calls = []
+        self.request = CardFetchRequest(["Ysera"])
+        self.request._api = self.api
+
+    async def api(self, session, item :str) -> CollectibleCard:
+        self.calls.append(item)
+        return _card(item, "1186")
+
+    async def fetch(self, item :str) -> dict:
+        return await self.bot._fetch_item(self.request, item,
+                                            asyncio.Semaphore(4), "request")
+
+class TestCreateRateLimiter(unittest.TestCase):
+    def test_small_share_grants_background_requests(self):
+        env = {"API_RATE_LIMIT": "5", "API_RATE_BURST": "10"}
+        for processes in (6, 8, 16):
+            with self.subTest(processes=processes), \
+                    mock.patch.dict(os.environ, env):
+                limiter = _create_rate_limiter(1 / processes)
+                limiter.background_max_wait = 0
+
+                asyncio.run(limiter.acquire(Priority.BACKGROUND))
+                self.assertEqual(limiter.stats["granted_background"], 1)
+                self.assertGreaterEqual(limiter.stats["tokens"], 1)
+
+class TestFetchItem(_BotTestCase):
+    def _store_stale(self, item :str, card :CollectibleCard) -> None:
+        self.bot.cache.set(cache_key("/cards/search", item), card)
+        self.bot.cache.ttl = -1
+
+    async def test_fresh_entry_is_served_without_fetch(self):
+        self.bot.cache.set(cache_key("/cards/search", "ysera"),
+                            _card("Ysera", "1"))
+
+        self.assertEqual(await self.fetch("Ysera"),
+                            {"content": "https://img/1.png"})
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.bot._revalidations, {})
+
+    async def test_miss_is_fetched(self):
+        self.assertEqual(await self.fetch("Ysera"),
+                            {"content": "https://img/1186.png"})
+        self.assertEqual(self.calls, ["Ysera"])
+
+    async def test_stale_entry_is_served_while_refreshed(self):
+        self._store_stale("Ysera", _card("Ysera", "1"))
+        refreshed = asyncio.Event()
+
+        async def slow_api(session, item :str) -> CollectibleCard:
+            self.calls.append(item)
+            await refreshed.wait()
+            return _card(item, "2")
+        self.request._api = slow_api
+
+        responses = await asyncio.wait_for(
+            asyncio.gather(self.fetch("Ysera"), self.fetch(" ysera ")), 1)
+        self.assertEqual(responses, [{"content": "https://img/1.png"}] * 2)
+        self.assertEqual(len(self.bot._revalidations), 1)
+
+        refreshed.set()
+        await asyncio.gather(*self.bot._revalidations.values())
+        self.assertEqual(self.calls, ["Ysera"])
+        self.assertEqual(self.bot._revalidations, {})
+
+    async def test_refresh_drops_stale_response(self):
+        self._store_stale("Ysera", _card("Ysera", "1186"))
+        await self.fetch("Ysera")
+        await asyncio.gather(*self.bot._revalidations.values())
+
+        self.assertEqual(self.bot.responses.invalidate(["1186"]), 0)
+
+    async def test_failed_refresh_keeps_stale_entry(self):
+        self._store_stale("Ysera", _card("Ysera", "1"))
+
+        async def failing_api(session, item :str) -> CollectibleCard:
+            raise NoCardFound("No card", 404)
+        self.request._api = failing_api
+
+        await self.fetch("Ysera")
+        await asyncio.gather(*self.bot._revalidations.values())
+        self.assertEqual(await self.fetch("Ysera"),
+                            {"content": "https://img/1.png"})
+
+    async def test_negative_hit_skips_fetch(self):
+        self.bot.negative_cache.add("lol", NoCardFound("No card", 404))
+
+        self.assertIsNone(await self.fetch(" LOL"))
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.bot.negative_cache.stats["hits"], 1)
+
+    async def test_miss_is_remembered(self):
+        async def missing_api(session, item :str) -> CollectibleCard:
+            self.calls.append(item)
+            raise NoCardFound("No card", 404)
+        self.request._api = missing_api
+
+        self.assertIsNone(await self.fetch("lol"))
+        self.assertIsNone(await self.fetch("Lol"))
+        self.assertEqual(self.calls, ["lol"])
+
+class _Channel:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send(self, **response) -> None:
+        self.sent.append(response)
+
+class TestHandleRequests(_BotTestCase):
+    async def _handle(self, items :list) -> list:
+        message = mock.Mock()
+        message.channel = _Channel()
+        self.request.items = items
+        await self.bot._handle_requests(message, [self.request], "request")
+
+        return message.channel.sent
+
+    async def test_items_are_fetched_concurrently_up_to_limit(self):
+        self.bot.message_concurrency = 2
+        running, most_running = 0, 0
+
+        async def slow_api(session, item :str) -> CollectibleCard:
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            #Later items finish first
+            await asyncio.sleep(0.01 * (10 - int(item)))
+            running -= 1
+            return _card(item, item)
+        self.request._api = slow_api
+
+        sent = await self._handle(["1", "2", "3", "4", "5"])
+        self.assertEqual(most_running, 2)
+        self.assertEqual(sent, [{"content": f"https://img/{i}.png"}
+                                    for i in range(1, 6)])
+
+    async def test_failed_item_is_skipped(self):
+        async def api(session, item :str) -> CollectibleCard:
+            if item == "Lol":
+                raise NoCardFound("No card", 404)
+            return _card(item, item)
+        self.request._api = api
+
+        sent = await self._handle(["1", "lol", "2"])
+        self.assertEqual(sent, [{"content": "https://img/1.png"},
+                                {"content": "https://img/2.png"}])
+
+    async def test_cards_of_multiple_results_are_cached(self):
+        result = MultipleCards([{"dbfId": "1186", "name": "Ysera", 
+                                    "collectible": 1},
+                                {"dbfId": "1189", "name": "Ysera Awakens"}])
+
+        async def api(session, item :str) -> MultipleCards:
+            return result
+        self.request._api = api
+
+        sent = await self._handle(["ysera"])
+        self.assertIn("Ysera Awakens: 1189", sent[0]["content"])
+        self.assertEqual(self.bot.cache.get(
+                            cache_key("/cards/search", "1189")).name,
+                            "Ysera Awakens")
+        self.assertEqual(self.bot.cache.stats["sets"], 2)
+
+BOT_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestCreateRateLimiter),
+    unittest.TestLoader().loadTestsFromTestCase(TestFetchItem),
+    unittest.TestLoader().loadTestsFromTestCase(TestHandleRequests)
+])
+
+if __name__ == "__main__":
+    unittest.main()
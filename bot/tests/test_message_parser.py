@@ -0,0 +1,79 @@
+import unittest
+from types import SimpleNamespace
+from bot._fetch_request import CardFetchRequest, MetadataFetchRequest
+from bot.message_parser import MAX_ITEMS, NoValidRequests, RequestToken
+from bot.message_parser import has_request_brackets, is_valid_request_str
+from bot.message_parser import parse_message, scan_message
+
+def _message(content :str) -> SimpleNamespace:
+    return SimpleNamespace(content=content)
+
+class TestScanMessage(unittest.TestCase):
+    def test_finds_requests_in_order(self):
+        self.assertEqual(scan_message("Is [ysera | fireball] or {ysera} ok?"),
+                            [RequestToken("[", ["ysera", "fireball"], 3),
+                                RequestToken("{", ["ysera"], 25)])
+
+    def test_stray_closing_bracket_is_invalid(self):
+        for content in ("ysera]", "}", "[ysera]]", "{ysera} }"):
+            with self.subTest(content=content):
+                self.assertEqual(scan_message(content), [])
+                self.assertFalse(is_valid_request_str(content))
+                with self.assertRaises(NoValidRequests):
+                    parse_message(_message(content))
+
+    def test_nested_and_unclosed_brackets_are_invalid(self):
+        for content in ("[ [ysera] too good!]", "{ysera [fireball]}",
+                        "[ysera}", "[ysera", "[ysera] {fireball"):
+            with self.subTest(content=content):
+                self.assertEqual(scan_message(content), [])
+
+    def test_items_are_capped(self):
+        tokens = scan_message("[a|b|c] [d]", max_items=3)
+        self.assertEqual(tokens, [RequestToken("[", ["a", "b", "c"], 0)])
+
+        content = "[" + "|".join(str(i) for i in range(MAX_ITEMS + 5)) + "]"
+        self.assertEqual(len(scan_message(content)[0].items), MAX_ITEMS)
+
+    def test_request_cut_off_by_length_is_ignored(self):
+        content = "[ysera] " + "x" * 20 + " [fireball]"
+
+        self.assertEqual(scan_message(content, max_length=30),
+                            [RequestToken("[", ["ysera"], 0)])
+        self.assertEqual(scan_message("x" * 30 + "[ysera]", max_length=30),
+                            [])
+
+    def test_has_request_brackets(self):
+        self.assertTrue(has_request_brackets("a [b"))
+        self.assertTrue(has_request_brackets("a {b"))
+        self.assertFalse(has_request_brackets("a b] c}"))
+
+class TestParseMessage(unittest.TestCase):
+    def test_requests_follow_message_order(self):
+        requests = parse_message(_message("{b} [a]"))
+
+        self.assertEqual([type(request) for request in requests],
+                            [MetadataFetchRequest, CardFetchRequest])
+        self.assertEqual([request.items for request in requests],
+                            [["B"], ["A"]])
+
+    def test_neighbouring_brackets_of_one_type_share_a_request(self):
+        requests = parse_message(_message("[a] [c] {b} [d|e]"))
+
+        self.assertEqual([type(request) for request in requests],
+                            [CardFetchRequest, MetadataFetchRequest,
+                                CardFetchRequest])
+        self.assertEqual([request.items for request in requests],
+                            [["A", "C"], ["B"], ["D", "E"]])
+
+    def test_no_requests_raises_NoValidRequests(self):
+        with self.assertRaises(NoValidRequests):
+            parse_message(_message("no brackets [ ] here"))
+
+MESSAGE_PARSER_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestScanMessage),
+    unittest.TestLoader().loadTestsFromTestCase(TestParseMessage)
+])
+
+if __name__ == "__main__":
+    unittest.main()
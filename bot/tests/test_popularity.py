@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from bot._popularity import PopularitySketch
+
+class TestPopularitySketch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sketch = PopularitySketch(width=256, depth=4, capacity=2)
+
+    def _record(self, counts :dict) -> None:
+        for item, count in counts.items():
+            for _ in range(count):
+                self.sketch.record(item)
+
+    def test_counts_are_never_underestimated(self):
+        sketch = PopularitySketch(width=16, depth=2, capacity=8)
+        counts = {f"card {i}": i % 5 + 1 for i in range(40)}
+        for item, count in counts.items():
+            for _ in range(count):
+                sketch.record(item)
+
+        for item, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(item), count)
+        self.assertEqual(sketch.total, sum(counts.values()))
+
+    def test_counts_are_exact_without_collisions(self):
+        self._record({"Ysera": 3, "Fireball": 1})
+
+        self.assertEqual(self.sketch.estimate(" ysera "), 3)
+        self.assertEqual(self.sketch.estimate("FIREBALL"), 1)
+        self.assertEqual(self.sketch.estimate("Reno"), 0)
+
+    def test_least_requested_item_is_evicted(self):
+        self._record({"Ysera": 3, "Fireball": 2, "Reno": 1})
+        self.assertEqual(self.sketch.top(3), ["Ysera", "Fireball"])
+
+        self._record({"Reno": 3})
+        self.assertEqual(self.sketch.top(3), ["Reno", "Ysera"])
+        self.assertEqual(len(self.sketch), 2)
+
+    def test_tracked_item_keeps_first_spelling(self):
+        self._record({"Ysera": 1, "ysera": 1})
+
+        self.assertEqual(self.sketch.top(1), ["Ysera"])
+
+    def test_heap_stays_bounded(self):
+        self._record({"Ysera": 100, "Fireball": 100})
+
+        self.assertLessEqual(len(self.sketch._heap), 
+                                2 * self.sketch.capacity)
+
+    def test_decay_forgets_rare_items(self):
+        self._record({"Ysera": 4, "Fireball": 1})
+        self.sketch.decay(0.5)
+
+        self.assertEqual(self.sketch.top(2), ["Ysera"])
+        self.assertEqual(self.sketch.estimate("ysera"), 2)
+        self._record({"Reno": 1})
+        self.assertEqual(self.sketch.top(2), ["Ysera", "Reno"])
+
+    def test_save_and_load_round_trip(self):
+        self._record({"Ysera": 3, "Fireball": 2})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "popularity.json")
+            self.sketch.save(path)
+            loaded = PopularitySketch.load(path)
+
+        self.assertEqual(loaded.to_dict(), self.sketch.to_dict())
+        for _ in range(4):
+            loaded.record("Reno")
+        self.assertEqual(loaded.top(2), ["Reno", "Ysera"])
+
+    def test_load_rejects_invalid_sketch(self):
+        data = self.sketch.to_dict()
+        data["rows"] = data["rows"][:1]
+
+        with self.assertRaises(ValueError):
+            PopularitySketch.from_dict(data)
+        with self.assertRaises(ValueError):
+            PopularitySketch.from_dict({"width": 256})
+
+POPULARITY_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestPopularitySketch)
+])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from bot._response_cache import ResponseCache
+from bot.bot import _result_queries
+from bot.hearthstone import CollectibleCard, MultipleCards
+
+def format_name(card) -> str:
+    return card["name"]
+
+def format_text(card) -> str:
+    return card["name"] + "!"
+
+class TestResponseCache(unittest.TestCase):
+    _card_data = {"cardId": "EX1_572", "dbfId": "1186", "collectible": 1,
+                    "name": "Ysera"}
+
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.responses = ResponseCache(maxsize=8, ttl=60, 
+                                        timer=lambda: self.now)
+        self.card = CollectibleCard(self._card_data)
+
+    def test_card_is_formatted_once(self):
+        calls = []
+
+        def format_card(card) -> str:
+            calls.append(card)
+            return card["name"]
+
+        self.responses.render(self.card, format_card)
+        self.assertEqual(self.responses.render(
+                            CollectibleCard(self._card_data), format_card),
+                            "Ysera")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.responses.stats["render_hits"], 1)
+
+    def test_key_includes_format_and_locale(self):
+        german = CollectibleCard(dict(self._card_data, locale="deDE",
+                                        name="Ysera DE"))
+
+        self.assertEqual(self.responses.render(self.card, format_name),
+                            "Ysera")
+        self.assertEqual(self.responses.render(self.card, format_text),
+                            "Ysera!")
+        self.assertEqual(self.responses.render(german, format_name),
+                            "Ysera DE")
+        self.assertEqual(self.responses.stats["render_misses"], 3)
+
+    def test_card_without_dbf_id_is_not_cached(self):
+        card = CollectibleCard({"name": "Ysera", "collectible": 1})
+        self.responses.render(card, format_name)
+        self.responses.render(card, format_name)
+
+        self.assertEqual(self.responses.stats["render_misses"], 0)
+        self.assertEqual(self.responses.stats["render_hits"], 0)
+
+    def test_formatted_card_expires_after_ttl(self):
+        self.responses.render(self.card, format_name)
+        self.now = 61
+        renamed = CollectibleCard(dict(self._card_data, name="Ysera 2"))
+
+        self.assertEqual(self.responses.render(renamed, format_name),
+                            "Ysera 2")
+        self.assertEqual(self.responses.stats["render_misses"], 2)
+
+    def test_listing_is_reused_for_same_result_only(self):
+        result = MultipleCards([self._card_data, 
+                                dict(self._card_data, dbfId="1189",
+                                        name="Ysera Awakens")])
+        text = self.responses.listing("Ysera", result)
+
+        self.assertEqual(text, "Ysera: 1186\nYsera Awakens: 1189")
+        self.assertTrue(self.responses.has_listing(" ysera ", result))
+        self.assertIs(self.responses.listing(" ysera ", result), text)
+
+        refreshed = MultipleCards(list(result))
+        self.assertFalse(self.responses.has_listing("ysera", refreshed))
+        self.responses.listing("ysera", refreshed)
+        self.assertEqual(self.responses.stats["listing_misses"], 2)
+
+    def test_refreshed_result_drops_its_responses(self):
+        result = MultipleCards([self._card_data])
+        self.responses.render(self.card, format_name)
+        self.responses.listing("ysera", result)
+
+        dropped = self.responses.invalidate(_result_queries("Ysera", result))
+        self.assertEqual(dropped, 2)
+        self.assertFalse(self.responses.has_listing("ysera", result))
+        self.responses.render(self.card, format_name)
+        self.assertEqual(self.responses.stats["render_misses"], 2)
+
+    def test_clear(self):
+        self.responses.render(self.card, format_name)
+        self.responses.clear()
+        self.responses.render(self.card, format_name)
+
+        self.assertEqual(self.responses.stats["render_misses"], 2)
+
+RESPONSE_CACHE_TEST_SUITE = unittest.TestSuite([
+    unittest.TestLoader().loadTestsFromTestCase(TestResponseCache)
+])
+
+if __name__ == "__main__":
+    unittest.main()